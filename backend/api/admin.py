@@ -1,20 +1,25 @@
 from django.contrib import admin
+from backend.admin_utils import LargeTableAdminMixin
 from .models import User, InsurancePlan, Feedback
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['username', 'email', 'name', 'age', 'budget', 'family_size']
     search_fields = ['username', 'email', 'name']
     list_filter = ['age', 'family_size']
 
 @admin.register(InsurancePlan)
-class InsurancePlanAdmin(admin.ModelAdmin):
+class InsurancePlanAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['name', 'price', 'price_per_month', 'created_at']
     search_fields = ['name', 'coverage', 'conditions']
-    list_filter = ['created_at']
+    date_hierarchy = 'created_at'
 
 @admin.register(Feedback)
-class FeedbackAdmin(admin.ModelAdmin):
+class FeedbackAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ['user', 'rating', 'created_at']
-    search_fields = ['user__username', 'comments']
-    list_filter = ['rating', 'created_at']
+    list_select_related = ['user']
+    search_fields = ['^user__username']
+    related_search_fields = {'user': ('username',)}
+    list_filter = ['rating']
+    date_hierarchy = 'created_at'
+    raw_id_fields = ['user']
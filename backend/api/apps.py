@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        """Register signal handlers."""
+        from . import signals  # noqa: F401
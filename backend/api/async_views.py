@@ -0,0 +1,42 @@
+from asgiref.sync import sync_to_async
+from rest_framework import status
+
+from backend.async_api import AsyncResponse, async_api_view
+from .models import Feedback
+from .recommendation_engine import get_recommendations
+from .llm_utils import GeminiHandler
+
+# Native async counterparts of the LLM-bound DRF actions in api.views,
+# routed in place of them when settings.ASYNC_LLM_VIEWS is on.
+
+@async_api_view(['GET'], throttle_scope='recommendations')
+async def recommendation_list(request):
+    """Get personalized insurance recommendations (RecommendationViewSet.list)."""
+    user_data = {
+        'age': request.user.age,
+        'budget': request.user.budget,
+        'family_size': request.user.family_size
+    }
+    try:
+        base_recommendations = await sync_to_async(get_recommendations)(user_data)
+    except Exception as e:
+        return AsyncResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return {'recommended_plans': base_recommendations}
+
+@async_api_view(['GET'])
+async def feedback_analytics(request):
+    """Get AI-powered analytics of all feedback (FeedbackViewSet.analytics)."""
+    if not request.user.is_staff:
+        return AsyncResponse(
+            {'error': 'Only staff members can access feedback analytics'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    try:
+        # Same selection as FeedbackViewSet.get_queryset for staff
+        queryset = Feedback.objects.order_by('-created_at')[:5].values_list('comments', flat=True)
+        feedbacks = [comments async for comments in queryset]
+        analysis = await GeminiHandler().analyze_feedback('\n'.join(feedbacks))
+        return analysis
+    except Exception as e:
+        return AsyncResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,85 @@
+"""Microbenchmarks for the api hot paths; run with `manage.py microbench`."""
+
+from decimal import Decimal
+
+from django.utils import timezone
+
+from backend.microbench import benchmark
+from .catalog import PlanRecord, bump_catalog_counter, get_catalog_snapshot
+from .models import Feedback, InsurancePlan, User
+from .recommendation_engine import calculate_plan_score, get_recommendations, rank_plans
+from .serializers import FeedbackSerializer, InsurancePlanSerializer
+
+CATALOG_SIZES = [10, 1000, 100000]
+COVERAGES = ['Individual adult coverage', 'Family coverage', 'Senior coverage', 'Family and adult coverage']
+USER_DATA = {
+    'budget': Decimal('2500'),
+    'age': 35,
+    'family_size': 3,
+    'medical_history': 'Mild asthma, no hospital stays.',
+}
+
+
+def plan_records(size):
+    now = timezone.now()
+    return [
+        PlanRecord((i, f'Benchmark Plan {i}', COVERAGES[i % len(COVERAGES)],
+                    Decimal(500 + i % 9500), 'Standard conditions', now))
+        for i in range(1, size + 1)
+    ]
+
+
+def create_plans(size):
+    InsurancePlan.objects.bulk_create(
+        (
+            InsurancePlan(
+                name=f'Benchmark Plan {i}',
+                coverage=COVERAGES[i % len(COVERAGES)],
+                price=Decimal(500 + i % 9500),
+                conditions='Standard conditions'
+            )
+            for i in range(size)
+        ),
+        batch_size=5000
+    )
+    # bulk_create does not send post_save
+    bump_catalog_counter()
+
+
+@benchmark('api.calculate_plan_score', sizes=CATALOG_SIZES)
+def plan_score(size):
+    plans = plan_records(size)
+    return lambda: [calculate_plan_score(plan, USER_DATA) for plan in plans]
+
+
+@benchmark('api.rank_plans', sizes=CATALOG_SIZES)
+def ranking(size):
+    plans = plan_records(size)
+    return lambda: rank_plans(plans, USER_DATA)
+
+
+@benchmark('api.get_recommendations', sizes=CATALOG_SIZES)
+def recommendations(size):
+    create_plans(size)
+    get_catalog_snapshot()  # Load once; the timed calls are served from the snapshot
+    return lambda: get_recommendations(USER_DATA)
+
+
+@benchmark('api.InsurancePlanSerializer', sizes=[100, 1000])
+def plan_serializer(size):
+    create_plans(size)
+    return lambda: InsurancePlanSerializer(InsurancePlan.objects.all(), many=True).data
+
+
+@benchmark('api.FeedbackSerializer', sizes=[100, 1000])
+def feedback_serializer(size):
+    users = User.objects.bulk_create(User(username=f'benchmark-{i}') for i in range(10))
+    Feedback.objects.bulk_create(
+        (
+            Feedback(user=users[i % len(users)], rating=1 + i % 5,
+                     comments='Claims were handled quickly.', summary='Positive claims experience.')
+            for i in range(size)
+        ),
+        batch_size=5000
+    )
+    return lambda: FeedbackSerializer(Feedback.objects.select_related('user'), many=True).data
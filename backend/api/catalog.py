@@ -0,0 +1,101 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import threading
+import time
+
+from django.core.cache import cache
+
+from .models import InsurancePlan
+
+CATALOG_COUNTER_CACHE_KEY = 'api_plan_catalog_counter'
+
+
+class PlanRecord:
+    """Read-only, compact copy of an insurance plan row.
+
+    Exposes the same attribute names as `InsurancePlan`, so the scoring
+    functions and read-only serializers accept it in place of a model instance.
+    """
+    __slots__ = ('id', 'pk', 'name', 'coverage', 'price', 'conditions',
+                 'created_at', 'price_per_month')
+
+    FIELDS = ('id', 'name', 'coverage', 'price', 'conditions', 'created_at')
+
+    def __init__(self, row: Tuple) -> None:
+        for field, value in zip(self.FIELDS, row):
+            object.__setattr__(self, field, value)
+        object.__setattr__(self, 'pk', self.id)
+        object.__setattr__(self, 'price_per_month', float(self.price) / 12)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('PlanRecord is read-only')
+
+    def __repr__(self) -> str:
+        return f'<PlanRecord: {self.name}>'
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class CatalogSnapshot:
+    """Immutable view of the whole plan catalog at one version."""
+
+    def __init__(self, version: int, records: Iterable[PlanRecord]) -> None:
+        self.version = version
+        self.plans: Tuple[PlanRecord, ...] = tuple(records)
+        self.by_id: Dict[int, PlanRecord] = {plan.id: plan for plan in self.plans}
+
+    def get(self, plan_id: int) -> Optional[PlanRecord]:
+        """Get a plan by id, or None if it is not in the catalog."""
+        return self.by_id.get(plan_id)
+
+    def get_many(self, plan_ids: Iterable[int]) -> List[PlanRecord]:
+        """Get the plans for the given ids in catalog order, skipping unknown ids."""
+        wanted = {int(plan_id) for plan_id in plan_ids}
+        return [plan for plan in self.plans if plan.id in wanted]
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_catalog_counter() -> int:
+    """Get the shared catalog counter, seeding it if the cache lost it."""
+    counter = cache.get(CATALOG_COUNTER_CACHE_KEY)
+    if counter is None:
+        # Seed from the clock so a re-created counter never matches a
+        # value some worker already holds a snapshot for.
+        cache.add(CATALOG_COUNTER_CACHE_KEY, int(time.time() * 1000), None)
+        counter = cache.get(CATALOG_COUNTER_CACHE_KEY)
+    return counter
+
+
+def bump_catalog_counter() -> None:
+    """Advance the shared catalog counter so every worker reloads lazily."""
+    try:
+        cache.incr(CATALOG_COUNTER_CACHE_KEY)
+    except ValueError:
+        get_catalog_counter()
+
+
+def get_catalog_snapshot() -> CatalogSnapshot:
+    """
+    Get the in-process catalog snapshot, reloading it if the catalog changed.
+
+    Costs one cache read per call; the database is only queried when the
+    shared counter has moved since the snapshot was built.
+
+    Returns:
+        CatalogSnapshot: The current catalog
+    """
+    global _snapshot
+    counter = get_catalog_counter()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == counter:
+        return snapshot
+
+    with _snapshot_lock:
+        if _snapshot is not None and _snapshot.version == counter:
+            return _snapshot
+        rows = InsurancePlan.objects.order_by('id').values_list(*PlanRecord.FIELDS)
+        _snapshot = CatalogSnapshot(counter, (PlanRecord(row) for row in rows))
+        return _snapshot
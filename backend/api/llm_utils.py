@@ -1,22 +1,83 @@
 import os
+import asyncio
+import time
 from typing import Dict, Any, List
-import google.generativeai as genai
-from dotenv import load_dotenv
+from asgiref.sync import sync_to_async
+from django.conf import settings
 
-# Load environment variables
-load_dotenv()
+from backend import llm_quota, prompts
+from gemini_client import LLMUnavailable, breaker, get_model, sdk, use_fake_backend
 
-# Configure the Gemini API
-genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+RECOMMENDATION_PROMPT = """
+    As an insurance expert, provide a detailed recommendation for a person with the following profile:
+    - Age: {age}
+    - Budget: ${budget}
+    - Family Size: {family_size}
+    - Medical History: {medical_history}
+
+    Please provide specific insurance recommendations considering their profile.
+    Include coverage suggestions and budget considerations.
+    """
+
+FEEDBACK_PROMPT = """
+    Analyze the following insurance feedback and provide:
+    1. Overall sentiment (positive/negative/neutral)
+    2. Key points mentioned
+    3. Any specific concerns or praise
+
+    Feedback: {feedback}
+    """
+
+_configured = False
+
+def configure_sdk() -> None:
+    """Configure the Gemini SDK once per process; .env is loaded by settings."""
+    global _configured
+    if not _configured:
+        sdk().configure(api_key=os.getenv('GOOGLE_API_KEY'))
+        _configured = True
 
 class GeminiHandler:
     def __init__(self):
         """Initialize the Gemini model."""
         try:
-            self.model = genai.GenerativeModel('gemini-pro')
+            if use_fake_backend():
+                self.model = get_model()
+            else:
+                configure_sdk()
+                self.model = sdk().GenerativeModel('gemini-pro')
         except Exception as e:
             raise Exception(f"Failed to initialize Gemini model: {str(e)}")
 
+    async def _generate(self, prompt: str, priority: str = llm_quota.INTERACTIVE, user_id=None) -> str:
+        """Run a prompt under the shared quota, the Gemini deadline and the circuit breaker."""
+        if breaker.is_open():
+            raise LLMUnavailable('Gemini circuit is open')
+        tokens = llm_quota.estimate_tokens(prompt)
+        try:
+            await llm_quota.aacquire(tokens, priority, user_id)
+        except llm_quota.QuotaExceeded as e:
+            raise LLMUnavailable(str(e)) from e
+        if not breaker.allow():
+            raise LLMUnavailable('Gemini circuit is open')
+
+        timeout = getattr(settings, 'GEMINI_TIMEOUT', 10.0)
+        start = time.monotonic()
+        try:
+            response = await asyncio.wait_for(
+                self.model.generate_content_async(prompt, request_options={'timeout': timeout}),
+                timeout
+            )
+            text = response.text
+            prompts.log_usage('GeminiHandler', prompt, response)
+        except Exception as e:
+            breaker.record(False, time.monotonic() - start)
+            raise LLMUnavailable(str(e) or type(e).__name__) from e
+        breaker.record(True, time.monotonic() - start)
+        usage = getattr(getattr(response, 'usage_metadata', None), 'total_token_count', None)
+        await sync_to_async(llm_quota.record_usage)(tokens, usage or None, user_id)
+        return text
+
     async def generate_insurance_recommendation(self, user_data: Dict[str, Any]) -> str:
         """
         Generate insurance recommendations based on user data.
@@ -28,45 +89,36 @@ class GeminiHandler:
             str: Generated recommendation
         """
         try:
-            prompt = f"""
-            As an insurance expert, provide a detailed recommendation for a person with the following profile:
-            - Age: {user_data.get('age', 'N/A')}
-            - Budget: ${user_data.get('budget', 'N/A')}
-            - Family Size: {user_data.get('family_size', 'N/A')}
-            - Medical History: {user_data.get('medical_history', 'N/A')}
-
-            Please provide specific insurance recommendations considering their profile.
-            Include coverage suggestions and budget considerations.
-            """
+            prompt = prompts.build_prompt(
+                RECOMMENDATION_PROMPT,
+                age=user_data.get('age'),
+                budget=user_data.get('budget'),
+                family_size=user_data.get('family_size'),
+                medical_history=user_data.get('medical_history')
+            )
             
-            response = self.model.generate_content(prompt)
-            return response.text
+            return await self._generate(prompt)
         except Exception as e:
             raise Exception(f"Failed to generate recommendation: {str(e)}")
 
-    async def analyze_feedback(self, feedback_text: str) -> Dict[str, Any]:
+    async def analyze_feedback(self, feedback_text: str,
+                               priority: str = llm_quota.INTERACTIVE) -> Dict[str, Any]:
         """
         Analyze user feedback using Gemini.
         
         Args:
             feedback_text: The feedback text to analyze
+            priority: Quota class; summaries of new feedback run as BACKGROUND
             
         Returns:
             Dict containing sentiment and key points
         """
         try:
-            prompt = f"""
-            Analyze the following insurance feedback and provide:
-            1. Overall sentiment (positive/negative/neutral)
-            2. Key points mentioned
-            3. Any specific concerns or praise
-
-            Feedback: {feedback_text}
-            """
+            prompt = prompts.build_prompt(FEEDBACK_PROMPT, feedback=feedback_text)
             
-            response = self.model.generate_content(prompt)
+            analysis = await self._generate(prompt, priority)
             return {
-                'analysis': response.text,
+                'analysis': analysis,
                 'original_feedback': feedback_text
             }
         except Exception as e:
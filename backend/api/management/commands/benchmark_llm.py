@@ -0,0 +1,63 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend import fake_gemini, llm_quota
+from gemini_client import LLMUnavailable, breaker, generate, use_fake_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Drives gemini_client.generate from concurrent threads against the fake Gemini backend '
+        '(GEMINI_BACKEND=fake) and reports throughput, latency and how many calls were '
+        'refused by the deadline, quota or circuit breaker. Tune the fake with GEMINI_FAKE_* '
+        'environment variables.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200, help='Calls per concurrency level')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32],
+                            help='Numbers of concurrent callers to test')
+
+    def handle(self, *args, **options):
+        if not use_fake_backend():
+            raise CommandError('Refusing to benchmark the real API; set GEMINI_BACKEND=fake')
+
+        self.stdout.write(f'{"threads":>8} {"calls/s":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"failed":>7}')
+        for threads in options['concurrency']:
+            fake_gemini.reset()
+            breaker.reset()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                results = list(pool.map(self._call, range(options['calls'])))
+            elapsed = time.perf_counter() - start
+
+            latencies = sorted(latency for ok, latency in results if ok)
+            failed = len(results) - len(latencies)
+            if latencies:
+                p50 = statistics.median(latencies)
+                p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            else:
+                p50 = p95 = p99 = float('nan')
+            self.stdout.write(
+                f'{threads:>8} {len(latencies) / elapsed:>8.1f} '
+                f'{p50:>7.2f}s {p95:>7.2f}s {p99:>7.2f}s {failed:>7}'
+            )
+        metrics = llm_quota.get_metrics()[llm_quota.INTERACTIVE]
+        self.stdout.write(
+            f'Quota: {metrics["admitted"]} admitted, {metrics["rejected"]} rejected, '
+            f'{metrics["avg_wait_ms"]} ms average wait; breaker {breaker.state}'
+        )
+
+    def _call(self, index: int):
+        """Run one prompt; returns (succeeded, latency in seconds)."""
+        start = time.perf_counter()
+        try:
+            generate(f'Benchmark prompt {index}')
+            ok = True
+        except LLMUnavailable:
+            ok = False
+        return ok, time.perf_counter() - start
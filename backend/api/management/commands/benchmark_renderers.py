@@ -0,0 +1,61 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = 'Compares JSONRenderer and ORJSONRenderer throughput on a large plan list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--plans', type=int, default=100000, help='Number of plans in the payload')
+        parser.add_argument('--repeat', type=int, default=5, help='Renders per renderer; the best run counts')
+
+    def handle(self, *args, **options):
+        payload = self._build_payload(options['plans'])
+        expected = JSONRenderer().render(payload)
+        if ORJSONRenderer().render(payload) != expected:
+            raise CommandError('ORJSONRenderer output differs from JSONRenderer')
+
+        size_mb = len(expected) / (1024 * 1024)
+        self.stdout.write(f'Payload: {options["plans"]} plans, {size_mb:.1f} MB')
+        timings = {}
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            best = min(self._time(renderer, payload) for _ in range(options['repeat']))
+            timings[type(renderer).__name__] = best
+            self.stdout.write(
+                f'{type(renderer).__name__:>15}: {best:.3f}s, '
+                f'{options["plans"] / best:,.0f} plans/s, {size_mb / best:.1f} MB/s'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Speedup: {timings["JSONRenderer"] / timings["ORJSONRenderer"]:.1f}x'
+        ))
+
+    def _time(self, renderer, payload) -> float:
+        start = time.perf_counter()
+        renderer.render(payload, 'application/json', {})
+        return time.perf_counter() - start
+
+    def _build_payload(self, count: int):
+        """Build a plan list with raw Decimal and datetime values."""
+        now = timezone.now()
+        return [
+            {
+                'id': i,
+                'name': f'Plan {i}',
+                'plan_type': 'family' if i % 2 else 'basic',
+                'provider': f'Provider {i % 50}',
+                'coverage_details': 'Hospitalization, outpatient care and prescriptions',
+                'monthly_premium': Decimal(100 + i % 900) + Decimal('0.99'),
+                'deductible': Decimal(500 + i % 1500),
+                'copay': Decimal('20.00') if i % 3 else None,
+                'max_coverage': Decimal(100000 + i) + Decimal('0.50'),
+                'created_at': now - timedelta(minutes=i),
+            }
+            for i in range(count)
+        ]
@@ -0,0 +1,2 @@
+# The command is shared with the insurance app, which cannot import api.
+from backend.synthetic_data import Command  # noqa: F401
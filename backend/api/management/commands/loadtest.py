@@ -0,0 +1,286 @@
+import http.client
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+
+from api.catalog import bump_catalog_counter
+from api.models import User, InsurancePlan
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'baselines', 'http.json')
+USERNAME_PREFIX = 'loadtest-'
+
+# Share of actions per scenario after login
+SCENARIO_MIX = {
+    'plans_list': 40,
+    'plan_detail': 20,
+    'recommendations': 15,
+    'compare': 15,
+    'feedback_create': 10,
+}
+
+
+class Client:
+    """Keep-alive HTTP client for one virtual user."""
+
+    def __init__(self, base_url: str, timeout: float) -> None:
+        parts = urlsplit(base_url)
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        )
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.token: Optional[str] = None
+        self.connection = None
+
+    def request(self, method: str, path: str, body: Any = None) -> Tuple[int, Any]:
+        """Send a request; returns (status, decoded JSON or None). Status 0 means a transport error."""
+        headers = {'Accept': 'application/json'}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        try:
+            if self.connection is None:
+                self.connection = self.connection_class(self.netloc, timeout=self.timeout)
+            self.connection.request(method, self.prefix + path, body=data, headers=headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            return 0, None
+        try:
+            return response.status, json.loads(payload) if payload else None
+        except ValueError:
+            return response.status, None
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'HTTP load test against a running server: virtual users log in via /api/token/ and run '
+        'a weighted mix of plan browsing, recommendations, comparisons and feedback. Writes '
+        'per-endpoint RPS and p50/p95/p99 latency to JSON and compares them with a stored '
+        'baseline. Use --seed first to create the users and plans. Run the server with '
+        'GEMINI_BACKEND=fake so feedback summaries do not call the real API, and with '
+        'RATELIMIT_ENABLE=0 so per-user limits do not turn the mix into 429s.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000', help='Server base URL')
+        parser.add_argument('--seed', action='store_true',
+                            help='Create load-test users and plans in the database, then exit')
+        parser.add_argument('--users', type=int, default=200, help='Users to seed or log in as')
+        parser.add_argument('--plans', type=int, default=5000, help='Plans to seed')
+        parser.add_argument('--password', default='loadtest-password', help='Password of seeded users')
+        parser.add_argument('--concurrency', type=int, default=20, help='Simultaneous virtual users')
+        parser.add_argument('--duration', type=float, default=60.0, help='Seconds to run')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+        parser.add_argument('--random-seed', type=int, default=0, help='Seed for the scenario mix')
+        parser.add_argument('--output', default='loadtest-results.json', help='Where to write results')
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results to compare with')
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='Store this run as the new baseline')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed relative p95 increase or RPS drop before flagging')
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self._seed(options)
+            return
+        if options['concurrency'] > options['users']:
+            raise CommandError('--concurrency cannot exceed --users; each virtual user logs in as its own user')
+
+        results = self._run(options)
+        with open(options['output'], 'w', encoding='utf-8') as stream:
+            json.dump(results, stream, indent=2)
+        self._report(results)
+
+        if options['save_baseline']:
+            os.makedirs(os.path.dirname(options['baseline']), exist_ok=True)
+            with open(options['baseline'], 'w', encoding='utf-8') as stream:
+                json.dump(results, stream, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Saved baseline to {options["baseline"]}'))
+        elif os.path.exists(options['baseline']):
+            with open(options['baseline'], encoding='utf-8') as stream:
+                regressions = self._compare(results, json.load(stream), options['tolerance'])
+            if regressions:
+                raise CommandError(f'{len(regressions)} regressions against {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
+        else:
+            self.stdout.write(f'No baseline at {options["baseline"]}; rerun with --save-baseline to store one')
+
+    def _seed(self, options: Dict[str, Any]) -> None:
+        """Create load-test users and plans, replacing earlier load-test users."""
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        password = make_password(options['password'])
+        User.objects.bulk_create(
+            (
+                User(
+                    username=f'{USERNAME_PREFIX}{i}',
+                    password=password,
+                    name=f'Load Test {i}',
+                    age=20 + i % 50,
+                    budget=Decimal(1000 + i % 5000),
+                    family_size=1 + i % 5,
+                    medical_history='No major conditions.'
+                )
+                for i in range(options['users'])
+            ),
+            batch_size=1000
+        )
+        coverages = ['Individual adult coverage', 'Family coverage', 'Senior coverage', 'Family and adult coverage']
+        InsurancePlan.objects.bulk_create(
+            (
+                InsurancePlan(
+                    name=f'Load Test Plan {i}',
+                    coverage=coverages[i % len(coverages)],
+                    price=Decimal(500 + i % 9500),
+                    conditions='Standard conditions'
+                )
+                for i in range(options['plans'])
+            ),
+            batch_size=1000
+        )
+        # bulk_create does not send post_save
+        bump_catalog_counter()
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {options["users"]} users and {options["plans"]} plans'
+        ))
+
+    def _run(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        plan_ids = list(InsurancePlan.objects.values_list('id', flat=True)[:10000])
+        if not plan_ids:
+            raise CommandError('No plans in the database; run with --seed first')
+
+        samples: Dict[str, List[Tuple[float, bool]]] = {}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def record(endpoint: str, started: float, ok: bool) -> None:
+            with lock:
+                samples.setdefault(endpoint, []).append((time.perf_counter() - started, ok))
+
+        def virtual_user(index: int) -> None:
+            rng = random.Random(options['random_seed'] * 100003 + index)
+            client = Client(options['url'], options['timeout'])
+            started = time.perf_counter()
+            status, body = client.request('POST', '/api/token/', {
+                'username': f'{USERNAME_PREFIX}{index}',
+                'password': options['password'],
+            })
+            record('login', started, status == 200)
+            if status != 200 or not body:
+                return
+            client.token = body['access']
+
+            actions = list(SCENARIO_MIX)
+            weights = list(SCENARIO_MIX.values())
+            while time.monotonic() < deadline:
+                action = rng.choices(actions, weights)[0]
+                started = time.perf_counter()
+                if action == 'plans_list':
+                    status, _ = client.request('GET', f'/api/plans/?page={rng.randint(1, 50)}')
+                    ok = status in (200, 404)  # Pages past the end are a normal 404
+                elif action == 'plan_detail':
+                    status, _ = client.request('GET', f'/api/plans/{rng.choice(plan_ids)}/')
+                    ok = status == 200
+                elif action == 'recommendations':
+                    status, _ = client.request('GET', '/api/recommendations/')
+                    ok = status == 200
+                elif action == 'compare':
+                    status, _ = client.request('POST', '/api/plans/compare/', {
+                        'plan_ids': rng.sample(plan_ids, min(3, len(plan_ids)))
+                    })
+                    ok = status == 200
+                else:
+                    status, _ = client.request('POST', '/api/feedback/', {
+                        'rating': rng.randint(1, 5),
+                        'comments': 'Load test feedback about plan pricing and claims support.'
+                    })
+                    ok = status == 201
+                record(action, started, ok)
+            client.close()
+
+        wall_start = time.perf_counter()
+        threads = [
+            threading.Thread(target=virtual_user, args=(index,))
+            for index in range(options['concurrency'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - wall_start
+
+        endpoints = {}
+        for endpoint, values in sorted(samples.items()):
+            latencies = sorted(latency for latency, _ in values)
+            errors = sum(1 for _, ok in values if not ok)
+            endpoints[endpoint] = {
+                'requests': len(values),
+                'errors': errors,
+                'error_rate': round(errors / len(values), 4),
+                'rps': round(len(values) / elapsed, 2),
+                'p50_ms': round(statistics.median(latencies) * 1000, 1),
+                'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+            }
+        return {
+            'url': options['url'],
+            'concurrency': options['concurrency'],
+            'duration_s': round(elapsed, 1),
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'endpoints': endpoints,
+        }
+
+    def _report(self, results: Dict[str, Any]) -> None:
+        self.stdout.write(
+            f'{"endpoint":>16} {"requests":>9} {"rps":>8} {"p50":>9} {"p95":>9} {"p99":>9} {"errors":>7}'
+        )
+        for endpoint, stats in results['endpoints'].items():
+            self.stdout.write(
+                f'{endpoint:>16} {stats["requests"]:>9} {stats["rps"]:>8.1f} '
+                f'{stats["p50_ms"]:>7.1f}ms {stats["p95_ms"]:>7.1f}ms {stats["p99_ms"]:>7.1f}ms '
+                f'{stats["errors"]:>7}'
+            )
+
+    def _compare(self, results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+        """Print and return regressions against the baseline run."""
+        regressions = []
+        for endpoint, base in baseline['endpoints'].items():
+            current = results['endpoints'].get(endpoint)
+            if current is None:
+                regressions.append(f'{endpoint}: no requests in this run')
+                continue
+            if current['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+                regressions.append(f'{endpoint}: p95 {base["p95_ms"]}ms -> {current["p95_ms"]}ms')
+            if current['rps'] < base['rps'] * (1 - tolerance):
+                regressions.append(f'{endpoint}: rps {base["rps"]} -> {current["rps"]}')
+            if current['error_rate'] > base['error_rate'] + 0.01:
+                regressions.append(
+                    f'{endpoint}: error rate {base["error_rate"]:.2%} -> {current["error_rate"]:.2%}'
+                )
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(f'REGRESSION {regression}'))
+        return regressions
@@ -0,0 +1,70 @@
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Fires concurrent requests at an LLM-bound endpoint of a running server and reports '
+        'throughput and latency. Run it once against gunicorn (WSGI, e.g. '
+        '`gunicorn backend.wsgi -w 2`) and once against uvicorn (ASGI, e.g. '
+        '`uvicorn backend.asgi:application --workers 2`) to compare how many in-flight '
+        'LLM calls each deployment sustains.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Endpoint to call, e.g. http://localhost:8000/api/feedback/analytics/')
+        parser.add_argument('--token', required=True, help='JWT access token sent as a Bearer token')
+        parser.add_argument('--method', choices=['GET', 'POST'], default='GET')
+        parser.add_argument('--body', default=None, help='JSON body for POST requests')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50, 100],
+                            help='Numbers of simultaneous clients to test')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per concurrency level')
+        parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds')
+
+    def handle(self, *args, **options):
+        if options['body'] is not None:
+            try:
+                json.loads(options['body'])
+            except json.JSONDecodeError as e:
+                raise CommandError(f'--body is not valid JSON: {e}')
+
+        self.stdout.write(f'{"clients":>8} {"req/s":>8} {"p50":>8} {"p95":>8} {"errors":>7}')
+        for clients in options['concurrency']:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                results = list(pool.map(lambda _: self._call(options), range(options['requests'])))
+            elapsed = time.perf_counter() - start
+
+            latencies = sorted(latency for ok, latency in results if ok)
+            errors = len(results) - len(latencies)
+            if latencies:
+                p50 = statistics.median(latencies)
+                p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            else:
+                p50 = p95 = float('nan')
+            self.stdout.write(
+                f'{clients:>8} {len(latencies) / elapsed:>8.1f} {p50:>7.2f}s {p95:>7.2f}s {errors:>7}'
+            )
+
+    def _call(self, options):
+        """Send one request; returns (succeeded, latency in seconds)."""
+        data = options['body'].encode('utf-8') if options['body'] is not None else None
+        request = urllib.request.Request(options['url'], data=data, method=options['method'])
+        request.add_header('Authorization', f'Bearer {options["token"]}')
+        if data is not None:
+            request.add_header('Content-Type', 'application/json')
+
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=options['timeout']) as response:
+                response.read()
+                ok = response.status < 400
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return ok, time.perf_counter() - start
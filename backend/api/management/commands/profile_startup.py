@@ -0,0 +1,2 @@
+# The command is shared with the insurance app, which cannot import api.
+from backend.startup_profile import Command  # noqa: F401
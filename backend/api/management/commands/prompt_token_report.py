@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+
+from api.llm_utils import FEEDBACK_PROMPT, RECOMMENDATION_PROMPT
+from api.models import User, InsurancePlan, Feedback
+from backend.prompts import build_prompt, count_tokens
+from gemini_client import ANALYSIS_PROMPT
+
+
+class Command(BaseCommand):
+    help = 'Compares prompt tokens for verbatim and compacted prompts over the data in the database'
+
+    def handle(self, *args, **options):
+        rows = [
+            ('recommendation', self._recommendation_prompts()),
+            ('plan analysis', self._analysis_prompts()),
+            ('feedback analysis', self._feedback_prompts()),
+        ]
+        self.stdout.write(f'{"prompt":>18} {"calls":>6} {"verbatim":>9} {"compact":>8} {"saved":>6}')
+        for label, pairs in rows:
+            if not pairs:
+                self.stdout.write(f'{label:>18} {0:>6}')
+                continue
+            verbatim = sum(count_tokens(raw) for raw, _ in pairs) / len(pairs)
+            compact = sum(count_tokens(built) for _, built in pairs) / len(pairs)
+            self.stdout.write(
+                f'{label:>18} {len(pairs):>6} {verbatim:>9.1f} {compact:>8.1f} '
+                f'{1 - compact / verbatim:>6.0%}'
+            )
+
+    def _pair(self, template: str, **fields):
+        """The prompt as previously sent (raw values, indented template) and as built now."""
+        return template.format(**fields), build_prompt(template, **fields)
+
+    def _recommendation_prompts(self):
+        return [
+            self._pair(
+                RECOMMENDATION_PROMPT,
+                age=user.age,
+                budget=user.budget,
+                family_size=user.family_size,
+                medical_history=user.medical_history
+            )
+            for user in User.objects.only('age', 'budget', 'family_size', 'medical_history').iterator()
+        ]
+
+    def _analysis_prompts(self):
+        return [
+            self._pair(
+                ANALYSIS_PROMPT,
+                name=plan.name,
+                coverage=plan.coverage,
+                price=float(plan.price),
+                conditions=plan.conditions
+            )
+            for plan in InsurancePlan.objects.iterator()
+        ]
+
+    def _feedback_prompts(self):
+        comments = list(Feedback.objects.order_by('-created_at').values_list('comments', flat=True)[:5])
+        if not comments:
+            return []
+        return [self._pair(FEEDBACK_PROMPT, feedback='\n'.join(comments))]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-19 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='summary',
+            field=models.TextField(blank=True, help_text='AI-generated summary of the feedback'),
+        ),
+    ]
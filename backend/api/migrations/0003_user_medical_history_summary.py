@@ -0,0 +1,29 @@
+# Generated by Django 5.0.2 on 2026-10-19 17:02
+
+from django.db import migrations, models
+
+from backend.prompts import condense_medical_history
+
+
+def condense_existing_histories(apps, schema_editor):
+    User = apps.get_model('api', 'User')
+    for user in User.objects.exclude(medical_history='').only('medical_history').iterator():
+        summary = condense_medical_history(user.medical_history)
+        if summary:
+            User.objects.filter(pk=user.pk).update(medical_history_summary=summary)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_feedback_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='medical_history_summary',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(condense_existing_histories, migrations.RunPython.noop),
+    ]
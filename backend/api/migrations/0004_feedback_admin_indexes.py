@@ -0,0 +1,21 @@
+# Generated by Django 5.0.2 on 2026-10-19 17:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_user_medical_history_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['created_at'], name='api_feedbac_created_2f98c8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['rating', 'created_at'], name='api_feedbac_rating_f3dd89_idx'),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from typing import Optional
 
+from backend.prompts import condense_medical_history
+
 class User(AbstractUser):
     """Custom user model for the health insurance system."""
     name = models.CharField(max_length=255)
@@ -9,11 +11,25 @@ class User(AbstractUser):
     budget = models.DecimalField(max_digits=10, decimal_places=2, null=True)
     family_size = models.IntegerField(null=True)
     medical_history = models.TextField(blank=True)
+    medical_history_summary = models.TextField(blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self) -> str:
         return self.username
 
+    def save(self, *args, **kwargs) -> None:
+        """Keep the condensed medical history in step with the full text."""
+        self.medical_history_summary = condense_medical_history(self.medical_history)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'medical_history' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'medical_history_summary'}
+        super().save(*args, **kwargs)
+
+    @property
+    def prompt_medical_history(self) -> str:
+        """Medical history as sent to the LLM."""
+        return self.medical_history_summary or self.medical_history
+
 class InsurancePlan(models.Model):
     """Model for storing insurance plan details."""
     name = models.CharField(max_length=255)
@@ -40,6 +56,10 @@ class Feedback(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['rating', 'created_at']),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user.username}'s feedback - {self.rating} stars"
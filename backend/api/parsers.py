@@ -0,0 +1,32 @@
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSON parser backed by orjson.
+
+    orjson only reads UTF-8, which is what clients send in practice; other
+    declared encodings are transcoded first. Like the strict stdlib parser,
+    NaN and Infinity constants are rejected.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Parses the incoming bytestream as JSON and returns the resulting data.
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            body = stream.read()
+            if encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+                body = body.decode(encoding).encode('utf-8')
+            return orjson.loads(body)
+        except (ValueError, LookupError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
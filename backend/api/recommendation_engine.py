@@ -1,7 +1,16 @@
-from typing import Dict, List, Any
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Union
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
 from .models import InsurancePlan
+from .catalog import PlanRecord, get_catalog_snapshot
 
-def calculate_plan_score(plan: InsurancePlan, user_data: Dict[str, Any]) -> float:
+RECOMMENDATION_CACHE_PREFIX = 'api_recommendations'
+
+def calculate_plan_score(plan: Union[InsurancePlan, PlanRecord], user_data: Dict[str, Any]) -> float:
     """
     Calculate a suitability score for a plan based on user data.
     
@@ -13,6 +22,7 @@ def calculate_plan_score(plan: InsurancePlan, user_data: Dict[str, Any]) -> floa
         float: Suitability score between 0 and 1
     """
     score = 1.0
+    coverage = plan.coverage.lower()
     
     # Budget compatibility (0.4 weight)
     if user_data.get('budget'):
@@ -26,36 +36,85 @@ def calculate_plan_score(plan: InsurancePlan, user_data: Dict[str, Any]) -> floa
     # Family size consideration (0.3 weight)
     if user_data.get('family_size'):
         family_size = int(user_data['family_size'])
-        if family_size > 1 and 'family' in plan.coverage.lower():
+        if family_size > 1 and 'family' in coverage:
             score *= 1.3
-        elif family_size == 1 and 'individual' in plan.coverage.lower():
+        elif family_size == 1 and 'individual' in coverage:
             score *= 1.3
     
     # Age consideration (0.3 weight)
     if user_data.get('age'):
         age = int(user_data['age'])
-        if age > 60 and 'senior' in plan.coverage.lower():
+        if age > 60 and 'senior' in coverage:
             score *= 1.3
-        elif 18 <= age <= 60 and 'adult' in plan.coverage.lower():
+        elif 18 <= age <= 60 and 'adult' in coverage:
             score *= 1.3
     
     return min(1.0, score)  # Cap score at 1.0
 
-def get_recommendations(user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+def profile_bucket(user_data: Dict[str, Any]) -> Tuple:
     """
-    Get personalized insurance plan recommendations based on user data.
-    
-    Args:
-        user_data: Dictionary containing user information including:
-                  - budget (Decimal)
-                  - age (int)
-                  - family_size (int)
-                  - medical_history (str)
-    
-    Returns:
-        List[Dict]: List of recommended plans with suitability scores
+    Reduce user data to what `calculate_plan_score` distinguishes.
+
+    Users in the same bucket get identical recommendations: age and family
+    size only matter by band, while budget matters exactly. Keep this in step
+    with `calculate_plan_score`.
     """
-    plans = InsurancePlan.objects.all()
+    budget = float(user_data['budget']) if user_data.get('budget') else None
+
+    family = None
+    if user_data.get('family_size'):
+        family_size = int(user_data['family_size'])
+        family = 'family' if family_size > 1 else 'individual' if family_size == 1 else 'other'
+
+    age_band = None
+    if user_data.get('age'):
+        age = int(user_data['age'])
+        age_band = 'senior' if age > 60 else 'adult' if 18 <= age <= 60 else 'other'
+
+    return budget, age_band, family
+
+
+class RecommendationMemo:
+    """In-process LRU of top recommendations for one catalog version."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.version: Optional[int] = None
+        self._entries: 'OrderedDict[Tuple, List[Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version: int, bucket: Tuple) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            if version != self.version:
+                # The catalog changed; every entry is stale
+                self._entries.clear()
+                self.version = version
+                return None
+            entry = self._entries.get(bucket)
+            if entry is not None:
+                self._entries.move_to_end(bucket)
+            return entry
+
+    def set(self, version: int, bucket: Tuple, recommendations: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[bucket] = recommendations
+            self._entries.move_to_end(bucket)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.version = None
+
+
+_memo = RecommendationMemo(getattr(settings, 'RECOMMENDATION_MEMO_SIZE', 4096))
+
+
+def rank_plans(plans: Sequence[Union[InsurancePlan, PlanRecord]], user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Score every plan and return the top 5."""
     recommendations = []
     
     for plan in plans:
@@ -75,3 +134,40 @@ def get_recommendations(user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     recommendations.sort(key=lambda x: x['suitability_score'], reverse=True)
     
     return recommendations[:5]  # Return top 5 recommendations
+
+def get_recommendations(user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Get personalized insurance plan recommendations based on user data.
+
+    Results are memoized per catalog version and profile bucket, in process
+    and, with RECOMMENDATION_SHARED_CACHE on, in the shared cache, so repeat
+    requests from the same or similar users skip scoring. A plan change moves
+    the catalog version, which invalidates every entry.
+    
+    Args:
+        user_data: Dictionary containing user information including:
+                  - budget (Decimal)
+                  - age (int)
+                  - family_size (int)
+                  - medical_history (str)
+    
+    Returns:
+        List[Dict]: List of recommended plans with suitability scores
+    """
+    snapshot = get_catalog_snapshot()
+    bucket = profile_bucket(user_data)
+    recommendations = _memo.get(snapshot.version, bucket)
+
+    if recommendations is None:
+        shared = getattr(settings, 'RECOMMENDATION_SHARED_CACHE', False)
+        cache_key = f'{RECOMMENDATION_CACHE_PREFIX}:{snapshot.version}:' + ':'.join(map(str, bucket))
+        if shared:
+            recommendations = cache.get(cache_key)
+        if recommendations is None:
+            recommendations = rank_plans(snapshot.plans, user_data)
+            if shared:
+                cache.set(cache_key, recommendations, getattr(settings, 'RECOMMENDATION_SHARED_TTL', 3600))
+        _memo.set(snapshot.version, bucket, recommendations)
+
+    # Callers may modify the result; keep the memoized copy intact
+    return [dict(recommendation) for recommendation in recommendations]
@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+# Types orjson cannot encode itself go through DRF's encoder rules
+_drf_default = encoders.JSONEncoder().default
+
+# orjson writes datetimes, dates and times exactly like DRF's encoder,
+# provided UTC offsets are spelled as 'Z'
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """Encode Decimal like DRF's encoder without its isinstance chain."""
+    if type(obj) is Decimal:
+        return float(obj)
+    return _drf_default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson.
+
+    Output matches `JSONRenderer` for compact, unicode responses: Decimal,
+    datetime, date and time values are encoded by DRF's rules. Indented
+    output (e.g. for the browsable API) and non-default JSON settings fall
+    back to `JSONRenderer`.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON, returning a bytestring.
+        """
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if (self.ensure_ascii or not self.compact or
+                self.get_indent(accepted_media_type, renderer_context) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which the stdlib encoder accepts
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Keep the output a strict javascript subset, like JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
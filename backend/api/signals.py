@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from backend.authentication import bump_profile_version
+from .models import InsurancePlan, User
+from .catalog import bump_catalog_counter
+
+
+@receiver(post_save, sender=InsurancePlan)
+@receiver(post_delete, sender=InsurancePlan)
+def plan_catalog_changed(sender, instance: InsurancePlan, **kwargs) -> None:
+    """Invalidate the in-process plan catalog on every worker."""
+    bump_catalog_counter()
+    # Bump again once committed, so workers that reloaded mid-transaction
+    # do not keep a snapshot of the uncommitted state.
+    transaction.on_commit(bump_catalog_counter)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_profile_changed(sender, instance: User, **kwargs) -> None:
+    """Make token profile claims and cached copies of the user stale."""
+    bump_profile_version(instance.pk)
+    transaction.on_commit(lambda: bump_profile_version(instance.pk))
@@ -0,0 +1,58 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from api.models import User, Feedback
+from backend.admin_utils import EstimatedCountPaginator
+
+class TestLargeTableAdmin(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass', name='Admin')
+        users = User.objects.bulk_create(User(username=f'user{i}', name=f'User {i}') for i in range(20))
+        Feedback.objects.bulk_create(
+            Feedback(user=users[i % len(users)], rating=1 + i % 5, comments='Fine') for i in range(60)
+        )
+        self.client.force_login(self.admin)
+
+    def test_feedback_changelist_queries_do_not_grow_with_rows(self):
+        """Test users are joined into the list query instead of loaded per row"""
+        url = reverse('admin:api_feedback_changelist')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'user0')
+        self.assertLess(len(context.captured_queries), 10)
+        # Only the session's own user lookup
+        user_lookups = [query for query in context.captured_queries if '"api_user"."id" =' in query['sql']]
+        self.assertEqual(len(user_lookups), 1)
+
+    def test_filtered_count_is_capped(self):
+        """Test filtered lists count at most count_limit rows"""
+        class SmallLimit(EstimatedCountPaginator):
+            count_limit = 5
+
+        self.assertEqual(SmallLimit(Feedback.objects.filter(rating__gte=1), 10).count, 5)
+        self.assertEqual(SmallLimit(Feedback.objects.filter(rating=1), 10).count, 5)
+        self.assertEqual(SmallLimit(Feedback.objects.all(), 10).count, 60)
+
+    def test_changelist_skips_full_count(self):
+        """Test a filtered changelist does not also count the whole table"""
+        url = reverse('admin:api_feedback_changelist') + '?rating__exact=3'
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        counts = [query['sql'] for query in context.captured_queries if 'COUNT(' in query['sql']]
+        self.assertTrue(counts)
+        self.assertTrue(all('WHERE' in sql for sql in counts))
+
+    def test_date_hierarchy_without_distinct_scan(self):
+        """Test the date drilldown is built from the first and last rows"""
+        url = reverse('admin:api_feedback_changelist')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertContains(response, 'created_at__day=')
+        sql = [query['sql'] for query in context.captured_queries]
+        self.assertFalse(any('django_datetime_trunc' in query or 'MIN(' in query for query in sql))
+
+        response = self.client.get(url + '?q=user19')
+        self.assertEqual(response.context['cl'].result_count, 3)
@@ -0,0 +1,63 @@
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from api.models import User, InsurancePlan
+
+
+class TestProfileClaimsAuthentication(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='claims',
+            password='testpass123',
+            age=30,
+            budget=Decimal('5000.00'),
+            family_size=2,
+            medical_history='No issues'
+        )
+        self.plan = InsurancePlan.objects.create(
+            name='Family Plan',
+            coverage='Family Coverage',
+            price=Decimal('3000.00'),
+            conditions='Standard conditions'
+        )
+        response = self.client.post(reverse('token_obtain_pair'),
+                                    {'username': 'claims', 'password': 'testpass123'}, format='json')
+        self.token = response.data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_token_carries_profile_claims(self):
+        """Test issued tokens include the versioned profile claim"""
+        claims = AccessToken(self.token)['profile']
+        self.assertEqual(claims['v'], 1)
+        self.assertEqual(claims['budget'], '5000.00')
+        self.assertEqual(claims['family_size'], 2)
+        self.assertNotIn('medical_history', claims)
+
+    def test_hot_endpoints_run_without_queries(self):
+        """Test recommendations and eligibility need no database queries once the catalog is loaded"""
+        self.client.get(reverse('recommendation-list'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('recommendation-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['recommended_plans'][0]['id'], self.plan.id)
+
+    def test_profile_save_makes_claims_stale(self):
+        """Test a saved profile change applies to existing tokens on the next request"""
+        url = reverse('insuranceplan-eligible', args=[self.plan.id])
+        self.assertTrue(self.client.post(url).data['eligible'])
+        self.user.budget = Decimal('1000.00')
+        self.user.save()
+        self.assertFalse(self.client.post(url).data['eligible'])
+
+    def test_deactivated_user_is_rejected(self):
+        """Test deactivating a user rejects tokens issued before"""
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse('recommendation-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,45 @@
+from django.test import TestCase
+from decimal import Decimal
+from api.models import InsurancePlan
+from api.catalog import PlanRecord, get_catalog_snapshot
+
+class TestCatalogSnapshot(TestCase):
+    def setUp(self):
+        self.plan = InsurancePlan.objects.create(
+            name='Family Plan',
+            coverage='Family Coverage',
+            price=Decimal('4000.00'),
+            conditions='Standard conditions'
+        )
+
+    def test_snapshot_contains_plans(self):
+        """Test snapshot exposes plan records by id"""
+        snapshot = get_catalog_snapshot()
+        record = snapshot.get(self.plan.id)
+        self.assertIsInstance(record, PlanRecord)
+        self.assertEqual(record.name, 'Family Plan')
+        self.assertEqual(record.price, Decimal('4000.00'))
+        self.assertEqual(record.price_per_month, self.plan.price_per_month)
+
+    def test_snapshot_reused_without_queries(self):
+        """Test unchanged catalog is served without hitting the database"""
+        snapshot = get_catalog_snapshot()
+        with self.assertNumQueries(0):
+            self.assertIs(get_catalog_snapshot(), snapshot)
+
+    def test_snapshot_reloads_on_save(self):
+        """Test saving or deleting a plan refreshes the snapshot"""
+        get_catalog_snapshot()
+        self.plan.name = 'Renamed Plan'
+        self.plan.save()
+        self.assertEqual(get_catalog_snapshot().get(self.plan.id).name, 'Renamed Plan')
+
+        plan_id = self.plan.id
+        self.plan.delete()
+        self.assertIsNone(get_catalog_snapshot().get(plan_id))
+
+    def test_record_is_read_only(self):
+        """Test plan records cannot be modified"""
+        record = get_catalog_snapshot().get(self.plan.id)
+        with self.assertRaises(AttributeError):
+            record.price = Decimal('1.00')
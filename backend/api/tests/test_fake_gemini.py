@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from google.api_core import exceptions
+from backend import fake_gemini
+from backend.fake_gemini import FakeGenerativeModel
+import gemini_client
+
+FAST = {'latency_ms': 1, 'latency_sigma': 0, 'error_rate': 0, 'rate_limit_rate': 0, 'chunks': 3, 'seed': 1}
+
+@override_settings(GEMINI_BACKEND='fake', GEMINI_FAKE=FAST)
+class TestFakeGemini(TestCase):
+    def setUp(self):
+        cache.clear()
+        fake_gemini.reset()
+        gemini_client.breaker.reset()
+        self.addCleanup(gemini_client.breaker.reset)
+
+    def test_replies_are_deterministic(self):
+        """Test the same prompt always gets the same reply and usage"""
+        model = FakeGenerativeModel()
+        first = model.generate_content('Analyze this plan')
+        second = model.generate_content('Analyze this plan')
+        self.assertEqual(first.text, second.text)
+        self.assertNotEqual(first.text, model.generate_content('Another prompt').text)
+        self.assertEqual(first.usage_metadata.total_token_count,
+                         first.usage_metadata.prompt_token_count + first.usage_metadata.candidates_token_count)
+
+    def test_streaming_chunks(self):
+        """Test streamed replies arrive in chunks that join to the full text"""
+        response = FakeGenerativeModel().generate_content('Analyze this plan', stream=True)
+        chunks = [chunk.text for chunk in response]
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(''.join(chunks), response.text)
+
+    def test_failures_and_deadlines(self):
+        """Test configured 429s, errors and timeouts raise the SDK's exceptions"""
+        model = FakeGenerativeModel()
+        with override_settings(GEMINI_FAKE={**FAST, 'rate_limit_rate': 1}):
+            with self.assertRaises(exceptions.ResourceExhausted):
+                model.generate_content('prompt')
+        with override_settings(GEMINI_FAKE={**FAST, 'error_rate': 1}):
+            with self.assertRaises(exceptions.InternalServerError):
+                model.generate_content('prompt')
+        with override_settings(GEMINI_FAKE={**FAST, 'latency_ms': 500}):
+            with self.assertRaises(exceptions.DeadlineExceeded):
+                model.generate_content('prompt', request_options={'timeout': 0.01})
+
+    def test_gemini_client_uses_fake_backend(self):
+        """Test gemini_client runs offline with the fake backend selected"""
+        analysis = gemini_client.analyze_insurance_plan(
+            {'name': 'Basic', 'coverage': 'Hospital', 'price': 100.0, 'conditions': 'None'}
+        )
+        self.assertTrue(analysis.startswith('[fake-gemini '))
+        with override_settings(GEMINI_FAKE={**FAST, 'error_rate': 1}):
+            with self.assertRaises(gemini_client.LLMUnavailable):
+                gemini_client.generate('prompt')
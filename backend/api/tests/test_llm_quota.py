@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from backend import llm_quota
+
+@override_settings(LLM_REQUESTS_PER_MINUTE=4, LLM_TOKENS_PER_MINUTE=1000,
+                   LLM_BACKGROUND_SHARE=0.5, LLM_USER_DAILY_TOKENS=300)
+class TestLLMQuota(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_background_limited_to_its_share(self):
+        """Test background calls stop at their share while interactive calls continue"""
+        self.assertTrue(llm_quota.try_admit(10, llm_quota.BACKGROUND))
+        self.assertTrue(llm_quota.try_admit(10, llm_quota.BACKGROUND))
+        self.assertFalse(llm_quota.try_admit(10, llm_quota.BACKGROUND))
+        self.assertTrue(llm_quota.try_admit(10, llm_quota.INTERACTIVE))
+        self.assertTrue(llm_quota.try_admit(10, llm_quota.INTERACTIVE))
+        self.assertFalse(llm_quota.try_admit(10, llm_quota.INTERACTIVE))
+        self.assertEqual(llm_quota.get_metrics()['window']['requests'], 4)
+
+    def test_token_limit_rolls_back_request(self):
+        """Test a call over the token limit claims nothing"""
+        self.assertFalse(llm_quota.try_admit(2000))
+        window = llm_quota.get_metrics()['window']
+        self.assertEqual(window['requests'], 0)
+        self.assertEqual(window['tokens'], 0)
+
+    def test_background_yields_to_queued_interactive(self):
+        """Test background calls are refused while interactive calls wait"""
+        cache.set('llm_quota:metrics:queued:interactive', 1)
+        self.assertFalse(llm_quota.try_admit(10, llm_quota.BACKGROUND))
+
+    def test_acquire_times_out_and_counts_rejection(self):
+        """Test a queued call is rejected at its deadline"""
+        for _ in range(4):
+            llm_quota.acquire(10)
+        with self.assertRaises(llm_quota.QuotaExceeded):
+            llm_quota.acquire(10, timeout=0.3)
+        metrics = llm_quota.get_metrics()[llm_quota.INTERACTIVE]
+        self.assertEqual(metrics['admitted'], 4)
+        self.assertEqual(metrics['rejected'], 1)
+        self.assertEqual(metrics['queued'], 0)
+
+    def test_user_budget_enforced(self):
+        """Test users cannot spend past their daily token budget"""
+        llm_quota.acquire(200, user_id=7)
+        llm_quota.record_usage(200, 250, user_id=7)
+        self.assertEqual(llm_quota.get_metrics()['window']['tokens'], 250)
+        with self.assertRaises(llm_quota.QuotaExceeded):
+            llm_quota.acquire(100, user_id=7)
+        llm_quota.acquire(100, user_id=8)
@@ -0,0 +1,29 @@
+from django.test import TestCase
+from api.models import InsurancePlan
+from backend import microbench
+
+
+class TestMicrobench(TestCase):
+    def test_run_times_each_size_and_rolls_back(self):
+        """Test every size gets timings and rows created during setup are discarded"""
+        def create_and_count(size):
+            InsurancePlan.objects.bulk_create(
+                InsurancePlan(name=f'Plan {i}', coverage='Basic', price=100, conditions='None')
+                for i in range(size)
+            )
+            return lambda: InsurancePlan.objects.count()
+
+        bench = microbench.Benchmark('plans.count', create_and_count, (1, 5, 50))
+        results = microbench.run([bench], rounds=2, min_time=0.01, max_size=10)
+        self.assertEqual(list(results), ['plans.count[1]', 'plans.count[5]'])
+        self.assertEqual(results['plans.count[1]']['rounds'], 2)
+        self.assertGreater(results['plans.count[5]']['median_ms'], 0)
+        self.assertEqual(InsurancePlan.objects.count(), 0)
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        """Test only timings that grew past the tolerance are reported"""
+        previous = {'a': {'min_ms': 1.0}, 'b': {'min_ms': 1.0}}
+        current = {'a': {'min_ms': 1.1}, 'b': {'min_ms': 1.5}, 'new': {'min_ms': 9.0}}
+        regressions = microbench.compare(current, previous, tolerance=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('b: '))
@@ -0,0 +1,54 @@
+from django.test import TestCase
+from api.models import User
+from backend import prompts
+
+LONG_HISTORY = (
+    'Diagnosed with type 2 diabetes in 2015 and takes insulin daily.   \n\n'
+    'Enjoys gardening and long walks on the beach with the dog every weekend. '
+    'Visited Paris and loved the museums, the food and the old architecture. '
+    'Had knee surgery in 2020 after a sports injury. '
+    'Enjoys gardening and long walks on the beach with the dog every weekend. '
+    'Reads mystery novels by the fireplace during long winter evenings. '
+    'Prefers morning appointments and usually travels by bicycle to the clinic.'
+)
+
+class TestPrompts(TestCase):
+    def test_normalize(self):
+        """Test whitespace, repeated sentences and placeholders are removed"""
+        self.assertEqual(prompts.normalize('  One.\n\n One.  Two   words. '), 'One. Two words.')
+        self.assertEqual(prompts.normalize('N/A'), '')
+        self.assertEqual(prompts.compact_field('medical_history', 'none'), 'Not specified')
+
+    def test_condense_keeps_salient_sentences_within_budget(self):
+        """Test long medical history is condensed around medical facts"""
+        condensed = prompts.compact_field('medical_history', LONG_HISTORY)
+        self.assertLessEqual(prompts.count_tokens(condensed), prompts.FIELD_BUDGETS['medical_history'])
+        self.assertIn('diabetes', condensed)
+        self.assertIn('knee surgery', condensed)
+        self.assertLess(condensed.index('diabetes'), condensed.index('knee surgery'))
+
+    def test_truncate_plan_fields(self):
+        """Test plan text beyond its budget is cut at a word boundary"""
+        coverage = prompts.compact_field('coverage', 'hospital care ' * 200)
+        self.assertLessEqual(prompts.count_tokens(coverage), prompts.FIELD_BUDGETS['coverage'])
+        self.assertTrue(coverage.endswith('...'))
+
+    def test_build_prompt_is_dedented(self):
+        """Test templates are dedented and filled with compacted fields"""
+        prompt = prompts.build_prompt("""
+            Profile:
+            - Medical History: {medical_history}
+            """, medical_history='  Asthma.  ')
+        self.assertEqual(prompt, 'Profile:\n- Medical History: Asthma.')
+
+    def test_user_stores_condensed_history(self):
+        """Test long histories are condensed on save and short ones are not"""
+        user = User.objects.create_user(username='history', password='pass', medical_history=LONG_HISTORY)
+        self.assertTrue(user.medical_history_summary)
+        self.assertEqual(user.prompt_medical_history, user.medical_history_summary)
+
+        user.medical_history = 'Asthma.'
+        user.save(update_fields=['medical_history'])
+        user.refresh_from_db()
+        self.assertEqual(user.medical_history_summary, '')
+        self.assertEqual(user.prompt_medical_history, 'Asthma.')
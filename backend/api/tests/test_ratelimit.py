@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from backend import ratelimit
+from backend.ratelimit import LocalStore, RateLimiter
+
+
+class CountingStore(LocalStore):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def check_many(self, checks):
+        self.calls += 1
+        return super().check_many(checks)
+
+
+class TestRateLimiter(TestCase):
+    def test_allows_limit_then_reports_wait(self):
+        """Test a rate admits its limit and then denies with the time until the next slot"""
+        limiter = RateLimiter(store=LocalStore(), local_share=0)
+        decisions = [limiter.check('client', '3/m') for _ in range(4)]
+        self.assertEqual([d.allowed for d in decisions], [True, True, True, False])
+        self.assertAlmostEqual(decisions[-1].retry_after, 20, delta=1)
+        self.assertTrue(limiter.check('other-client', '3/m').allowed)
+
+    def test_every_rate_must_allow(self):
+        """Test combined rates deny once the tightest one is used up"""
+        limiter = RateLimiter(store=LocalStore(), local_share=0)
+        allowed = [limiter.check('client', '100/h,2/s').allowed for _ in range(3)]
+        self.assertEqual(allowed, [True, True, False])
+
+    def test_local_precheck_saves_round_trips_without_over_admitting(self):
+        """Test locally admitted hits skip the store but still count against the limit"""
+        store = CountingStore()
+        limiter = RateLimiter(store=store, local_share=0.5, local_ttl=60)
+        allowed = sum(limiter.check('client', '10/m').allowed for _ in range(20))
+        self.assertEqual(allowed, 10)
+        self.assertLess(store.calls, 20)
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'register': '2/m'},
+})
+class TestSharedThrottles(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        ratelimit.limiter.reset()
+        self.addCleanup(ratelimit.limiter.reset)
+
+    def register(self, index):
+        return self.client.post(reverse('user-list'), {
+            'username': f'throttled{index}',
+            'password': 'testpass123',
+            'email': f'throttled{index}@example.com',
+            'name': 'Throttled User',
+            'age': 30,
+            'budget': '5000.00',
+            'family_size': 2,
+            'medical_history': 'No major issues'
+        }, format='json')
+
+    def test_registration_is_throttled_per_ip(self):
+        """Test registration returns 429 with Retry-After once the IP is over its rate"""
+        self.assertEqual(self.register(1).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.register(2).status_code, status.HTTP_201_CREATED)
+        response = self.register(3)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+        self.client.defaults['REMOTE_ADDR'] = '10.0.0.2'
+        self.assertEqual(self.register(4).status_code, status.HTTP_201_CREATED)
+
+    @override_settings(RATELIMIT_ENABLE=False)
+    def test_can_be_disabled(self):
+        """Test RATELIMIT_ENABLE = False lets every request through"""
+        for index in range(4):
+            self.assertEqual(self.register(index).status_code, status.HTTP_201_CREATED)
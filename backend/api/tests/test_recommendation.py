@@ -1,5 +1,7 @@
 from django.test import TestCase
 from decimal import Decimal
+from unittest import mock
+from api import recommendation_engine
 from api.models import InsurancePlan
 from api.recommendation_engine import calculate_plan_score, get_recommendations
 
@@ -105,3 +107,27 @@ class TestRecommendationEngine(TestCase):
             self.assertIsInstance(rec['suitability_score'], float)
             self.assertGreaterEqual(rec['suitability_score'], 0)
             self.assertLessEqual(rec['suitability_score'], 1)
+
+    def test_similar_profiles_share_memoized_recommendations(self):
+        """Test users in the same profile bucket are served without rescoring"""
+        with mock.patch.object(recommendation_engine, 'rank_plans',
+                               wraps=recommendation_engine.rank_plans) as rank_plans:
+            first = get_recommendations({'budget': '6000.00', 'age': 30, 'family_size': 3})
+            second = get_recommendations({'budget': '6000.00', 'age': 45, 'family_size': 4})
+            senior = get_recommendations({'budget': '6000.00', 'age': 70, 'family_size': 4})
+        self.assertEqual(first, second)
+        self.assertEqual(rank_plans.call_count, 2)
+        self.assertNotEqual(first, senior)
+
+        first[0]['name'] = 'Changed by caller'
+        self.assertNotEqual(get_recommendations({'budget': '6000.00', 'age': 30, 'family_size': 3})[0]['name'],
+                            'Changed by caller')
+
+    def test_plan_change_invalidates_memoized_recommendations(self):
+        """Test recommendations reflect a plan saved after they were memoized"""
+        user_data = {'budget': '6000.00', 'age': 30, 'family_size': 1}
+        self.assertEqual(get_recommendations(user_data)[0]['id'], self.individual_plan.id)
+        self.individual_plan.price = Decimal('5900.00')
+        self.individual_plan.save()
+        recommendations = get_recommendations(user_data)
+        self.assertEqual(next(r['price'] for r in recommendations if r['id'] == self.individual_plan.id), 5900.0)
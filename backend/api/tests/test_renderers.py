@@ -0,0 +1,57 @@
+import io
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from uuid import UUID
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+
+class TestORJSONRenderer(SimpleTestCase):
+    def setUp(self):
+        self.payload = {
+            'id': 1,
+            'name': 'Family Plan \u2028 \u00e9',
+            'price': Decimal('4000.50'),
+            'copay': None,
+            'created_at': datetime(2025, 2, 24, 20, 24, 1, 123456, tzinfo=dt_timezone.utc),
+            'naive': datetime(2025, 2, 24, 20, 24),
+            'offset': datetime(2025, 2, 24, 20, 24, tzinfo=dt_timezone(timedelta(hours=5, minutes=30))),
+            'day': date(2025, 2, 24),
+            'at': time(9, 30),
+            'duration': timedelta(minutes=90),
+            'uuid': UUID('12345678-1234-5678-1234-567812345678'),
+            1: 'non-string key',
+            'plans': [{'score': 0.75, 'accepted': True}],
+        }
+
+    def test_matches_json_renderer(self):
+        """Test output is byte-identical to JSONRenderer"""
+        self.assertEqual(
+            ORJSONRenderer().render(self.payload),
+            JSONRenderer().render(self.payload)
+        )
+
+    def test_indent_falls_back_to_json_renderer(self):
+        """Test indented output is delegated to JSONRenderer"""
+        media_type = 'application/json; indent=4'
+        self.assertEqual(
+            ORJSONRenderer().render(self.payload, media_type),
+            JSONRenderer().render(self.payload, media_type)
+        )
+
+    def test_none_renders_empty(self):
+        """Test rendering None gives an empty body"""
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+class TestORJSONParser(SimpleTestCase):
+    def test_parse(self):
+        """Test parsing a JSON body"""
+        data = ORJSONParser().parse(io.BytesIO(b'{"rating": 5, "comments": "Great!"}'))
+        self.assertEqual(data, {'rating': 5, 'comments': 'Great!'})
+
+    def test_parse_invalid(self):
+        """Test invalid JSON raises a parse error"""
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"rating": NaN}'))
@@ -0,0 +1,23 @@
+from django.test import SimpleTestCase
+from backend.startup_profile import LAZY_MODULES, measure_startup, parse_importtime, startup_budget
+
+class TestStartupBudget(SimpleTestCase):
+    def test_boot_skips_lazy_sdks_and_stays_within_budget(self):
+        """Test django.setup() and URL loading import no LLM SDK and finish within STARTUP_TIME_BUDGET"""
+        runs = [measure_startup() for _ in range(3)]
+        for run in runs:
+            self.assertEqual(run['lazy_modules_loaded'], [])
+        fastest = min(run['total_seconds'] for run in runs)
+        self.assertLess(fastest, startup_budget())
+
+    def test_parse_importtime(self):
+        """Test importtime rows are parsed and the header is skipped"""
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       589 |     479780 | google.generativeai\n'
+            'import time:        15 |        15 |   IPython.display\n'
+        )
+        rows = parse_importtime(output)
+        self.assertEqual([row.module for row in rows], ['google.generativeai', 'IPython.display'])
+        self.assertEqual(rows[0].cumulative_us, 479780)
+        self.assertIn('google.generativeai', LAZY_MODULES)
@@ -1,17 +1,21 @@
 from rest_framework import viewsets, status, permissions
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.request import Request
+from rest_framework.authentication import SessionAuthentication
 from django.db.models import QuerySet
 from typing import Any, Dict
 from django.core.exceptions import ValidationError
-from django_ratelimit.decorators import ratelimit
-from django.utils.decorators import method_decorator
+from asgiref.sync import async_to_sync
 
 from .models import User, InsurancePlan, Feedback
 from .serializers import UserSerializer, InsurancePlanSerializer, FeedbackSerializer
 from .recommendation_engine import get_recommendations
+from .catalog import get_catalog_snapshot
 from .llm_utils import GeminiHandler
+from backend import llm_quota
+from backend.authentication import ProfileClaimsAuthentication
+from backend.ratelimit import SharedScopedRateThrottle
 
 class UserViewSet(viewsets.ModelViewSet):
     """
@@ -21,6 +25,7 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'register'
 
     def get_permissions(self):
         """Allow registration without auth."""
@@ -28,9 +33,11 @@ class UserViewSet(viewsets.ModelViewSet):
             return [permissions.AllowAny()]
         return super().get_permissions()
 
-    @method_decorator(ratelimit(key='ip', rate='5/m', method=['POST']))
-    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
-        return super().create(request, *args, **kwargs)
+    def get_throttles(self):
+        """Only registration is rate limited."""
+        if self.action == 'create':
+            return [SharedScopedRateThrottle()]
+        return super().get_throttles()
 
     @action(detail=False, methods=['get'])
     def me(self, request: Request) -> Response:
@@ -45,6 +52,7 @@ class InsurancePlanViewSet(viewsets.ModelViewSet):
     """
     queryset = InsurancePlan.objects.all()
     serializer_class = InsurancePlanSerializer
+    authentication_classes = [ProfileClaimsAuthentication, SessionAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     @action(detail=False, methods=['post'])
@@ -57,7 +65,7 @@ class InsurancePlanViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        plans = InsurancePlan.objects.filter(id__in=plan_ids)
+        plans = get_catalog_snapshot().get_many(plan_ids)
         serializer = self.get_serializer(plans, many=True)
         return Response(serializer.data)
 
@@ -68,8 +76,7 @@ class InsurancePlanViewSet(viewsets.ModelViewSet):
         user_data = {
             'age': request.user.age,
             'budget': request.user.budget,
-            'family_size': request.user.family_size,
-            'medical_history': request.user.medical_history
+            'family_size': request.user.family_size
         }
 
         # Simple eligibility check based on budget
@@ -87,21 +94,23 @@ class RecommendationViewSet(viewsets.ViewSet):
     Rate limited to 10 requests per minute.
     Includes AI-powered personalized recommendations.
     """
+    authentication_classes = [ProfileClaimsAuthentication, SessionAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [SharedScopedRateThrottle]
+    throttle_scope = 'recommendations'
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.gemini = GeminiHandler()
 
-    @method_decorator(ratelimit(key='user', rate='10/m', method=['GET']))
     def list(self, request: Request) -> Response:
         """Get personalized insurance recommendations with AI analysis."""
         try:
+            # Scoring needs no medical history, so this reads token claims only
             user_data = {
                 'age': request.user.age,
                 'budget': request.user.budget,
-                'family_size': request.user.family_size,
-                'medical_history': request.user.medical_history
+                'family_size': request.user.family_size
             }
 
             # Get base recommendations from existing logic
@@ -140,14 +149,16 @@ class FeedbackViewSet(viewsets.ModelViewSet):
             queryset = Feedback.objects.filter(user=self.request.user)
         return queryset.order_by('-created_at')[:5]  # Return only last 5 feedback items
 
-    async def perform_create(self, serializer: FeedbackSerializer) -> None:
+    def perform_create(self, serializer: FeedbackSerializer) -> None:
         """Associate feedback with the current user and analyze feedback."""
         # Save the feedback first
         feedback = serializer.save(user=self.request.user)
 
         try:
             # Analyze the feedback using Gemini
-            analysis = await self.gemini.analyze_feedback(feedback.comments)
+            analysis = async_to_sync(self.gemini.analyze_feedback)(
+                feedback.comments, llm_quota.BACKGROUND
+            )
             
             # Update the feedback with the analysis summary
             feedback.summary = analysis['analysis'][:200]  # Limit summary to 200 chars
@@ -157,7 +168,7 @@ class FeedbackViewSet(viewsets.ModelViewSet):
             print(f"Error analyzing feedback: {str(e)}")
 
     @action(detail=False, methods=['get'])
-    async def analytics(self, request: Request) -> Response:
+    def analytics(self, request: Request) -> Response:
         """Get AI-powered analytics of all feedback."""
         if not request.user.is_staff:
             return Response(
@@ -173,7 +184,7 @@ class FeedbackViewSet(viewsets.ModelViewSet):
             combined_feedback = '\n'.join(feedbacks)
             
             # Get AI analysis of all feedback
-            analysis = await self.gemini.analyze_feedback(combined_feedback)
+            analysis = async_to_sync(self.gemini.analyze_feedback)(combined_feedback)
             
             return Response(analysis)
         except Exception as e:
@@ -181,3 +192,9 @@ class FeedbackViewSet(viewsets.ModelViewSet):
                 {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def llm_metrics(request: Request) -> Response:
+    """Shared Gemini quota usage, queue depth and wait times, for staff."""
+    return Response(llm_quota.get_metrics())
@@ -0,0 +1,166 @@
+"""
+Admin changelists for tables with millions of rows.
+
+A changelist normally runs an exact COUNT(*) of the filtered rows for the
+paginator, and a second one of the whole table for the "N total" link. On a
+large table each of those is a full scan. `EstimatedCountPaginator` avoids
+both. Unfiltered lists use the planner's row estimate (PostgreSQL
+`reltuples`, MySQL `information_schema`) once a table is large. Filtered or
+searched lists count at most `count_limit` rows.
+
+The date hierarchy builds its year, month and day links with
+`queryset.datetimes()`, a SELECT DISTINCT over every matching row.
+`PeriodQuerySet` instead lists every period between the first and the last
+row, found with two index lookups, at the price of links to periods that
+may hold no rows.
+
+`LargeTableAdminMixin` installs both, turns the full result count off and
+can resolve searches on related names through foreign key indexes.
+"""
+
+import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Max, Min, Q, QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+
+def estimate_row_count(model, using: str = 'default') -> Optional[int]:
+    """The database's estimate of a table's rows; None where the backend keeps none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)'
+    elif connection.vendor == 'mysql':
+        sql = ('SELECT table_rows FROM information_schema.tables '
+               'WHERE table_schema = DATABASE() AND table_name = %s')
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    # PostgreSQL reports -1 for tables that were never analyzed
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose count avoids scanning large tables."""
+    estimate_threshold = 100000  # Below this estimate, counting exactly is cheap
+    count_limit = 10000  # Filtered lists count at most this many rows
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return super().count
+        if queryset.query.where:
+            # Pages past the limit are not linked; narrow the filter to reach them
+            return queryset[:self.count_limit].count()
+        estimate = estimate_row_count(queryset.model, queryset.db)
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return queryset.count()
+
+
+def _next_period(day: datetime.date, kind: str) -> datetime.date:
+    if kind == 'year':
+        return day.replace(year=day.year + 1)
+    if kind == 'month':
+        return (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return day + datetime.timedelta(days=1)
+
+
+class PeriodQuerySet(QuerySet):
+    """
+    QuerySet for the admin date hierarchy. `dates()` and `datetimes()` list
+    every year, month or day between the first and last row, instead of the
+    distinct ones; both return dates, which is all the hierarchy reads.
+    `aggregate()` answers plain Min and Max with ordered LIMIT 1 lookups,
+    which any index on the field serves.
+    """
+
+    def _extreme(self, field_name: str, last: bool) -> Any:
+        # The hierarchy asks for the same bounds twice; remember them on this queryset
+        bounds = self.__dict__.setdefault('_period_bounds', {})
+        if (field_name, last) not in bounds:
+            ordering = f'-{field_name}' if last else field_name
+            bounds[field_name, last] = (
+                self.filter(**{f'{field_name}__isnull': False}).order_by(ordering)
+                .values_list(field_name, flat=True).first()
+            )
+        return bounds[field_name, last]
+
+    def aggregate(self, *args, **kwargs) -> Dict[str, Any]:
+        simple = not args and kwargs and all(
+            type(aggregate) in (Min, Max) and aggregate.filter is None
+            and isinstance(aggregate.get_source_expressions()[0], F)
+            for aggregate in kwargs.values()
+        )
+        if not simple:
+            return super().aggregate(*args, **kwargs)
+        return {
+            name: self._extreme(aggregate.get_source_expressions()[0].name, type(aggregate) is Max)
+            for name, aggregate in kwargs.items()
+        }
+
+    def dates(self, field_name: str, kind: str, order: str = 'ASC') -> List[datetime.date]:
+        bounds = []
+        for last in (False, True):
+            value = self._extreme(field_name, last)
+            if isinstance(value, datetime.datetime):
+                value = (timezone.localtime(value) if timezone.is_aware(value) else value).date()
+            bounds.append(value)
+        first, last = bounds
+        if first is None or last is None:
+            return []
+        period = first.replace(month=1, day=1) if kind == 'year' else first
+        period = period.replace(day=1) if kind in ('year', 'month') else period
+        periods = []
+        while period <= last:
+            periods.append(period)
+            period = _next_period(period, kind)
+        return periods if order == 'ASC' else periods[::-1]
+
+    def datetimes(self, field_name: str, kind: str, order: str = 'ASC', tzinfo=None) -> List[datetime.date]:
+        return self.dates(field_name, kind, order)
+
+
+class LargeTableAdminMixin:
+    """
+    ModelAdmin settings for changelists over very large tables.
+
+    `related_search_fields` maps foreign keys to fields of the related model,
+    e.g. {'user': ('username',)}. A search then matches those fields by prefix
+    in the related table first, and probes the large table through its
+    foreign key index, instead of scanning the large table's joins.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    related_search_fields: Dict[str, Tuple[str, ...]] = {}
+    related_search_limit = 1000  # Related rows matched per search term
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if not self.date_hierarchy:
+            return queryset
+        return PeriodQuerySet(queryset.model, queryset.query.chain(), queryset.db, queryset._hints)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not self.related_search_fields or not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        for term in search_term.split():
+            condition = Q()
+            for relation, fields in self.related_search_fields.items():
+                related = self.model._meta.get_field(relation).related_model
+                match = Q()
+                for field in fields:
+                    match |= Q(**{f'{field}__istartswith': term})
+                ids = related._default_manager.filter(match).values_list('pk', flat=True)
+                condition |= Q(**{f'{relation}__in': list(ids[:self.related_search_limit])})
+            queryset = queryset.filter(condition)
+        return queryset, False
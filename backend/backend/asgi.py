@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Route LLM-bound endpoints to native async views; see backend/async_api.py
+os.environ.setdefault('DJANGO_ASYNC_LLM_VIEWS', '1')
 
 application = get_asgi_application()
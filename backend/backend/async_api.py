@@ -0,0 +1,112 @@
+"""
+Native async endpoints for ASGI deployments.
+
+DRF views are synchronous, so under ASGI every request to them occupies a
+thread for its whole duration, including time spent waiting on Gemini.
+`async_api_view` wraps a plain `async def` view with the parts of DRF those
+endpoints rely on: JWT/session authentication, JSON request parsing and
+rendering with the configured JSON renderer, plus shared-limiter throttling,
+so a single worker can keep many LLM calls in flight.
+"""
+
+from functools import wraps
+from typing import Awaitable, Callable, Iterable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import APIException, MethodNotAllowed, NotAuthenticated, Throttled
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .ratelimit import SharedRateThrottle
+
+
+def async_routes_enabled() -> bool:
+    """Whether LLM-bound endpoints are served by native async views."""
+    return getattr(settings, 'ASYNC_LLM_VIEWS', False)
+
+
+class AsyncResponse(HttpResponse):
+    """JSON response rendered with the first configured DRF renderer."""
+
+    def __init__(self, data, status: int = status.HTTP_200_OK, **kwargs) -> None:
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        super().__init__(
+            renderer.render(data, renderer.media_type, {}),
+            content_type=renderer.media_type,
+            status=status,
+            **kwargs
+        )
+
+
+async def authenticate(request: HttpRequest):
+    """Authenticate like DRF's default classes: JWT first, then session.
+
+    Returns:
+        The authenticated user, or None for anonymous requests
+    """
+    jwt_auth = JWTAuthentication()
+    header = jwt_auth.get_header(request)
+    if header is not None:
+        raw_token = jwt_auth.get_raw_token(header)
+        if raw_token is not None:
+            validated_token = jwt_auth.get_validated_token(raw_token)
+            return await sync_to_async(jwt_auth.get_user)(validated_token)
+
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None
+    # Session auth needs CSRF protection on unsafe methods, as in DRF
+    SessionAuthentication().enforce_csrf(request)
+    return user
+
+
+def _parse_body(request: HttpRequest):
+    """Parse a JSON request body into `request.data`."""
+    if not request.body:
+        return {}
+    parser = api_settings.DEFAULT_PARSER_CLASSES[0]()
+    return parser.parse(request, parser.media_type, {'encoding': request.encoding or 'utf-8'})
+
+
+def async_api_view(methods: Iterable[str], throttle_scope: Optional[str] = None) -> Callable:
+    """Decorator for async views that require an authenticated user.
+
+    The view receives the request with `user` and `data` set and returns
+    plain data (rendered as JSON) or an `HttpResponse`. With a
+    `throttle_scope`, requests are limited like DRF views using that scope.
+    """
+    allowed = [method.upper() for method in methods]
+
+    def decorator(view: Callable[..., Awaitable]) -> Callable:
+        @csrf_exempt
+        @wraps(view)
+        async def wrapped(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            try:
+                if request.method not in allowed:
+                    raise MethodNotAllowed(request.method)
+                user = await authenticate(request)
+                if user is None:
+                    raise NotAuthenticated()
+                request.user = user
+                if throttle_scope is not None:
+                    throttle = SharedRateThrottle()
+                    throttle.scope = throttle_scope
+                    if not throttle.allow_request(request, None):
+                        raise Throttled(throttle.wait())
+                request.data = _parse_body(request) if request.method == 'POST' else {}
+                result = await view(request, *args, **kwargs)
+            except APIException as exc:
+                response = AsyncResponse({'detail': exc.detail}, status=exc.status_code)
+                if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                    response['WWW-Authenticate'] = JWTAuthentication().authenticate_header(request)
+                return response
+            if isinstance(result, HttpResponse):
+                return result
+            return AsyncResponse(result)
+        return wrapped
+    return decorator
@@ -0,0 +1,163 @@
+"""
+JWT authentication without a user query per request.
+
+Tokens from ProfileTokenObtainPairSerializer carry a `profile` claim with the
+fields hot read endpoints need: identity and permission flags, age, budget and
+family size. ProfileClaimsAuthentication turns a current claim into a
+ClaimsUser without touching the database. Any other attribute, such as
+`medical_history`, comes from a user copy held in the shared cache for
+AUTH_USER_CACHE_TTL seconds.
+
+Each user has a profile version in the cache, stamped into the claim and
+bumped whenever the user row is saved or deleted. A token whose claim is
+older, or whose claim set is from an older CLAIMS_VERSION, is served from
+the cached user instead. Changes show up on the next request rather than
+when the token expires.
+"""
+
+import time
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+CLAIM = 'profile'
+CLAIMS_VERSION = 1  # Bump when the claim set below changes
+IDENTITY_FIELDS = ('username', 'is_active', 'is_staff', 'is_superuser')
+PROFILE_FIELDS = ('age', 'budget', 'family_size')
+
+PROFILE_VERSION_KEY = 'auth_profile_version:{}'
+USER_CACHE_KEY = 'auth_user:{}:{}'
+
+
+def get_profile_version(user_id: Any) -> int:
+    """Get a user's profile version, seeding it if the cache lost it."""
+    key = PROFILE_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a re-created version never matches a claim
+        # stamped with an earlier one.
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_profile_version(user_id: Any) -> None:
+    """Mark a user's claims and cached copy as stale on every worker."""
+    try:
+        cache.incr(PROFILE_VERSION_KEY.format(user_id))
+    except ValueError:
+        get_profile_version(user_id)
+
+
+def get_cached_user(user_id: Any, version: int):
+    """The user row for a profile version, from the cache or the database; None if it does not exist."""
+    key = USER_CACHE_KEY.format(user_id, version)
+    user = cache.get(key)
+    if user is None:
+        User = get_user_model()
+        try:
+            user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            return None
+        cache.set(key, user, getattr(settings, 'AUTH_USER_CACHE_TTL', 300))
+    return user
+
+
+def profile_claims(user) -> Dict[str, Any]:
+    """The `profile` claim for a user, stamped with the current profile version."""
+    claims = {'v': CLAIMS_VERSION, 'pv': get_profile_version(user.pk)}
+    for field in IDENTITY_FIELDS + PROFILE_FIELDS:
+        value = getattr(user, field)
+        claims[field] = str(value) if isinstance(value, Decimal) else value
+    return claims
+
+
+class ClaimsUser:
+    """
+    Authenticated user built from token claims.
+
+    Reads of the claimed fields are free. Anything else loads the cached user
+    once. Use `get_user()` where a model instance is required, e.g. for
+    foreign keys.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id: Any, claims: Dict[str, Any], version: int) -> None:
+        self.id = self.pk = user_id
+        self._version = version
+        self._user = None
+        for field in IDENTITY_FIELDS + PROFILE_FIELDS:
+            setattr(self, field, claims.get(field))
+        if self.budget is not None:
+            self.budget = Decimal(self.budget)
+
+    def get_user(self):
+        if self._user is None:
+            self._user = get_cached_user(self.pk, self._version)
+            if self._user is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        return self._user
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get_user(), name)
+
+    def __eq__(self, other: Any) -> bool:
+        return getattr(other, 'pk', None) == self.pk and getattr(other, 'is_authenticated', False)
+
+    def __hash__(self) -> int:
+        return hash(self.pk)
+
+    def __str__(self) -> str:
+        return self.username
+
+
+class ProfileClaimsAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts a current `profile` claim instead of loading
+    the user. Only for views that do not hand `request.user` to the ORM.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        version = get_profile_version(user_id)
+        claims = validated_token.get(CLAIM)
+        if (claims and claims.get('v') == CLAIMS_VERSION and claims.get('pv') == version
+                and not api_settings.CHECK_REVOKE_TOKEN):
+            # A deactivation saves the user, which makes the claim stale
+            return ClaimsUser(user_id, claims, version)
+
+        user = get_cached_user(user_id, version)
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
+
+
+class ProfileTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issues token pairs carrying the `profile` claim; refreshed access tokens inherit it."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[CLAIM] = profile_claims(user)
+        return token
@@ -0,0 +1,161 @@
+"""
+In-process stand-in for `google.generativeai.GenerativeModel`.
+
+Selected with GEMINI_BACKEND = 'fake' so that `gemini_client`,
+`GeminiHandler` and the views can be load-tested offline. Replies are
+deterministic for a given prompt. Latency, errors, 429s and streaming are
+drawn from a seeded generator configured by GEMINI_FAKE, so runs can be
+reproduced:
+
+    GEMINI_FAKE = {
+        'latency_ms': 800,      # median latency
+        'latency_sigma': 0.5,   # lognormal spread, 0 for a fixed latency
+        'error_rate': 0.0,      # share of calls failing with a 500
+        'rate_limit_rate': 0.0, # share of calls failing with a 429
+        'chunks': 4,            # chunks per streamed reply
+        'seed': 0,
+    }
+
+Failures raise the same `google.api_core` exceptions as the real SDK, and a
+`request_options` timeout shorter than the drawn latency raises
+DeadlineExceeded once the timeout has elapsed.
+"""
+
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.conf import settings
+from google.api_core import exceptions
+
+DEFAULTS = {
+    'latency_ms': 800,
+    'latency_sigma': 0.5,
+    'error_rate': 0.0,
+    'rate_limit_rate': 0.0,
+    'chunks': 4,
+    'seed': 0,
+}
+
+SECTIONS = (
+    'Key benefits: {topic} offers predictable costs and broad hospital access.',
+    'Limitations: out-of-network care and some specialist visits need prior approval.',
+    'Best suited for: households that value stable monthly premiums over the lowest deductible.',
+    'Cost considerations: compare the premium with the deductible and copay for expected visits.',
+)
+
+_rng_lock = threading.Lock()
+_rng: Optional[random.Random] = None
+
+
+def get_config() -> Dict[str, Any]:
+    """GEMINI_FAKE merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'GEMINI_FAKE', {})}
+
+
+def reset(seed: Optional[int] = None) -> None:
+    """Restart the latency and failure sequence, e.g. between benchmark runs."""
+    global _rng
+    with _rng_lock:
+        _rng = random.Random(get_config()['seed'] if seed is None else seed)
+
+
+def _draw(config: Dict[str, Any]):
+    """Draw (latency in seconds, failure or None) for one call."""
+    global _rng
+    with _rng_lock:
+        if _rng is None:
+            _rng = random.Random(config['seed'])
+        sigma = config['latency_sigma']
+        latency = config['latency_ms'] / 1000
+        if sigma:
+            latency *= _rng.lognormvariate(0, sigma)
+        roll = _rng.random()
+    if roll < config['rate_limit_rate']:
+        return latency, exceptions.ResourceExhausted('Fake Gemini: quota exceeded')
+    if roll < config['rate_limit_rate'] + config['error_rate']:
+        return latency, exceptions.InternalServerError('Fake Gemini: internal error')
+    return latency, None
+
+
+def _count_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+class UsageMetadata:
+    def __init__(self, prompt_token_count: int, candidates_token_count: int) -> None:
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class FakeResponse:
+    """Mimics GenerateContentResponse: `text`, `usage_metadata`, and iteration over chunks when streamed."""
+
+    def __init__(self, prompt: str, chunks: List[str]) -> None:
+        self.chunks = chunks
+        self.text = ''.join(chunks)
+        self.usage_metadata = UsageMetadata(_count_tokens(prompt), _count_tokens(self.text))
+
+    def __iter__(self) -> Iterator['FakeResponse']:
+        for chunk in self.chunks:
+            yield FakeChunk(chunk)
+
+
+class FakeChunk:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+def reply_for(prompt: str) -> str:
+    """Deterministic reply text for a prompt."""
+    digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    first_line = prompt.strip().splitlines()[0] if prompt.strip() else 'this request'
+    topic = first_line[:60].rstrip(':')
+    start = int(digest[:8], 16) % len(SECTIONS)
+    sections = SECTIONS[start:] + SECTIONS[:start]
+    return f'[fake-gemini {digest[:8]}]\n' + '\n'.join(section.format(topic=topic) for section in sections)
+
+
+def _split(text: str, parts: int) -> List[str]:
+    size = max(1, -(-len(text) // max(1, parts)))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeGenerativeModel:
+    """Drop-in for `genai.GenerativeModel` with simulated latency and failures."""
+
+    def __init__(self, model_name: str = 'gemini-pro', **kwargs) -> None:
+        self.model_name = model_name
+
+    def _prepare(self, prompt: str, request_options: Optional[Dict[str, Any]]):
+        config = get_config()
+        latency, failure = _draw(config)
+        timeout = (request_options or {}).get('timeout')
+        if timeout is not None and latency > timeout:
+            return timeout, exceptions.DeadlineExceeded('Fake Gemini: deadline exceeded'), config
+        return latency, failure, config
+
+    def _response(self, prompt: str, stream: bool, config: Dict[str, Any]) -> FakeResponse:
+        text = reply_for(str(prompt))
+        return FakeResponse(str(prompt), _split(text, config['chunks']) if stream else [text])
+
+    def generate_content(self, prompt, *, stream: bool = False,
+                         request_options: Optional[Dict[str, Any]] = None, **kwargs) -> FakeResponse:
+        latency, failure, config = self._prepare(prompt, request_options)
+        time.sleep(latency)
+        if failure is not None:
+            raise failure
+        return self._response(prompt, stream, config)
+
+    async def generate_content_async(self, prompt, *, stream: bool = False,
+                                     request_options: Optional[Dict[str, Any]] = None,
+                                     **kwargs) -> FakeResponse:
+        latency, failure, config = self._prepare(prompt, request_options)
+        await asyncio.sleep(latency)
+        if failure is not None:
+            raise failure
+        return self._response(prompt, stream, config)
@@ -0,0 +1,209 @@
+"""
+Cluster-wide admission control for Gemini calls.
+
+The Gemini quota (requests and tokens per minute) is shared by every worker
+on every node, so usage is counted in the shared cache rather than in
+process memory. Each minute gets its own request and token counters,
+updated with atomic `incr`. A call is admitted if it fits the current
+window. Otherwise it waits for the next window until its deadline expires.
+
+Interactive calls may use the whole window. Background calls (feedback
+summarization) stop at LLM_BACKGROUND_SHARE of it, so they never crowd out
+user-facing requests. Each user also has a daily token budget.
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .prompts import count_tokens
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+KEY_PREFIX = 'llm_quota'
+WINDOW_SECONDS = 60
+POLL_SECONDS = 0.25  # How often a queued call re-checks the window
+METRIC_NAMES = ('admitted', 'rejected', 'queued', 'wait_ms')
+
+
+class QuotaExceeded(Exception):
+    """Raised when a call cannot be admitted before its deadline or the user is out of budget."""
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Rough token cost of a call: the prompt plus the expected reply."""
+    return count_tokens(prompt) + getattr(settings, 'LLM_EXPECTED_OUTPUT_TOKENS', 512)
+
+
+def _incr(key: str, delta: int, timeout: Optional[int]) -> int:
+    """Atomically add to a cache counter, creating it with `timeout` if missing."""
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # Expired between add and incr
+        cache.add(key, 0, timeout)
+        return cache.incr(key, delta)
+
+
+def _limits(priority: str):
+    """Requests and tokens per window available to a priority class."""
+    share = 1.0 if priority == INTERACTIVE else getattr(settings, 'LLM_BACKGROUND_SHARE', 0.5)
+    requests = getattr(settings, 'LLM_REQUESTS_PER_MINUTE', 60)
+    tokens = getattr(settings, 'LLM_TOKENS_PER_MINUTE', 32000)
+    return int(requests * share), int(tokens * share)
+
+
+def _window_keys(now: float):
+    window = int(now // WINDOW_SECONDS)
+    return f'{KEY_PREFIX}:requests:{window}', f'{KEY_PREFIX}:tokens:{window}'
+
+
+def _user_key(user_id) -> str:
+    return f'{KEY_PREFIX}:user:{user_id}:{time.strftime("%Y%m%d", time.gmtime())}'
+
+
+def _metric_key(name: str, priority: str) -> str:
+    return f'{KEY_PREFIX}:metrics:{name}:{priority}'
+
+
+def try_admit(tokens: int, priority: str = INTERACTIVE) -> bool:
+    """Claim one request and `tokens` tokens in the current window, if both fit.
+
+    Background calls are refused while any interactive call is queued.
+    """
+    if priority == BACKGROUND and (cache.get(_metric_key('queued', INTERACTIVE)) or 0) > 0:
+        # Interactive calls are waiting; let them have the next slots
+        return False
+    max_requests, max_tokens = _limits(priority)
+    requests_key, tokens_key = _window_keys(time.time())
+    ttl = WINDOW_SECONDS * 2
+
+    if _incr(requests_key, 1, ttl) > max_requests:
+        cache.decr(requests_key)
+        return False
+    if _incr(tokens_key, tokens, ttl) > max_tokens:
+        cache.decr(tokens_key, tokens)
+        cache.decr(requests_key)
+        return False
+    return True
+
+
+def _check_budget(user_id, tokens: int, priority: str) -> None:
+    if user_id is None:
+        return
+    budget = getattr(settings, 'LLM_USER_DAILY_TOKENS', 50000)
+    if (cache.get(_user_key(user_id)) or 0) + tokens > budget:
+        _incr(_metric_key('rejected', priority), 1, None)
+        raise QuotaExceeded(f'Daily AI token budget of {budget} reached')
+
+
+def _deadline(timeout: Optional[float]) -> float:
+    if timeout is None:
+        timeout = getattr(settings, 'LLM_QUEUE_TIMEOUT', 5.0)
+    return time.monotonic() + timeout
+
+
+def _admitted(priority: str, waited: float) -> None:
+    _incr(_metric_key('admitted', priority), 1, None)
+    _incr(_metric_key('wait_ms', priority), int(waited * 1000), None)
+
+
+def _rejected(priority: str) -> None:
+    _incr(_metric_key('rejected', priority), 1, None)
+    raise QuotaExceeded('Gemini quota exhausted, try again shortly')
+
+
+def acquire(tokens: int, priority: str = INTERACTIVE, user_id=None,
+            timeout: Optional[float] = None) -> None:
+    """Wait until the call fits the shared quota.
+
+    Args:
+        tokens: Estimated tokens for the call, see `estimate_tokens`
+        priority: INTERACTIVE or BACKGROUND
+        user_id: User to charge against their daily budget, if any
+        timeout: Seconds to wait in the queue (defaults to LLM_QUEUE_TIMEOUT)
+
+    Raises:
+        QuotaExceeded: If the user is out of budget or the deadline passes
+    """
+    _check_budget(user_id, tokens, priority)
+    start = time.monotonic()
+    if try_admit(tokens, priority):
+        _admitted(priority, 0.0)
+        return
+
+    deadline = _deadline(timeout)
+    queue_key = _metric_key('queued', priority)
+    _incr(queue_key, 1, None)
+    try:
+        while time.monotonic() < deadline:
+            time.sleep(min(POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+            if try_admit(tokens, priority):
+                _admitted(priority, time.monotonic() - start)
+                return
+    finally:
+        _incr(queue_key, -1, None)
+    _rejected(priority)
+
+
+async def aacquire(tokens: int, priority: str = INTERACTIVE, user_id=None,
+                   timeout: Optional[float] = None) -> None:
+    """Async version of `acquire`; waits without holding a thread."""
+    await sync_to_async(_check_budget)(user_id, tokens, priority)
+    start = time.monotonic()
+    if await sync_to_async(try_admit)(tokens, priority):
+        await sync_to_async(_admitted)(priority, 0.0)
+        return
+
+    deadline = _deadline(timeout)
+    queue_key = _metric_key('queued', priority)
+    await sync_to_async(_incr)(queue_key, 1, None)
+    try:
+        while time.monotonic() < deadline:
+            await asyncio.sleep(min(POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+            if await sync_to_async(try_admit)(tokens, priority):
+                await sync_to_async(_admitted)(priority, time.monotonic() - start)
+                return
+    finally:
+        await sync_to_async(_incr)(queue_key, -1, None)
+    await sync_to_async(_rejected)(priority)
+
+
+def record_usage(estimated: int, actual: Optional[int], user_id=None) -> None:
+    """Replace a call's estimated token charge with its actual usage.
+
+    Corrects the current window and charges the user's daily budget.
+    Without a reported `actual`, the estimate stands.
+    """
+    used = estimated if actual is None else actual
+    if actual is not None and actual != estimated:
+        _, tokens_key = _window_keys(time.time())
+        _incr(tokens_key, actual - estimated, WINDOW_SECONDS * 2)
+    if user_id is not None:
+        _incr(_user_key(user_id), used, 60 * 60 * 24)
+
+
+def get_metrics() -> Dict[str, Dict[str, int]]:
+    """Counters per priority class, plus usage of the current window."""
+    metrics = {
+        priority: {name: cache.get(_metric_key(name, priority)) or 0 for name in METRIC_NAMES}
+        for priority in PRIORITIES
+    }
+    for values in metrics.values():
+        admitted = values['admitted']
+        values['avg_wait_ms'] = values['wait_ms'] // admitted if admitted else 0
+    requests_key, tokens_key = _window_keys(time.time())
+    metrics['window'] = {
+        'requests': cache.get(requests_key) or 0,
+        'tokens': cache.get(tokens_key) or 0,
+        'requests_limit': _limits(INTERACTIVE)[0],
+        'tokens_limit': _limits(INTERACTIVE)[1]
+    }
+    return metrics
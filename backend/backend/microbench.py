@@ -0,0 +1,309 @@
+"""
+Microbenchmarks for the hot paths: scoring, recommendations, serializers and
+the cache. The HTTP load test only reports end-to-end latency; these time one
+function at a time. Results are stored per commit, so a slowdown can be traced
+to the commit that introduced it.
+
+Apps register benchmarks in a `benchmarks` module. A benchmark function runs
+its setup untimed and returns the callable to time:
+
+    from backend.microbench import benchmark
+
+    @benchmark('api.calculate_plan_score', sizes=[10, 1000, 100000])
+    def plan_score(size):
+        plans = make_plans(size)
+        return lambda: [calculate_plan_score(plan, user_data) for plan in plans]
+
+Each size runs in its own transaction on an in-memory SQLite test database,
+and the transaction is rolled back afterwards. The cache is swapped for
+LocMemCache and Gemini for the fake backend, so a run needs no network.
+`manage.py microbench` writes benchmarks/results/<commit>-<suite>.json, where
+the suite names the apps whose benchmarks ran.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from contextlib import contextmanager
+from importlib import import_module
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils.module_loading import module_has_submodule
+
+from .ratelimit import SharedRateThrottle, limiter
+
+DEFAULT_RESULTS_DIR = os.path.join(settings.BASE_DIR, 'benchmarks', 'results')
+
+OFFLINE_SETTINGS = {
+    'CACHES': {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'microbench',
+        }
+    },
+    'GEMINI_BACKEND': 'fake',
+}
+
+
+class Benchmark(NamedTuple):
+    name: str
+    func: Callable[[Any], Callable[[], Any]]
+    sizes: Sequence[Any]
+
+
+REGISTRY: List[Benchmark] = []
+
+
+def benchmark(name: str, sizes: Sequence[Any] = (None,)):
+    """Register a benchmark. The decorated function takes a size and returns the callable to time."""
+    def register(func):
+        REGISTRY.append(Benchmark(name, func, tuple(sizes)))
+        return func
+    return register
+
+
+def autodiscover() -> List[str]:
+    """Import the `benchmarks` module of every installed app; returns the labels of apps that have one."""
+    labels = []
+    for app_config in apps.get_app_configs():
+        if module_has_submodule(app_config.module, 'benchmarks'):
+            import_module(f'{app_config.name}.benchmarks')
+            labels.append(app_config.label)
+    return labels
+
+
+def result_key(name: str, size: Any) -> str:
+    return name if size is None else f'{name}[{size}]'
+
+
+def time_callable(func: Callable[[], Any], rounds: int = 5, min_time: float = 0.2) -> Dict[str, Any]:
+    """
+    Time a callable like timeit: calibrate a loop count so that a round
+    lasts about min_time / rounds, then report per-call times in ms.
+    """
+    func()  # Warm-up
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    loops = max(1, int(min_time / rounds / elapsed)) if elapsed > 0 else 1000
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - start) / loops)
+    return {
+        'median_ms': round(statistics.median(timings) * 1000, 4),
+        'min_ms': round(min(timings) * 1000, 4),
+        'rounds': rounds,
+        'loops': loops,
+    }
+
+
+class Rollback(Exception):
+    """Raised to discard the rows a benchmark created."""
+
+
+def run(benchmarks: Sequence[Benchmark], rounds: int = 5, min_time: float = 0.2,
+        max_size: Optional[int] = None,
+        report: Callable[[str, Dict[str, Any]], None] = lambda key, stats: None) -> Dict[str, Dict[str, Any]]:
+    """Run the benchmarks at each size, each in a rolled-back transaction."""
+    results = {}
+    for bench in benchmarks:
+        for size in bench.sizes:
+            if max_size is not None and isinstance(size, int) and size > max_size:
+                continue
+            key = result_key(bench.name, size)
+            cache.clear()
+            try:
+                with transaction.atomic():
+                    stats = time_callable(bench.func(size), rounds, min_time)
+                    raise Rollback
+            except Rollback:
+                pass
+            results[key] = stats
+            report(key, stats)
+    return results
+
+
+@contextmanager
+def in_memory_database() -> Iterator[None]:
+    """Create the test database in memory for the duration of the block."""
+    if connection.vendor != 'sqlite':
+        raise CommandError('Microbenchmarks run on an in-memory SQLite database; use SQLite settings')
+    connection.settings_dict['TEST']['NAME'] = None
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def git(*args: str) -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ['git', *args], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output
+
+
+def results_path(results_dir: str, commit: str, suite: str) -> str:
+    return os.path.join(results_dir, f'{commit}-{suite}.json')
+
+
+def load_results(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as stream:
+        return json.load(stream)
+
+
+def compare(current: Dict[str, Dict[str, Any]], previous: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """
+    List the benchmarks whose fastest round grew by more than `tolerance`
+    since `previous`. The minimum is compared rather than the median, as it is
+    the least affected by other load on the machine.
+    """
+    regressions = []
+    for key, stats in current.items():
+        before = previous.get(key)
+        if before and stats['min_ms'] > before['min_ms'] * (1 + tolerance):
+            regressions.append(
+                f'{key}: {before["min_ms"]:.4f}ms -> {stats["min_ms"]:.4f}ms '
+                f'(+{stats["min_ms"] / before["min_ms"] - 1:.0%})'
+            )
+    return regressions
+
+
+# Core benchmarks shared by every suite
+
+LLM_PAYLOAD_LINE = (
+    'Key benefits: predictable costs and broad hospital access. Limitations: out-of-network '
+    'care needs prior approval. Cost considerations: compare premium, deductible and copay.\n'
+)
+
+
+def llm_payload(kib: int) -> Dict[str, Any]:
+    """An analysis-shaped cache value of roughly `kib` KiB."""
+    text = LLM_PAYLOAD_LINE * (kib * 1024 // len(LLM_PAYLOAD_LINE) + 1)
+    return {'analysis': text[:kib * 1024], 'cached': True, 'fallback': False}
+
+
+@benchmark('cache.set_llm_payload', sizes=[4, 64, 512])
+def cache_set(kib):
+    payload = llm_payload(kib)
+    return lambda: cache.set('microbench:payload', payload, 60)
+
+
+@benchmark('cache.get_llm_payload', sizes=[4, 64, 512])
+def cache_get(kib):
+    cache.set('microbench:payload', llm_payload(kib), 60)
+    return lambda: cache.get('microbench:payload')
+
+
+class BenchmarkThrottle(SharedRateThrottle):
+    scope = 'microbench'
+    rate = '1000000/s'
+
+
+@benchmark('ratelimit.throttle', sizes=[1, 10000])
+def rate_limit_throttle(clients):
+    """Per-request overhead of the shared throttle, cycling through `clients` IPs."""
+    factory = RequestFactory()
+    requests = []
+    for i in range(clients):
+        request = factory.get('/', REMOTE_ADDR=f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}')
+        request.user = AnonymousUser()
+        requests.append(request)
+    limiter.reset()
+    throttle = BenchmarkThrottle()
+    position = [0]
+
+    def check():
+        position[0] = (position[0] + 1) % clients
+        return throttle.allow_request(requests[position[0]], None)
+    return check
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs the microbenchmarks registered in each app\'s benchmarks module on an in-memory '
+        'database, with the cache and Gemini replaced by offline stand-ins. Stores the results '
+        'per commit under benchmarks/results/ and compares them with an earlier commit.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filter', default='', help='Only run benchmarks whose name contains this')
+        parser.add_argument('--max-size', type=int, help='Skip sizes above this, e.g. 1000 for a quick run')
+        parser.add_argument('--rounds', type=int, default=5, help='Timed rounds per benchmark')
+        parser.add_argument('--min-time', type=float, default=0.2,
+                            help='Approximate seconds spent timing each benchmark')
+        parser.add_argument('--results-dir', default=DEFAULT_RESULTS_DIR, help='Where results are stored')
+        parser.add_argument('--compare', metavar='REF', default='HEAD~1',
+                            help='Commit whose stored results to compare with')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed relative increase of the fastest round before flagging')
+        parser.add_argument('--no-save', action='store_true', help='Do not store the results')
+
+    def handle(self, *args, **options):
+        suite = '+'.join(autodiscover())
+        benchmarks = [bench for bench in REGISTRY if options['filter'] in bench.name]
+        if not benchmarks:
+            raise CommandError(f'No benchmarks match {options["filter"]!r}')
+
+        self.stdout.write(f'{"benchmark":<48} {"median":>12} {"min":>12} {"loops":>7}')
+
+        def report(key, stats):
+            self.stdout.write(
+                f'{key:<48} {stats["median_ms"]:>10.4f}ms {stats["min_ms"]:>10.4f}ms {stats["loops"]:>7}'
+            )
+
+        with override_settings(**OFFLINE_SETTINGS), in_memory_database():
+            results = run(benchmarks, options['rounds'], options['min_time'], options['max_size'], report)
+
+        previous_commit = git('rev-parse', options['compare'])
+        previous = previous_commit and load_results(
+            results_path(options['results_dir'], previous_commit, suite)
+        )
+        commit = git('rev-parse', 'HEAD') or 'unknown'
+        if not options['no_save']:
+            os.makedirs(options['results_dir'], exist_ok=True)
+            path = results_path(options['results_dir'], commit, suite)
+            with open(path, 'w', encoding='utf-8') as stream:
+                json.dump({
+                    'commit': commit,
+                    # Uncommitted changes are saved under HEAD, flagged here
+                    'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+                    'suite': suite,
+                    'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                    'python': platform.python_version(),
+                    'django': django.get_version(),
+                    'results': results,
+                }, stream, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Saved results to {path}'))
+
+        if not previous:
+            self.stdout.write(f'No stored results for {options["compare"]}; nothing to compare')
+            return
+        regressions = compare(results, previous['results'], options['tolerance'])
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(f'REGRESSION {regression}'))
+        if regressions:
+            raise CommandError(f'{len(regressions)} regressions against {options["compare"]}')
+        self.stdout.write(self.style.SUCCESS(f'No regressions against {options["compare"]}'))
@@ -0,0 +1,159 @@
+"""
+Prompt building for Gemini calls.
+
+User-typed text (medical history, feedback) and plan text (coverage,
+conditions) is embedded in prompts. Every field is normalized: whitespace
+is collapsed, repeated sentences are dropped and placeholder values such
+as "N/A" are removed. Each field is then held to a token budget. Long
+medical histories and feedback are condensed extractively, keeping the
+most informative sentences in their original order. Other fields are
+truncated at a word boundary.
+
+Tokens are estimated locally (about four characters per token), so no
+call to Gemini is needed before sending.
+"""
+
+import logging
+import re
+import textwrap
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger('llm')
+
+# Token budgets per prompt field
+FIELD_BUDGETS = {
+    'name': 20,
+    'medical_history': 80,
+    'coverage': 120,
+    'conditions': 80,
+    'feedback': 1200,
+}
+CONDENSED_FIELDS = ('medical_history', 'feedback')
+
+PLACEHOLDER = re.compile(
+    r'^(n/?a|none|nil|null|-+|not specified|no medical history( provided)?)\.?$',
+    re.IGNORECASE
+)
+SENTENCE_END = re.compile(r'(?<=[.!?;])\s+|\s*\n+\s*')
+WORD = re.compile(r'[a-z]+')
+
+# Words that mark a sentence as informative for underwriting
+SALIENT_TERMS = (
+    'allerg', 'asthma', 'blood', 'cancer', 'cardi', 'chronic', 'condition',
+    'diabet', 'diagnos', 'disease', 'disorder', 'heart', 'hospital', 'injur',
+    'kidney', 'medicat', 'pregnan', 'pressure', 'surgery', 'therapy',
+    'treatment', 'stroke', 'depress', 'smok', 'insulin', 'transplant',
+    'claim', 'premium', 'coverage', 'price', 'expensive', 'slow', 'support'
+)
+
+
+def count_tokens(text: str) -> int:
+    """Estimate the number of tokens in `text`."""
+    return (len(text) + 3) // 4
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences and lines, dropping empty pieces."""
+    return [sentence.strip() for sentence in SENTENCE_END.split(text) if sentence.strip()]
+
+
+def normalize(text: Optional[str]) -> str:
+    """Collapse whitespace, drop repeated sentences and placeholder values."""
+    if not text:
+        return ''
+    seen = set()
+    sentences = []
+    for sentence in split_sentences(str(text)):
+        sentence = ' '.join(sentence.split())
+        key = sentence.lower().rstrip('.!?;')
+        if key in seen or PLACEHOLDER.match(sentence):
+            continue
+        seen.add(key)
+        sentences.append(sentence)
+    return ' '.join(sentences)
+
+
+def truncate(text: str, budget: int) -> str:
+    """Cut text to the token budget at a word boundary."""
+    if count_tokens(text) <= budget:
+        return text
+    cut = text[:budget * 4 - 3].rsplit(' ', 1)[0]
+    return cut.rstrip(' ,;:') + '...'
+
+
+def _sentence_score(sentence: str) -> float:
+    """Informativeness of a sentence: salient terms and figures per word."""
+    words = WORD.findall(sentence.lower())
+    if not words:
+        return 0.0
+    salient = sum(1 for word in words if word.startswith(SALIENT_TERMS))
+    figures = len(re.findall(r'\d+', sentence))
+    return (2 * salient + figures + 1) / len(words) ** 0.5
+
+
+def condense(text: str, budget: int) -> str:
+    """Extractively condense normalized text to the token budget.
+
+    Keeps the highest scoring sentences that fit, in their original order.
+    """
+    if count_tokens(text) <= budget:
+        return text
+    sentences = split_sentences(text)
+    ranked = sorted(range(len(sentences)), key=lambda i: _sentence_score(sentences[i]), reverse=True)
+
+    chosen = []
+    used = 0
+    for index in ranked:
+        cost = count_tokens(sentences[index]) + 1
+        if used + cost <= budget:
+            chosen.append(index)
+            used += cost
+    if not chosen:
+        return truncate(sentences[ranked[0]], budget)
+    return ' '.join(sentences[index] for index in sorted(chosen))
+
+
+def compact_field(name: str, value: Any, default: str = 'Not specified') -> str:
+    """Normalize a prompt field and hold it to its token budget."""
+    if value is None or isinstance(value, (int, float)):
+        return default if value is None else str(value)
+    text = normalize(value)
+    if not text:
+        return default
+    budget = FIELD_BUDGETS.get(name)
+    if budget is None:
+        return text
+    if name in CONDENSED_FIELDS:
+        return condense(text, budget)
+    return truncate(text, budget)
+
+
+def condense_medical_history(text: Optional[str]) -> str:
+    """Condensed medical history to store on the user, or '' if it already fits its budget."""
+    normalized = normalize(text)
+    if count_tokens(normalized) <= FIELD_BUDGETS['medical_history']:
+        return ''
+    return condense(normalized, FIELD_BUDGETS['medical_history'])
+
+
+def build_prompt(template: str, **fields: Any) -> str:
+    """Fill a prompt template with compacted fields.
+
+    The template is dedented and stripped; each field is passed through
+    `compact_field` under its own name.
+    """
+    values = {name: compact_field(name, value) for name, value in fields.items()}
+    return textwrap.dedent(template).strip().format(**values)
+
+
+def log_usage(label: str, prompt: str, response: Any = None) -> None:
+    """Log estimated prompt tokens and the usage Gemini reports for a call."""
+    usage = getattr(response, 'usage_metadata', None)
+    logger.info(
+        '%s: estimated_prompt_tokens=%d prompt_tokens=%s response_tokens=%s total_tokens=%s',
+        label,
+        count_tokens(prompt),
+        getattr(usage, 'prompt_token_count', None),
+        getattr(usage, 'candidates_token_count', None),
+        getattr(usage, 'total_token_count', None)
+    )
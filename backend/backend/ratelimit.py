@@ -0,0 +1,289 @@
+"""
+Rate limits shared by every worker.
+
+Limits use GCRA (the generic cell rate algorithm). Each key stores one
+timestamp, the theoretical arrival time (TAT) of the next request. A request
+is allowed while the TAT stays within one period of now, which behaves like a
+sliding window without storing individual hits.
+
+When the default cache is Redis (REDIS_URL), the check runs as a Lua script.
+It is atomic across processes and uses the Redis clock, so worker clocks do
+not matter. All rates of one request go through a single pipeline. Without
+Redis, a process-local store applies the same limits per worker, which is
+enough for development and tests.
+
+Round trips are skipped for clients well under their limit. After each store
+check, a worker may admit up to RATELIMIT_LOCAL_SHARE of the remaining
+allowance on its own for RATELIMIT_LOCAL_TTL seconds, and reports those hits
+with its next check. Limits stay exact while share * workers <= 1; beyond
+that, over-admission is bounded by the shares handed out.
+
+`SharedRateThrottle` and `SharedScopedRateThrottle` plug the limiter into DRF.
+Their rates come from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'].
+"""
+
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'ratelimit'
+MAX_LOCAL_KEYS = 10000  # Expired local entries are purged past this size
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# KEYS[1]: limit key. ARGV: emission interval (ms), period (ms), hits already
+# admitted locally. Returns {allowed, retry after (ms), remaining}.
+GCRA_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000 + tonumber(now[2]) / 1000
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now)
+tat = tat + tonumber(ARGV[3]) * interval
+local allowed = 0
+local retry_after = 0
+if tat + interval - now <= period then
+    tat = tat + interval
+    allowed = 1
+else
+    retry_after = math.ceil(tat + interval - period - now)
+end
+redis.call('SET', KEYS[1], string.format('%.3f', tat), 'PX', math.ceil(tat - now) + 1)
+return {allowed, retry_after, math.floor((period - (tat - now)) / interval)}
+"""
+
+
+class Rate(NamedTuple):
+    limit: int
+    period: int  # Seconds
+
+    @property
+    def interval_ms(self) -> float:
+        """Time one request uses up of the period."""
+        return self.period * 1000 / self.limit
+
+    @property
+    def label(self) -> str:
+        return f'{self.limit}/{self.period}'
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    retry_after: float  # Seconds until the next request would be allowed
+    remaining: int  # Requests that could be made right now
+
+
+@lru_cache(maxsize=128)
+def parse_rates(rate: str) -> Tuple[Rate, ...]:
+    """Parse DRF-style rates such as '10/m' or '5/s,100/h'; all must allow a request."""
+    rates = []
+    for part in rate.split(','):
+        try:
+            limit, period = part.strip().split('/')
+            rates.append(Rate(int(limit), PERIODS[period.strip()[0]]))
+        except (ValueError, KeyError, IndexError):
+            raise ImproperlyConfigured(f'Invalid rate {rate!r}; expected e.g. "10/m" or "5/s,100/h"')
+    return tuple(rates)
+
+
+class LocalStore:
+    """GCRA state in process memory; limits apply per worker."""
+
+    def __init__(self) -> None:
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def check_many(self, checks: Sequence[Tuple[str, Rate, int]]) -> List[Decision]:
+        now = time.time() * 1000
+        decisions = []
+        with self._lock:
+            if len(self._tats) > MAX_LOCAL_KEYS:
+                self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+            for key, rate, pending in checks:
+                interval = rate.interval_ms
+                period = rate.period * 1000
+                tat = max(self._tats.get(key, now), now) + pending * interval
+                if tat + interval - now <= period:
+                    tat += interval
+                    decision = Decision(True, 0.0, int((period - (tat - now)) // interval))
+                else:
+                    decision = Decision(False, (tat + interval - period - now) / 1000, 0)
+                self._tats[key] = tat
+                decisions.append(decision)
+        return decisions
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tats.clear()
+
+
+class RedisStore:
+    """GCRA state in Redis, shared by every worker."""
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self.script = client.register_script(GCRA_SCRIPT)
+
+    def check_many(self, checks: Sequence[Tuple[str, Rate, int]]) -> List[Decision]:
+        from redis.exceptions import RedisError
+
+        pipe = self.client.pipeline(transaction=False)
+        for key, rate, pending in checks:
+            self.script(keys=[key], args=[rate.interval_ms, rate.period * 1000, pending], client=pipe)
+        try:
+            replies = pipe.execute()
+        except RedisError as e:
+            # Fail open: an unreachable Redis must not take the API down
+            logger.warning('Rate limit check failed, allowing request: %s', e)
+            return [Decision(True, 0.0, 0) for _ in checks]
+        return [
+            Decision(bool(allowed), retry_after / 1000, max(0, remaining))
+            for allowed, retry_after, remaining in replies
+        ]
+
+
+_local_store = LocalStore()
+_redis_stores: Dict[int, RedisStore] = {}
+
+
+def get_store():
+    """Redis when it is the default cache, otherwise the process-local store."""
+    backend = caches['default']
+    if not type(backend).__module__.startswith('django_redis'):
+        return _local_store
+    from django_redis import get_redis_connection
+
+    client = get_redis_connection('default')
+    store = _redis_stores.get(id(client))
+    if store is None:
+        store = _redis_stores[id(client)] = RedisStore(client)
+    return store
+
+
+class _Credit:
+    """Requests a worker may admit without asking the store."""
+    __slots__ = ('allowance', 'pending', 'expires')
+
+    def __init__(self, allowance: int, expires: float) -> None:
+        self.allowance = allowance
+        self.pending = 0
+        self.expires = expires
+
+
+class RateLimiter:
+    """Checks keys against rates in the shared store, with a local pre-check."""
+
+    def __init__(self, store=None, local_share: Optional[float] = None,
+                 local_ttl: Optional[float] = None) -> None:
+        self.store = store
+        self.local_share = local_share
+        self.local_ttl = local_ttl
+        self._credits: Dict[str, _Credit] = {}
+        self._lock = threading.Lock()
+
+    def check(self, key: str, rate: str) -> Decision:
+        """Count one request for `key` and decide whether it is allowed under `rate`."""
+        rates = parse_rates(rate)
+        keys = [f'{KEY_PREFIX}:{key}:{r.label}' for r in rates]
+        now = time.monotonic()
+
+        with self._lock:
+            credits = [self._credits.get(k) for k in keys]
+            if all(c is not None and c.allowance > 0 and c.expires > now for c in credits):
+                for credit in credits:
+                    credit.allowance -= 1
+                    credit.pending += 1
+                return Decision(True, 0.0, min(c.allowance for c in credits))
+            # Report locally admitted hits with this check
+            pending = [self._credits.pop(k).pending if c is not None else 0 for k, c in zip(keys, credits)]
+
+        store = self.store or get_store()
+        decisions = store.check_many(list(zip(keys, rates, pending)))
+
+        share = self.local_share
+        if share is None:
+            share = getattr(settings, 'RATELIMIT_LOCAL_SHARE', 0.1)
+        ttl = self.local_ttl
+        if ttl is None:
+            ttl = getattr(settings, 'RATELIMIT_LOCAL_TTL', 1.0)
+        with self._lock:
+            if len(self._credits) > MAX_LOCAL_KEYS:
+                self._credits = {k: c for k, c in self._credits.items() if c.expires > now}
+            for k, decision in zip(keys, decisions):
+                allowance = int(decision.remaining * share)
+                if decision.allowed and allowance > 0:
+                    self._credits[k] = _Credit(allowance, now + ttl)
+
+        denied = [decision for decision in decisions if not decision.allowed]
+        if denied:
+            return Decision(False, max(decision.retry_after for decision in denied), 0)
+        return Decision(True, 0.0, min(decision.remaining for decision in decisions))
+
+    def reset(self) -> None:
+        """Forget local credits, and all counts when the store is process-local; e.g. between tests."""
+        with self._lock:
+            self._credits.clear()
+        store = self.store or get_store()
+        if isinstance(store, LocalStore):
+            store.reset()
+
+
+limiter = RateLimiter()
+
+
+class SharedRateThrottle(BaseThrottle):
+    """
+    DRF throttle counted by the shared limiter. The rate is `rate`, or
+    DEFAULT_THROTTLE_RATES[scope] when unset; authenticated requests are keyed
+    by user, anonymous ones by client IP. RATELIMIT_ENABLE = False turns it off.
+    """
+    scope: Optional[str] = None
+    rate: Optional[str] = None
+
+    def __init__(self) -> None:
+        self.retry_after: Optional[float] = None
+
+    def get_scope(self, view) -> Optional[str]:
+        return self.scope
+
+    def get_rate(self, scope: str) -> str:
+        if self.rate is not None:
+            return self.rate
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[scope]
+        except KeyError:
+            raise ImproperlyConfigured(f'No throttle rate set for scope {scope!r}')
+
+    def allow_request(self, request, view) -> bool:
+        scope = self.get_scope(view)
+        if scope is None or not getattr(settings, 'RATELIMIT_ENABLE', True):
+            return True
+        rate = self.get_rate(scope)
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            ident = f'user:{user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        decision = limiter.check(f'{scope}:{ident}', rate)
+        self.retry_after = decision.retry_after
+        return decision.allowed
+
+    def wait(self) -> Optional[float]:
+        return self.retry_after
+
+
+class SharedScopedRateThrottle(SharedRateThrottle):
+    """Takes the scope from the view's `throttle_scope`, like DRF's ScopedRateThrottle."""
+
+    def get_scope(self, view) -> Optional[str]:
+        return getattr(view, 'throttle_scope', None)
@@ -51,6 +51,76 @@ CORS_ALLOW_CREDENTIALS = True
 
 # Gemini API Configuration
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+# 'google' calls the real API; 'fake' uses backend.fake_gemini for offline load tests
+GEMINI_BACKEND = os.getenv('GEMINI_BACKEND', 'google')
+GEMINI_FAKE = {
+    'latency_ms': float(os.getenv('GEMINI_FAKE_LATENCY_MS', '800')),
+    'latency_sigma': float(os.getenv('GEMINI_FAKE_LATENCY_SIGMA', '0.5')),
+    'error_rate': float(os.getenv('GEMINI_FAKE_ERROR_RATE', '0')),
+    'rate_limit_rate': float(os.getenv('GEMINI_FAKE_RATE_LIMIT_RATE', '0')),
+    'chunks': 4,
+    'seed': int(os.getenv('GEMINI_FAKE_SEED', '0')),
+}
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '10'))  # Seconds per call
+# Circuit breaker: open after this many consecutive failures or slow calls,
+# retry after GEMINI_BREAKER_RESET seconds
+GEMINI_BREAKER_FAILURES = int(os.getenv('GEMINI_BREAKER_FAILURES', '5'))
+GEMINI_BREAKER_SLOW_CALL = float(os.getenv('GEMINI_BREAKER_SLOW_CALL', '8'))
+GEMINI_BREAKER_RESET = float(os.getenv('GEMINI_BREAKER_RESET', '30'))
+
+# Shared Gemini quota (see backend/llm_quota.py). Counted in the default
+# cache, so it only spans workers and nodes when that cache is shared.
+LLM_REQUESTS_PER_MINUTE = int(os.getenv('LLM_REQUESTS_PER_MINUTE', '60'))
+LLM_TOKENS_PER_MINUTE = int(os.getenv('LLM_TOKENS_PER_MINUTE', '32000'))
+LLM_BACKGROUND_SHARE = float(os.getenv('LLM_BACKGROUND_SHARE', '0.5'))  # Of each window
+LLM_USER_DAILY_TOKENS = int(os.getenv('LLM_USER_DAILY_TOKENS', '50000'))
+LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', '5'))  # Seconds a call may wait
+LLM_EXPECTED_OUTPUT_TOKENS = 512
+LLM_WARMER_SHARE = float(os.getenv('LLM_WARMER_SHARE', '0.25'))  # For warm_plan_analyses
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'OPTIONS': {'CLIENT_CLASS': 'django_redis.client.DefaultClient'},
+        }
+    }
+
+# Memoized rule-based recommendations (api.recommendation_engine): in-process
+# LRU size, and whether to share results between workers through the cache
+RECOMMENDATION_MEMO_SIZE = int(os.getenv('RECOMMENDATION_MEMO_SIZE', '4096'))
+RECOMMENDATION_SHARED_CACHE = os.getenv('RECOMMENDATION_SHARED_CACHE', '0') == '1'
+RECOMMENDATION_SHARED_TTL = 3600
+
+# Seconds a dashboard widget stays cached (insurance.dashboard); changes
+# invalidate it sooner through a per-user version
+DASHBOARD_WIDGET_TTL = int(os.getenv('DASHBOARD_WIDGET_TTL', '300'))
+# Upper bound on staleness of the write-through profile and preference cache
+# (insurance.profile_cache) after writes that skip signals
+PROFILE_CACHE_TTL = int(os.getenv('PROFILE_CACHE_TTL', '3600'))
+# Seconds a memoized plan comparison (insurance.comparison) stays cached; plan
+# edits and profile changes move its key sooner
+COMPARISON_CACHE_TTL = int(os.getenv('COMPARISON_CACHE_TTL', '3600'))
+# Months of Feedback and Recommendation rows kept in the database, including
+# the current one; archive_partitions moves older months to PARTITION_ARCHIVE_DIR
+PARTITION_RETENTION_MONTHS = int(os.getenv('PARTITION_RETENTION_MONTHS', '12'))
+PARTITION_ARCHIVE_DIR = os.getenv('PARTITION_ARCHIVE_DIR', str(BASE_DIR / 'archive'))
+# Months of partitions partition_tables creates ahead of time (PostgreSQL)
+PARTITION_MONTHS_AHEAD = int(os.getenv('PARTITION_MONTHS_AHEAD', '3'))
+# Seconds django.setup() plus URL loading may take in a fresh interpreter
+# (backend.startup_profile, enforced by api.tests.test_startup)
+STARTUP_TIME_BUDGET = float(os.getenv('STARTUP_TIME_BUDGET', '0.75'))
+
+# Rate limits (backend.ratelimit); only turn off for load tests (see the loadtest command)
+RATELIMIT_ENABLE = os.getenv('RATELIMIT_ENABLE', '1') == '1'
+# Share of a client's remaining allowance a worker may admit without a Redis
+# round trip, and for how many seconds
+RATELIMIT_LOCAL_SHARE = float(os.getenv('RATELIMIT_LOCAL_SHARE', '0.1'))
+RATELIMIT_LOCAL_TTL = float(os.getenv('RATELIMIT_LOCAL_TTL', '1.0'))
+
+# Serve LLM-bound endpoints with native async views (enabled by backend/asgi.py)
+ASYNC_LLM_VIEWS = os.getenv('DJANGO_ASYNC_LLM_VIEWS', '0') == '1'
 
 
 # Application definition
@@ -84,9 +154,20 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.ORJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'register': '5/m',
+        'recommendations': '10/m',
+        'password_reset': '5/m',
+        'password_reset_confirm': '5/m',
+    },
 }
 
 # JWT settings
@@ -97,8 +178,13 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Adds the profile claim read by backend.authentication.ProfileClaimsAuthentication
+    'TOKEN_OBTAIN_SERIALIZER': 'backend.authentication.ProfileTokenObtainPairSerializer',
 }
 
+# Seconds a user row is cached for requests whose token claims are stale
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', '300'))
+
 # CORS settings
 # Using CORS_ALLOWED_ORIGINS instead of CORS_ALLOW_ALL_ORIGINS for better security
 
@@ -205,6 +291,11 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = ''  # Add your email
 EMAIL_HOST_PASSWORD = ''  # Add your email password or app-specific password
 
+# Outbound mail queue (insurance.mail_queue, delivered by send_queued_mail)
+MAIL_QUEUE_BATCH_SIZE = 50
+MAIL_QUEUE_MAX_ATTEMPTS = 5
+MAIL_QUEUE_RETRY_SECONDS = 30  # Doubles with each failed attempt
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -214,6 +305,10 @@ LOGGING = {
             'class': 'logging.FileHandler',
             'filename': os.path.join(BASE_DIR, 'error.log'),
         },
+        'console': {
+            'level': 'INFO',
+            'class': 'logging.StreamHandler',
+        },
     },
     'loggers': {
         'django': {
@@ -221,5 +316,11 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': True,
         },
+        # Per-call prompt and response token usage
+        'llm': {
+            'handlers': ['console'],
+            'level': os.getenv('LLM_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
     },
 }
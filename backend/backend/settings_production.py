@@ -0,0 +1,25 @@
+"""
+Production settings for backend project.
+
+Extends the development settings; select with
+DJANGO_SETTINGS_MODULE=backend.settings_production.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import REST_FRAMEWORK
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+# JSON only: the browsable API renders every response through templates
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+    ],
+}
+
+EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
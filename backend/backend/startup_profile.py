@@ -0,0 +1,120 @@
+"""
+Worker boot cost: how long `django.setup()` and URL loading take in a fresh
+interpreter, the resident memory afterwards, and which imports cost most.
+
+Every gunicorn worker, manage.py command and test run pays this before doing
+anything else. Heavy SDKs (LAZY_MODULES) are imported where they are used
+instead, e.g. google.generativeai in `gemini_client.sdk()`. A stray
+module-level import brings them back into every boot;
+`manage.py profile_startup --check` and api.tests.test_startup fail when
+that happens or when boot exceeds STARTUP_TIME_BUDGET.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, NamedTuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Imported on first use only; none may be loaded by boot
+LAZY_MODULES = ('google.generativeai', 'google.api_core', 'grpc')
+
+BOOT_SCRIPT = f"""
+import json, resource, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - start
+from django.urls import get_resolver
+get_resolver().url_patterns
+json.dump({{
+    'setup_seconds': setup,
+    'total_seconds': time.perf_counter() - start,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'lazy_modules_loaded': [name for name in {LAZY_MODULES!r} if name in sys.modules],
+}}, sys.stdout)
+"""
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> List[ImportTime]:
+    """Rows of `python -X importtime` output."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        if self_us.strip().isdigit():
+            rows.append(ImportTime(module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_startup(importtime: bool = False) -> Dict[str, Any]:
+    """Boot Django with the current settings in a new interpreter and report its cost."""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', BOOT_SCRIPT]
+    result = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f'Django failed to boot:\n{result.stderr[-2000:]}')
+    report = json.loads(result.stdout)
+    if importtime:
+        report['imports'] = parse_importtime(result.stderr)
+    return report
+
+
+def startup_budget() -> float:
+    return getattr(settings, 'STARTUP_TIME_BUDGET', 0.75)
+
+
+class Command(BaseCommand):
+    help = (
+        'Profiles worker boot: time for django.setup() and URL loading in a fresh interpreter, '
+        'peak RSS, and the slowest imports. --check fails if boot exceeds STARTUP_TIME_BUDGET or '
+        'loads an SDK that should be imported lazily.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='Boots to time; the fastest one is reported')
+        parser.add_argument('--top', type=int, default=20, help='Imports to list')
+        parser.add_argument('--sort', choices=['cumulative', 'self'], default='cumulative',
+                            help='Rank imports by time including or excluding their own imports')
+        parser.add_argument('--check', action='store_true', help='Exit with an error when over budget')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be at least 1')
+        try:
+            runs = [measure_startup() for _ in range(options['runs'])]
+            profile = measure_startup(importtime=True)
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        best = min(runs, key=lambda run: run['total_seconds'])
+
+        key = 'cumulative_us' if options['sort'] == 'cumulative' else 'self_us'
+        imports = sorted(profile['imports'], key=lambda row: getattr(row, key), reverse=True)
+        self.stdout.write(f'{"self ms":>9} {"cumul ms":>9}  module')
+        for row in imports[:options['top']]:
+            self.stdout.write(f'{row.self_us / 1000:>9.1f} {row.cumulative_us / 1000:>9.1f}  {row.module}')
+
+        budget = startup_budget()
+        self.stdout.write(
+            f'\ndjango.setup(): {best["setup_seconds"]:.3f}s, with URLs: {best["total_seconds"]:.3f}s '
+            f'(best of {len(runs)}, budget {budget:.2f}s); peak RSS {best["max_rss_kb"] / 1024:.1f} MB'
+        )
+        problems = []
+        if best['total_seconds'] > budget:
+            problems.append(f'boot took {best["total_seconds"]:.3f}s, over the {budget:.2f}s budget')
+        if best['lazy_modules_loaded']:
+            problems.append(f'boot imported {", ".join(best["lazy_modules_loaded"])}')
+        for problem in problems:
+            self.stderr.write(problem)
+        if problems and options['check']:
+            raise CommandError('Startup budget exceeded')
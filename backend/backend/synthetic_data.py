@@ -0,0 +1,404 @@
+"""
+Seeded synthetic data for benchmarks and load tests, for the api and
+insurance apps alike: users, plans, feedback and, for insurance,
+recommendations, comparisons and dashboard preferences.
+
+Every table is generated in blocks of `--batch-size` rows. Each block draws
+from its own random.Random seeded with (seed, table, block). Primary keys are
+assigned after the current maximum, so foreign keys can be drawn without
+reading rows back. The same seed on the same starting data yields the same
+rows, whatever the number of workers. Blocks go to a process pool, each
+worker with its own connection and one bulk_create per block. SQLite allows
+a single writer, so there blocks run in-process. Users share one password,
+hashed once.
+
+Distributions are chosen to resemble production rather than be uniform:
+- ages are roughly normal around 42 and budgets log-normal
+- a few users and a few popular plans account for most activity
+- ratings are J-shaped
+- activity grows towards the present, over `--days`
+
+bulk_create sends no signals, so each app's catalog counter is bumped
+afterwards.
+
+The command is shared by both apps, as api and insurance cannot import each
+other; models are looked up by label.
+"""
+
+import datetime
+import math
+import multiprocessing
+import os
+import random
+import time
+from decimal import Decimal
+from importlib import import_module
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+
+DEFAULT_PASSWORD = 'synthetic-pass-123'
+
+PROVIDERS = ('Acme Health', 'BlueRiver', 'Cardinal Care', 'Evergreen Mutual', 'Harbor Life',
+             'Keystone Health', 'Meridian', 'NorthStar', 'Pinnacle', 'Summit Assurance')
+HOSPITALS = ('City General', "St. Mary's", 'Mercy Medical', 'University Hospital', 'Riverside',
+             'Lakeview Clinic', "Children's Hospital", 'Veterans Memorial', 'Sunrise Health', 'Valley Medical')
+COVERAGE_TERMS = ('hospitalization', 'outpatient care', 'prescriptions', 'maternity', 'dental',
+                  'vision', 'mental health', 'emergency care', 'preventive care', 'physiotherapy')
+CONDITIONS = ('hypertension', 'type 2 diabetes', 'asthma', 'high cholesterol', 'arthritis',
+              'depression', 'migraine', 'hypothyroidism', 'back pain', 'allergies')
+COMMENTS = {
+    1: ('Claims took months to settle.', 'Customer support never called back.', 'Far too expensive.'),
+    2: ('Premiums went up again.', 'Hard to find an in-network doctor.', 'Confusing paperwork.'),
+    3: ('Does the job.', 'Average coverage for the price.', 'Recommendation was okay.'),
+    4: ('Good value overall.', 'Easy to compare plans.', 'Claims were handled quickly.'),
+    5: ('Excellent coverage and support!', 'Exactly the plan my family needed.', 'Great recommendation.'),
+}
+RATING_WEIGHTS = (8, 7, 15, 30, 40)
+FAMILY_SIZE_WEIGHTS = (35, 25, 17, 14, 6, 3)
+PLAN_TYPES = (('basic', 30), ('standard', 30), ('premium', 12), ('family', 15), ('senior', 8), ('specialized', 5))
+# Median monthly premium per plan type
+PLAN_PREMIUMS = {'basic': 180, 'standard': 320, 'premium': 620, 'family': 750, 'senior': 480, 'specialized': 400}
+FEEDBACK_TYPES = (('recommendation', 40), ('plan', 35), ('ui', 10), ('general', 15))
+WIDGET_ORDERS = ('recommendations,recent_plans,feedback', 'recent_plans,recommendations',
+                 'comparisons,recommendations,feedback', 'recommendations,comparisons,recent_plans,feedback')
+
+
+class Table(NamedTuple):
+    label: str  # app_label.ModelName
+    count: str  # Count option giving the number of rows
+    build: Callable[[random.Random, int, Dict[str, Any]], Any]  # (rng, index, context) -> unsaved instance
+    links: Optional[Callable[[random.Random, List[Any], Dict[str, Any]], List[Any]]] = None  # m2m rows
+
+
+# Distributions
+
+def _created(rng: random.Random, context: Dict[str, Any]) -> datetime.datetime:
+    # Density falls linearly with age, so recent months hold the most rows
+    days_ago = context['days'] * (1 - math.sqrt(rng.random()))
+    return context['now'] - datetime.timedelta(days=days_ago)
+
+
+def _pick(rng: random.Random, context: Dict[str, Any], label: str, skew: float = 2.0) -> int:
+    """A primary key of `label`, skewed so that low indexes are picked most."""
+    return context['first'][label] + int(context['rows'][label] * rng.random() ** skew)
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(f'{value:.2f}')
+
+
+def _weighted(rng: random.Random, choices: Sequence[Tuple[Any, int]]) -> Any:
+    return rng.choices([choice for choice, _ in choices], [weight for _, weight in choices])[0]
+
+
+def _user_fields(rng: random.Random, index: int, context: Dict[str, Any]) -> Dict[str, Any]:
+    age = max(18, min(85, int(rng.gauss(42, 14))))
+    family_size = rng.choices(range(1, 7), FAMILY_SIZE_WEIGHTS)[0]
+    conditions = rng.sample(CONDITIONS, min(len(CONDITIONS), int(rng.expovariate(1.2 - age / 100))))
+    number = context['first'][context['user_label']] + index
+    return {
+        'username': f'synthetic{number}',
+        'email': f'synthetic{number}@example.com',
+        'password': context['password'],
+        'name': f'Synthetic User {number}',
+        'age': age,
+        'budget': _money(rng.lognormvariate(math.log(350 + 120 * family_size), 0.45)),
+        'family_size': family_size,
+        'medical_history': ', '.join(conditions).capitalize(),
+    }
+
+
+def _plan_terms(rng: random.Random, terms: Sequence[str], low: int, high: int) -> str:
+    return ', '.join(rng.sample(terms, rng.randint(low, high)))
+
+
+def _rating_comment(rng: random.Random) -> Tuple[int, str]:
+    rating = rng.choices(range(1, 6), RATING_WEIGHTS)[0]
+    return rating, rng.choice(COMMENTS[rating])
+
+
+# api
+
+def build_api_user(rng: random.Random, index: int, context: Dict[str, Any]) -> Any:
+    created_at = _created(rng, context)
+    return apps.get_model('api.User')(**_user_fields(rng, index, context), date_joined=created_at,
+                                      created_at=created_at)
+
+
+def build_api_plan(rng: random.Random, index: int, context: Dict[str, Any]) -> Any:
+    provider = rng.choice(PROVIDERS)
+    return apps.get_model('api.InsurancePlan')(
+        name=f'{provider} Plan {context["first"]["api.InsurancePlan"] + index}',
+        coverage=_plan_terms(rng, COVERAGE_TERMS, 3, 7).capitalize(),
+        price=_money(rng.lognormvariate(math.log(320), 0.5)),
+        conditions=rng.choice(('No waiting period', '30-day waiting period', 'Pre-existing conditions after 12 months')),
+        created_at=_created(rng, context),
+    )
+
+
+def build_api_feedback(rng: random.Random, index: int, context: Dict[str, Any]) -> Any:
+    rating, comments = _rating_comment(rng)
+    return apps.get_model('api.Feedback')(
+        user_id=_pick(rng, context, 'api.User'), rating=rating, comments=comments, created_at=_created(rng, context)
+    )
+
+
+# insurance
+
+def build_insurance_user(rng: random.Random, index: int, context: Dict[str, Any]) -> Any:
+    created_at = _created(rng, context)
+    return apps.get_model('insurance.User')(
+        **_user_fields(rng, index, context),
+        preferred_hospital_network=rng.choice(HOSPITALS) if rng.random() < 0.3 else '',
+        is_profile_complete=rng.random() < 0.7,
+        dark_mode_enabled=rng.random() < 0.25,
+        date_joined=created_at,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def build_insurance_plan(rng: random.Random, index: int, context: Dict[str, Any]) -> Any:
+    plan_type = _weighted(rng, PLAN_TYPES)
+    provider = rng.choice(PROVIDERS)
+    premium = rng.lognormvariate(math.log(PLAN_PREMIUMS[plan_type]), 0.3)
+    created_at = _created(rng, context)
+    return apps.get_model('insurance.InsurancePlan')(
+        name=f'{provider} {plan_type.title()} {context["first"]["insurance.InsurancePlan"] + index}',
+        plan_type=plan_type,
+        provider=provider,
+        description=f'{plan_type.title()} health insurance from {provider}.',
+        coverage_details=_plan_terms(rng, COVERAGE_TERMS, 3, 8).capitalize(),
+        eligibility_criteria=rng.choice(('Open to all residents', 'Ages 18-64', 'Ages 60 and over',
+                                         'Families of two or more')),
+        # Cheaper plans carry higher deductibles
+        monthly_premium=_money(premium),
+        deductible=_money(max(250.0, rng.gauss(400000 / premium, 300))),
+        copay=_money(rng.choice((10, 20, 25, 30, 40, 50))) if rng.random() < 0.8 else None,
+        max_coverage=_money(rng.choice((100000, 250000, 500000, 1000000, 2000000))) if rng.random() < 0.9 else None,
+        network_hospitals=_plan_terms(rng, HOSPITALS, 2, 6),
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def build_insurance_preferences(rng: random.Random, index: int, context: Dict[str, Any]) -> Any:
+    created_at = _created(rng, context)
+    return apps.get_model('insurance.UserDashboardPreference')(
+        user_id=context['first']['insurance.User'] + index,
+        default_view=_weighted(rng, (('grid', 60), ('list', 30), ('compact', 10))),
+        show_premium_first=rng.random() < 0.4,
+        notification_preferences={'email_notifications': rng.random() < 0.8, 'premium_alerts': rng.random() < 0.5},
+        widgets_order=rng.choice(WIDGET_ORDERS),
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def build_insurance_feedback(rng: random.Random, index: int, context: Dict[str, Any]) -> Any:
+    rating, comments = _rating_comment(rng)
+    feedback_type = _weighted(rng, FEEDBACK_TYPES)
+    created_at = _created(rng, context)
+    return apps.get_model('insurance.Feedback')(
+        user_id=_pick(rng, context, 'insurance.User'),
+        feedback_type=feedback_type,
+        insurance_plan_id=_pick(rng, context, 'insurance.InsurancePlan', 3.0) if feedback_type == 'plan' else None,
+        rating=rating,
+        ui_element=rng.choice(('dashboard', 'plan list', 'comparison', 'search')) if feedback_type == 'ui' else '',
+        comments=comments,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def build_insurance_recommendation(rng: random.Random, index: int, context: Dict[str, Any]) -> Any:
+    created_at = _created(rng, context)
+    accepted = rng.random() < 0.25
+    accepted_date = min(context['now'], created_at + datetime.timedelta(hours=rng.expovariate(1 / 48))) if accepted else None
+    return apps.get_model('insurance.Recommendation')(
+        user_id=_pick(rng, context, 'insurance.User'),
+        insurance_plan_id=_pick(rng, context, 'insurance.InsurancePlan', 3.0),
+        recommendation_score=round(rng.betavariate(5, 2), 4),
+        notes=rng.choice(('Fits budget', 'Covers existing conditions', 'Good family coverage', '')),
+        is_accepted=accepted,
+        accepted_date=accepted_date,
+        created_at=created_at,
+        updated_at=accepted_date or created_at,
+    )
+
+
+def build_insurance_comparison(rng: random.Random, index: int, context: Dict[str, Any]) -> Any:
+    created_at = _created(rng, context)
+    return apps.get_model('insurance.PlanComparison')(
+        user_id=_pick(rng, context, 'insurance.User'),
+        comparison_name=rng.choice(('Shortlist', 'Family options', 'Cheapest plans', 'Renewal', '')),
+        notes='',
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def link_comparison_plans(rng: random.Random, comparisons: List[Any], context: Dict[str, Any]) -> List[Any]:
+    through = apps.get_model('insurance.PlanComparison').plans.through
+    links = []
+    for comparison in comparisons:
+        plan_ids = {_pick(rng, context, 'insurance.InsurancePlan', 3.0) for _ in range(rng.randint(2, 5))}
+        links.extend(through(plancomparison_id=comparison.pk, insuranceplan_id=plan_id) for plan_id in sorted(plan_ids))
+    return links
+
+
+# Tables per app, in dependency order
+APP_TABLES = {
+    'api': (
+        Table('api.User', 'users', build_api_user),
+        Table('api.InsurancePlan', 'plans', build_api_plan),
+        Table('api.Feedback', 'feedback', build_api_feedback),
+    ),
+    'insurance': (
+        Table('insurance.User', 'users', build_insurance_user),
+        Table('insurance.InsurancePlan', 'plans', build_insurance_plan),
+        Table('insurance.UserDashboardPreference', 'users', build_insurance_preferences),
+        Table('insurance.Feedback', 'feedback', build_insurance_feedback),
+        Table('insurance.Recommendation', 'recommendations', build_insurance_recommendation),
+        Table('insurance.PlanComparison', 'comparisons', build_insurance_comparison, link_comparison_plans),
+    ),
+}
+TABLES = {table.label: table for tables in APP_TABLES.values() for table in tables}
+
+
+def insert_block(task: Tuple[str, int, int, int, Dict[str, Any]]) -> int:
+    """Build and insert rows [start, stop) of a table; runs in the pool workers."""
+    label, block, start, stop, context = task
+    table = TABLES[label]
+    rng = random.Random(f'{context["seed"]}:{label}:{block}')
+    model = apps.get_model(label)
+    rows = []
+    for index in range(start, stop):
+        row = table.build(rng, index, context)
+        row.pk = context['first'][label] + index
+        rows.append(row)
+    with transaction.atomic():
+        model._default_manager.bulk_create(rows)
+        links = table.links(rng, rows, context) if table.links else []
+        if links:
+            type(links[0])._default_manager.bulk_create(links)
+    return len(rows)
+
+
+class explicit_timestamps:
+    """Let generated rows keep their own created_at/updated_at instead of auto_now values."""
+
+    def __init__(self, models: Sequence[Any]):
+        self.fields = [
+            field for model in models for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+        ]
+
+    def __enter__(self):
+        self.saved = [(field, field.auto_now, field.auto_now_add) for field in self.fields]
+        for field in self.fields:
+            field.auto_now = field.auto_now_add = False
+
+    def __exit__(self, *exc_info):
+        for field, auto_now, auto_now_add in self.saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates seeded synthetic users, plans, feedback, recommendations and comparisons '
+        'for benchmarking, with bulk inserts spread over worker processes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--app', action='append', choices=sorted(APP_TABLES),
+                            help='App to generate rows for; repeatable (default: every installed one)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--plans', type=int, default=500)
+        parser.add_argument('--feedback', type=int, default=100000)
+        parser.add_argument('--recommendations', type=int, default=100000)
+        parser.add_argument('--comparisons', type=int, default=20000)
+        parser.add_argument('--days', type=int, default=730, help='Spread created_at over this many past days')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Rows per block and bulk insert')
+        parser.add_argument('--workers', type=int, default=min(8, os.cpu_count() or 1),
+                            help='Worker processes (1 on SQLite)')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password of every generated user')
+
+    def handle(self, *args, **options):
+        labels = options['app'] or [label for label in APP_TABLES if apps.is_installed(label)]
+        missing = [label for label in labels if not apps.is_installed(label)]
+        if missing or not labels:
+            raise CommandError(f'Not installed: {", ".join(missing or APP_TABLES)}')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        if min(options['users'], options['plans']) < 1 and max(
+                options['feedback'], options['recommendations'], options['comparisons']) > 0:
+            raise CommandError('Feedback, recommendations and comparisons need --users and --plans')
+        workers = options['workers']
+        if connection.vendor == 'sqlite' and workers > 1:
+            self.stdout.write('SQLite allows one writer; generating in-process')
+            workers = 1
+
+        started = time.perf_counter()
+        total = 0
+        for label in labels:
+            tables = APP_TABLES[label]
+            models = [apps.get_model(table.label) for table in tables]
+            context = self._context(label, tables, options)
+            with explicit_timestamps(models):
+                for table in tables:
+                    table_started = time.perf_counter()
+                    rows = self._generate(table, context, options['batch_size'], workers)
+                    total += rows
+                    self.stdout.write(f'{table.label}: {rows} rows in {time.perf_counter() - table_started:.1f}s')
+            self._finish(label, models)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s)'
+        ))
+
+    def _context(self, label: str, tables: Sequence[Table], options: Dict[str, Any]) -> Dict[str, Any]:
+        """Everything the builders need, picklable for the workers."""
+        first = {}
+        for table in tables:
+            model = apps.get_model(table.label)
+            first[table.label] = (model._default_manager.aggregate(last=Max('pk'))['last'] or 0) + 1
+        return {
+            'seed': options['seed'],
+            'user_label': f'{label}.User',
+            'first': first,
+            'rows': {table.label: options[table.count] for table in tables},
+            'days': options['days'],
+            # Whole hours, so reruns with the same seed within the hour match exactly
+            'now': datetime.datetime.now(datetime.timezone.utc).replace(minute=0, second=0, microsecond=0),
+            'password': make_password(options['password']),
+        }
+
+    def _generate(self, table: Table, context: Dict[str, Any], batch_size: int, workers: int) -> int:
+        rows = context['rows'][table.label]
+        tasks = [
+            (table.label, block, start, min(rows, start + batch_size), context)
+            for block, start in enumerate(range(0, rows, batch_size))
+        ]
+        if workers == 1 or len(tasks) == 1:
+            return sum(insert_block(task) for task in tasks)
+        # Forked workers must open their own connections
+        connections.close_all()
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            return sum(pool.imap_unordered(insert_block, tasks))
+
+    def _finish(self, label: str, models: Sequence[Any]) -> None:
+        # Explicit primary keys leave PostgreSQL sequences behind
+        statements = connection.ops.sequence_reset_sql(no_style(), list(models))
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+        import_module(f'{label}.catalog').bump_catalog_counter()
@@ -21,7 +21,9 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework.documentation import include_docs_urls
 from api.views import (UserViewSet, InsurancePlanViewSet, FeedbackViewSet,
-                     RecommendationViewSet)
+                     RecommendationViewSet, llm_metrics)
+from api import async_views
+from backend.async_api import async_routes_enabled
 
 # Create a router and register our viewsets with it
 router = DefaultRouter()
@@ -39,6 +41,14 @@ urlpatterns = [
     path('api/', include(router.urls)),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/llm/metrics/', llm_metrics, name='llm-metrics'),
 
     path('api-auth/', include('rest_framework.urls')),  # Adds login to browsable API
 ]
+
+if async_routes_enabled():
+    # Served ahead of the router so LLM calls do not hold a worker thread
+    urlpatterns = [
+        path('api/recommendations/', async_views.recommendation_list, name='recommendation-list'),
+        path('api/feedback/analytics/', async_views.feedback_analytics, name='feedback-analytics'),
+    ] + urlpatterns
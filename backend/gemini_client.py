@@ -1,77 +1,317 @@
 import os
-import google.generativeai as genai
-from typing import Optional, Dict, Any
+import asyncio
+import threading
+import time
+from asgiref.sync import sync_to_async
+from typing import Optional, Dict, Any, List
 from django.conf import settings
 
+from backend import llm_quota, prompts
+
+
+class LLMUnavailable(Exception):
+    """Raised when Gemini fails, misses its deadline or the circuit is open."""
+
+
+class CircuitBreaker:
+    """Per-process circuit breaker for Gemini calls.
+
+    Opens after `failure_threshold` consecutive failures, where calls slower
+    than `slow_call_seconds` count as failures too. While open, calls are
+    rejected without reaching Gemini; after `reset_seconds` a single trial
+    call is let through and its outcome closes or re-opens the circuit.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, slow_call_seconds: float, reset_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """Whether calls are currently rejected, without claiming the trial call."""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at < self.reset_seconds
+            return self.state == self.HALF_OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                # Let exactly one trial call through
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record(self, succeeded: bool, latency: float) -> None:
+        """Record the outcome of a call that `allow` let through."""
+        with self._lock:
+            if succeeded and latency <= self.slow_call_seconds:
+                self.state = self.CLOSED
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        """Close the circuit and forget past failures."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = 0.0
+
+
+breaker = CircuitBreaker(
+    failure_threshold=getattr(settings, 'GEMINI_BREAKER_FAILURES', 5),
+    slow_call_seconds=getattr(settings, 'GEMINI_BREAKER_SLOW_CALL', 8.0),
+    reset_seconds=getattr(settings, 'GEMINI_BREAKER_RESET', 30.0)
+)
+
+def sdk():
+    """The google.generativeai module, imported on first use.
+
+    The SDK takes about half a second to import, so loading it lazily keeps it
+    off worker boot, manage.py commands and tests that never call Gemini.
+    """
+    import google.generativeai
+    return google.generativeai
+
 # Configure Gemini API
 def configure_gemini():
     """Configure Gemini API with the API key from Django settings."""
     api_key = settings.GEMINI_API_KEY
     if not api_key:
         raise ValueError('GEMINI_API_KEY not set in Django settings')
-    genai.configure(api_key=api_key)
+    sdk().configure(api_key=api_key)
+
+def use_fake_backend() -> bool:
+    """Whether GEMINI_BACKEND selects the offline stand-in (backend.fake_gemini)."""
+    return getattr(settings, 'GEMINI_BACKEND', 'google') == 'fake'
+
+def get_model():
+    """Gemini model for the configured GEMINI_BACKEND."""
+    if use_fake_backend():
+        # Also lazy: it imports google.api_core, and with it grpc
+        from backend.fake_gemini import FakeGenerativeModel
+        return FakeGenerativeModel('gemini-pro')
+    configure_gemini()
+    return sdk().GenerativeModel('gemini-pro')
+
+RECOMMENDATION_PROMPT = """
+    Based on the following user information, provide personalized health insurance recommendations:
+    - Age: {age}
+    - Budget: ${budget}
+    - Family Size: {family_size}
+    - Medical History: {medical_history}
+
+    Please provide a detailed recommendation including:
+    1. Type of plan that would be most suitable
+    2. Coverage recommendations
+    3. Cost considerations
+    4. Important factors to consider
+    """
+
+ANALYSIS_PROMPT = """
+    Analyze the following health insurance plan and provide insights:
+    - Plan Name: {name}
+    - Coverage: {coverage}
+    - Price: ${price}
+    - Conditions: {conditions}
+
+    Please provide:
+    1. Key benefits of this plan
+    2. Potential limitations or drawbacks
+    3. Who this plan would be most suitable for
+    4. Cost-benefit analysis
+    """
+
+def _recommendation_prompt(user_data: Dict[str, Any]) -> str:
+    """Build the recommendation prompt for a user profile."""
+    return prompts.build_prompt(
+        RECOMMENDATION_PROMPT,
+        age=user_data.get('age'),
+        budget=user_data.get('budget'),
+        family_size=user_data.get('family_size'),
+        medical_history=user_data.get('medical_history')
+    )
+
+def _analysis_prompt(plan_data: Dict[str, Any]) -> str:
+    """Build the analysis prompt for an insurance plan."""
+    return prompts.build_prompt(
+        ANALYSIS_PROMPT,
+        name=plan_data.get('name'),
+        coverage=plan_data.get('coverage'),
+        price=plan_data.get('price'),
+        conditions=plan_data.get('conditions')
+    )
+
+def _timeout() -> float:
+    """Deadline in seconds for a single Gemini call."""
+    return getattr(settings, 'GEMINI_TIMEOUT', 10.0)
+
+def _usage(response) -> Optional[int]:
+    """Total tokens Gemini reports for a response, if available."""
+    usage = getattr(response, 'usage_metadata', None)
+    return getattr(usage, 'total_token_count', None) or None
+
+def generate(prompt: str, priority: str = llm_quota.INTERACTIVE, user_id=None) -> str:
+    """Run a prompt through Gemini under the shared quota, deadline and circuit breaker.
+
+    Args:
+        prompt: Prompt text
+        priority: Quota class, `llm_quota.INTERACTIVE` or `llm_quota.BACKGROUND`
+        user_id: User charged for the tokens, if any
+
+    Raises:
+        LLMUnavailable: If the circuit is open, the quota is exhausted, or
+            the call fails or times out
+    """
+    if breaker.is_open():
+        raise LLMUnavailable('Gemini circuit is open')
+    tokens = llm_quota.estimate_tokens(prompt)
+    try:
+        llm_quota.acquire(tokens, priority, user_id)
+    except llm_quota.QuotaExceeded as e:
+        raise LLMUnavailable(str(e)) from e
+    if not breaker.allow():
+        raise LLMUnavailable('Gemini circuit is open')
+
+    start = time.monotonic()
+    try:
+        model = get_model()
+        response = model.generate_content(prompt, request_options={'timeout': _timeout()})
+        text = response.text
+        prompts.log_usage('gemini_client', prompt, response)
+    except Exception as e:
+        breaker.record(False, time.monotonic() - start)
+        raise LLMUnavailable(str(e) or type(e).__name__) from e
+    breaker.record(True, time.monotonic() - start)
+    llm_quota.record_usage(tokens, _usage(response), user_id)
+    return text
+
+async def agenerate(prompt: str, priority: str = llm_quota.INTERACTIVE, user_id=None) -> str:
+    """Async version of `generate` for ASGI views."""
+    if breaker.is_open():
+        raise LLMUnavailable('Gemini circuit is open')
+    tokens = llm_quota.estimate_tokens(prompt)
+    try:
+        await llm_quota.aacquire(tokens, priority, user_id)
+    except llm_quota.QuotaExceeded as e:
+        raise LLMUnavailable(str(e)) from e
+    if not breaker.allow():
+        raise LLMUnavailable('Gemini circuit is open')
+
+    start = time.monotonic()
+    timeout = _timeout()
+    try:
+        model = get_model()
+        # wait_for also bounds time spent outside the RPC deadline
+        response = await asyncio.wait_for(
+            model.generate_content_async(prompt, request_options={'timeout': timeout}),
+            timeout
+        )
+        text = response.text
+        prompts.log_usage('gemini_client', prompt, response)
+    except Exception as e:
+        breaker.record(False, time.monotonic() - start)
+        raise LLMUnavailable(str(e) or type(e).__name__) from e
+    breaker.record(True, time.monotonic() - start)
+    await sync_to_async(llm_quota.record_usage)(tokens, _usage(response), user_id)
+    return text
 
-def get_insurance_recommendation(user_data: Dict[str, Any]) -> str:
+def get_insurance_recommendation(user_data: Dict[str, Any], user_id=None) -> str:
     """Get insurance plan recommendations using Gemini.
     
     Args:
         user_data: Dictionary containing user information like age, budget, etc.
+        user_id: User charged for the tokens, if any
         
     Returns:
         str: AI-generated insurance recommendation
+
+    Raises:
+        LLMUnavailable: If Gemini cannot answer; see `fallback_recommendation`
     """
-    try:
-        configure_gemini()
-        model = genai.GenerativeModel('gemini-pro')
-        
-        # Construct the prompt
-        prompt = f"""Based on the following user information, provide personalized health insurance recommendations:
-        - Age: {user_data.get('age', 'Not specified')}
-        - Budget: ${user_data.get('budget', 'Not specified')}
-        - Family Size: {user_data.get('family_size', 'Not specified')}
-        - Medical History: {user_data.get('medical_history', 'Not specified')}
-        
-        Please provide a detailed recommendation including:
-        1. Type of plan that would be most suitable
-        2. Coverage recommendations
-        3. Cost considerations
-        4. Important factors to consider
-        """
-        
-        response = model.generate_content(prompt)
-        return response.text
-    
-    except Exception as e:
-        return f"Error generating recommendation: {str(e)}"
+    return generate(_recommendation_prompt(user_data), user_id=user_id)
+
+async def aget_insurance_recommendation(user_data: Dict[str, Any], user_id=None) -> str:
+    """Async version of `get_insurance_recommendation` for ASGI views."""
+    return await agenerate(_recommendation_prompt(user_data), user_id=user_id)
 
-def analyze_insurance_plan(plan_data: Dict[str, Any]) -> str:
+def analyze_insurance_plan(plan_data: Dict[str, Any], user_id=None,
+                           priority: str = llm_quota.INTERACTIVE) -> str:
     """Analyze an insurance plan using Gemini.
     
     Args:
         plan_data: Dictionary containing plan details
+        user_id: User charged for the tokens, if any
+        priority: Quota class; pre-generated analyses run as BACKGROUND
         
     Returns:
         str: AI-generated analysis of the insurance plan
+
+    Raises:
+        LLMUnavailable: If Gemini cannot answer; see `fallback_analysis`
     """
-    try:
-        configure_gemini()
-        model = genai.GenerativeModel('gemini-pro')
-        
-        prompt = f"""Analyze the following health insurance plan and provide insights:
-        - Plan Name: {plan_data.get('name')}
-        - Coverage: {plan_data.get('coverage')}
-        - Price: ${plan_data.get('price')}
-        - Conditions: {plan_data.get('conditions')}
-        
-        Please provide:
-        1. Key benefits of this plan
-        2. Potential limitations or drawbacks
-        3. Who this plan would be most suitable for
-        4. Cost-benefit analysis
-        """
-        
-        response = model.generate_content(prompt)
-        return response.text
-    
-    except Exception as e:
-        return f"Error analyzing plan: {str(e)}"
\ No newline at end of file
+    return generate(_analysis_prompt(plan_data), priority, user_id)
+
+async def aanalyze_insurance_plan(plan_data: Dict[str, Any], user_id=None) -> str:
+    """Async version of `analyze_insurance_plan` for ASGI views."""
+    return await agenerate(_analysis_prompt(plan_data), user_id=user_id)
+
+def fallback_recommendation(user_data: Dict[str, Any],
+                            plans: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Templated recommendation built from the rule engine, for when Gemini is unavailable.
+
+    Args:
+        user_data: Dictionary containing user information like age, budget, etc.
+        plans: Ranked plans with `name`, `price` and `suitability_score`;
+            defaults to `api.recommendation_engine.get_recommendations`
+
+    Returns:
+        str: Plain-text recommendation. Never cache it in place of an AI answer.
+    """
+    if plans is None:
+        from api.recommendation_engine import get_recommendations
+        plans = get_recommendations(user_data)
+
+    lines = [
+        'Our AI advisor is temporarily unavailable, so these recommendations come from '
+        'our standard matching rules.',
+        f"Profile: age {user_data.get('age', 'not specified')}, "
+        f"budget ${user_data.get('budget', 'not specified')}, "
+        f"family size {user_data.get('family_size', 'not specified')}."
+    ]
+    if plans:
+        lines.append('Best matching plans:')
+        for rank, plan in enumerate(plans[:3], start=1):
+            lines.append(
+                f"{rank}. {plan['name']} - ${float(plan['price']):.2f}/month "
+                f"(match {plan['suitability_score']:.0%})"
+            )
+    else:
+        lines.append('No plans currently match your profile. Consider adjusting your budget.')
+    lines.append('Ask again later for a detailed personalised analysis.')
+    return '\n'.join(lines)
+
+def fallback_analysis(plan_data: Dict[str, Any]) -> str:
+    """Templated plan summary for when Gemini is unavailable. Never cache it."""
+    return '\n'.join([
+        'Our AI analysis is temporarily unavailable. Plan summary:',
+        f"- Plan Name: {plan_data.get('name')}",
+        f"- Coverage: {plan_data.get('coverage')}",
+        f"- Price: ${plan_data.get('price')}",
+        f"- Conditions: {plan_data.get('conditions')}",
+        'Ask again later for a detailed analysis.'
+    ])
@@ -1,13 +1,17 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils.html import format_html
+from backend.admin_utils import LargeTableAdminMixin
+from .dashboard import parse_widgets_order
 from .models import (
     User, InsurancePlan, Feedback,
-    PlanComparison, UserDashboardPreference, Recommendation
+    PlanComparison, UserDashboardPreference, Recommendation, OutboundEmail
 )
 
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(LargeTableAdminMixin, UserAdmin):
     list_display = ('username', 'email', 'age', 'budget_display', 'family_size', 'medical_history_display')
     list_filter = ('is_staff', 'is_active', 'age')
     fieldsets = UserAdmin.fieldsets + (
@@ -44,29 +48,32 @@ class CustomUserAdmin(UserAdmin):
     medical_history_display.short_description = 'Medical History'
 
 @admin.register(InsurancePlan)
-class InsurancePlanAdmin(admin.ModelAdmin):
-    list_display = ('name', 'plan_type', 'provider', 'monthly_premium', 'coverage_details')
-    list_filter = ('plan_type', 'provider')
-    search_fields = ('name', 'provider', 'description')
+class InsurancePlanAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('name', 'plan_type', 'provider', 'premium_display', 'coverage_status')
+    list_filter = ('plan_type',)
+    search_fields = ('name', 'provider')
     ordering = ('name',)
+    date_hierarchy = 'created_at'
+    readonly_fields = ('created_at', 'updated_at')
     fieldsets = (
         ('Basic Information', {
             'fields': ('name', 'plan_type', 'provider', 'description')
         }),
         ('Coverage Details', {
-            'fields': ('coverage_details', 'eligibility_criteria', 'network_hospitals', 'features')
+            'fields': ('coverage_details', 'eligibility_criteria', 'network_hospitals')
         }),
         ('Financial Information', {
             'fields': ('monthly_premium', 'deductible', 'copay', 'max_coverage')
         }),
         ('Status', {
-            'fields': ('is_active', 'popularity_score')
+            'fields': ('created_at', 'updated_at')
         }),
     )
 
     def premium_display(self, obj):
         return format_html('<b>${}</b>', obj.monthly_premium)
     premium_display.short_description = 'Monthly Premium'
+    premium_display.admin_order_field = 'monthly_premium'
 
     def coverage_status(self, obj):
         if obj.max_coverage:
@@ -75,11 +82,15 @@ class InsurancePlanAdmin(admin.ModelAdmin):
     coverage_status.short_description = 'Coverage Limit'
 
 @admin.register(Feedback)
-class FeedbackAdmin(admin.ModelAdmin):
+class FeedbackAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'feedback_type', 'rating_display', 'insurance_plan', 'created_at')
-    list_filter = ('feedback_type', 'rating', 'created_at')
-    search_fields = ('user__username', 'comments', 'insurance_plan__name')
+    list_filter = ('feedback_type', 'rating')
+    list_select_related = ('user', 'insurance_plan')
+    search_fields = ('^user__username', '^insurance_plan__name')
+    related_search_fields = {'user': ('username',), 'insurance_plan': ('name',)}
     ordering = ('-created_at',)
+    date_hierarchy = 'created_at'
+    raw_id_fields = ('user', 'insurance_plan')
 
     def rating_display(self, obj):
         stars = '★' * obj.rating + '☆' * (5 - obj.rating)
@@ -87,37 +98,55 @@ class FeedbackAdmin(admin.ModelAdmin):
     rating_display.short_description = 'Rating'
 
 @admin.register(PlanComparison)
-class PlanComparisonAdmin(admin.ModelAdmin):
+class PlanComparisonAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'comparison_name', 'plans_count', 'created_at')
-    list_filter = ('created_at', 'user')
-    search_fields = ('user__username', 'comparison_name', 'notes')
+    list_select_related = ('user',)
+    search_fields = ('^user__username', '^comparison_name')
     ordering = ('-created_at',)
+    date_hierarchy = 'created_at'
+    raw_id_fields = ('user',)
     filter_horizontal = ('plans',)
 
+    def get_queryset(self, request):
+        # Counted in the list query instead of once per row. A subquery keeps
+        # GROUP BY out of the paginator's count and the date hierarchy.
+        plans = (PlanComparison.plans.through.objects
+                 .filter(plancomparison_id=OuterRef('pk'))
+                 .values('plancomparison_id')
+                 .annotate(total=Count('*'))
+                 .values('total'))
+        return super().get_queryset(request).annotate(plan_total=Coalesce(Subquery(plans), 0))
+
     def plans_count(self, obj):
-        count = obj.plans.count()
+        count = obj.plan_total
         return format_html('{} plan{}', count, 's' if count != 1 else '')
     plans_count.short_description = 'Number of Plans'
+    plans_count.admin_order_field = 'plan_total'
 
 @admin.register(UserDashboardPreference)
-class UserDashboardPreferenceAdmin(admin.ModelAdmin):
+class UserDashboardPreferenceAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'default_view', 'show_premium_first', 'widgets_display')
     list_filter = ('default_view', 'show_premium_first')
-    search_fields = ('user__username',)
-    ordering = ('user__username',)
+    list_select_related = ('user',)
+    search_fields = ('^user__username',)
+    related_search_fields = {'user': ('username',)}
+    ordering = ('-id',)
+    raw_id_fields = ('user',)
 
     def widgets_display(self, obj):
-        if not obj.widgets_order:
-            return '-'
-        return ', '.join(obj.widgets_order)
+        return ', '.join(parse_widgets_order(obj.widgets_order)) or '-'
     widgets_display.short_description = 'Widget Order'
 
 @admin.register(Recommendation)
-class RecommendationAdmin(admin.ModelAdmin):
+class RecommendationAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'insurance_plan', 'score_display', 'status_display', 'created_at')
-    list_filter = ('created_at',)
-    search_fields = ('user__username', 'insurance_plan__name', 'notes')
+    list_filter = ('is_accepted',)
+    list_select_related = ('user', 'insurance_plan')
+    search_fields = ('^user__username', '^insurance_plan__name')
+    related_search_fields = {'user': ('username',), 'insurance_plan': ('name',)}
     ordering = ('-created_at',)
+    date_hierarchy = 'created_at'
+    raw_id_fields = ('user', 'insurance_plan')
 
     def score_display(self, obj):
         color = 'green' if obj.recommendation_score >= 0.7 else 'orange' if obj.recommendation_score >= 0.4 else 'red'
@@ -129,3 +158,10 @@ class RecommendationAdmin(admin.ModelAdmin):
             return format_html('<span style="color: blue;">Pending</span>')
         return format_html('<span style="color: {};">✓ Accepted</span>' if obj.is_accepted else '<span style="color: red;">✗ Rejected</span>', 'green')
     status_display.short_description = 'Status'
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('kind', 'to', 'attempts', 'next_attempt_at', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('to', 'subject', 'last_error')
+    ordering = ('next_attempt_at',)
@@ -0,0 +1,73 @@
+from typing import Any, Dict, Iterable, List, Optional, Union
+import time
+
+from django.core.cache import cache
+
+from .catalog import PlanRecord, get_catalog_snapshot
+from .models import InsurancePlan
+
+ANALYSIS_TTL = 86400  # Plan details rarely change, so keep analyses for a day
+REFRESH_AHEAD = 0.2  # Regenerate once less than this fraction of the TTL remains
+
+Plan = Union[InsurancePlan, PlanRecord]
+
+
+def analysis_key(plan_id: int) -> str:
+    return f'plan_analysis_{plan_id}'
+
+
+def _meta_key(plan_id: int) -> str:
+    return f'plan_analysis_meta_{plan_id}'
+
+
+def plan_data(plan: Plan) -> Dict[str, Any]:
+    """Prompt fields for a plan analysis."""
+    return {
+        'name': plan.name,
+        'coverage': plan.coverage_details,
+        'price': float(plan.monthly_premium),
+        'conditions': plan.eligibility_criteria
+    }
+
+
+def get_analysis(plan_id: int) -> Optional[str]:
+    """Get the cached analysis of a plan, or None."""
+    return cache.get(analysis_key(plan_id))
+
+
+def store_analysis(plan: Plan, analysis: str) -> None:
+    """Cache an AI analysis with the plan version it was generated from.
+
+    Only store real Gemini output here, never fallback text.
+    """
+    now = time.time()
+    meta = {
+        'expires_at': now + ANALYSIS_TTL,
+        'plan_updated_at': plan.updated_at.timestamp()
+    }
+    cache.set_many({analysis_key(plan.id): analysis, _meta_key(plan.id): meta}, ANALYSIS_TTL)
+
+
+def _is_due(plan: Plan, analysis: Optional[str], meta: Optional[Dict[str, float]], now: float) -> bool:
+    if not analysis or meta is None:
+        return True
+    if meta['plan_updated_at'] != plan.updated_at.timestamp():
+        return True
+    return meta['expires_at'] - now < ANALYSIS_TTL * REFRESH_AHEAD
+
+
+def due_plans(plans: Optional[Iterable[Plan]] = None) -> List[Plan]:
+    """Plans whose analysis is missing, generated from an older version of the plan, or close to expiry.
+
+    Defaults to every plan in the catalog.
+    """
+    if plans is None:
+        plans = get_catalog_snapshot().plans
+    plans = list(plans)
+    keys = [key for plan in plans for key in (analysis_key(plan.id), _meta_key(plan.id))]
+    cached = cache.get_many(keys)
+    now = time.time()
+    return [
+        plan for plan in plans
+        if _is_due(plan, cached.get(analysis_key(plan.id)), cached.get(_meta_key(plan.id)), now)
+    ]
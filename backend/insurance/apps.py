@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class InsuranceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'insurance'
+
+    def ready(self):
+        """Register signal handlers."""
+        from . import signals  # noqa: F401
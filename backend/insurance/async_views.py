@@ -0,0 +1,117 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+
+from backend.async_api import AsyncResponse, async_api_view
+from .models import User, InsurancePlan
+from .serializers import InsurancePlanSerializer
+from .catalog import PlanRecord, get_catalog_snapshot
+from .analysis_cache import get_analysis, plan_data, store_analysis
+from .views import recommendation_fallback
+from gemini_client import (LLMUnavailable, aget_insurance_recommendation, aanalyze_insurance_plan,
+                           fallback_analysis)
+
+# Native async counterparts of the LLM-bound DRF actions in insurance.views,
+# routed in place of them when settings.ASYNC_LLM_VIEWS is on.
+
+@async_api_view(['POST'])
+async def get_ai_recommendation(request, pk):
+    """Get AI-powered insurance recommendations for a user."""
+    try:
+        user = await User.objects.aget(pk=pk)
+    except (User.DoesNotExist, ValueError):
+        raise NotFound()
+
+    if not all([user.age, user.budget, user.family_size]):
+        return AsyncResponse(
+            {'error': 'Please complete your profile with age, budget, and family size '
+                      'to receive personalized recommendations.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        cache_key = f'user_recommendation_{user.id}'
+        cached_recommendation = await cache.aget(cache_key)
+        if cached_recommendation:
+            return {'recommendation': cached_recommendation, 'cached': True}
+
+        user_data = {
+            'age': user.age,
+            'budget': float(user.budget),
+            'family_size': user.family_size,
+            'medical_history': user.prompt_medical_history or 'No medical history provided'
+        }
+        try:
+            recommendation = await aget_insurance_recommendation(user_data, user_id=user.id)
+        except LLMUnavailable:
+            # Answer from the rule engine and leave the cache alone
+            fallback = await sync_to_async(recommendation_fallback)(user, user_data)
+            return {'recommendation': fallback, 'cached': False, 'fallback': True}
+        await cache.aset(cache_key, recommendation, 3600)
+        return {'recommendation': recommendation, 'cached': False}
+    except Exception:
+        return AsyncResponse(
+            {'error': 'Failed to generate recommendation. Please try again.'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@async_api_view(['GET'])
+async def analyze_plan(request, pk):
+    """Get AI analysis of an insurance plan."""
+    try:
+        plan = await InsurancePlan.objects.aget(pk=pk)
+    except (InsurancePlan.DoesNotExist, ValueError):
+        raise NotFound()
+
+    try:
+        # Normally pre-generated by the warm_plan_analyses worker
+        cached_analysis = await sync_to_async(get_analysis)(plan.id)
+        if cached_analysis:
+            return {'analysis': cached_analysis, 'cached': True}
+
+        data = plan_data(plan)
+        try:
+            analysis = await aanalyze_insurance_plan(data, user_id=request.user.id)
+        except LLMUnavailable:
+            return {'analysis': fallback_analysis(data), 'cached': False, 'fallback': True}
+        await sync_to_async(store_analysis)(plan, analysis)
+        return {'analysis': analysis, 'cached': False}
+    except Exception:
+        return AsyncResponse(
+            {'error': 'Failed to analyze plan. Please try again.'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+async def _analyze_or_fallback(plan: PlanRecord, user_id) -> str:
+    """Cached or fresh AI analysis of a plan, or the templated summary if Gemini is unavailable."""
+    analysis = await sync_to_async(get_analysis)(plan.id)
+    if analysis:
+        return analysis
+    data = plan_data(plan)
+    try:
+        analysis = await aanalyze_insurance_plan(data, user_id=user_id)
+    except LLMUnavailable:
+        return fallback_analysis(data)
+    await sync_to_async(store_analysis)(plan, analysis)
+    return analysis
+
+@async_api_view(['POST'])
+async def compare_plans(request):
+    """Compare multiple insurance plans, analyzing them concurrently."""
+    plan_ids = request.data.get('plan_ids', [])
+    if not plan_ids:
+        return AsyncResponse(
+            {'error': 'No plan IDs provided'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    snapshot = await sync_to_async(get_catalog_snapshot)()
+    plans = snapshot.get_many(plan_ids)
+    analyses = await asyncio.gather(*(_analyze_or_fallback(plan, request.user.id) for plan in plans))
+    return [
+        {'plan': InsurancePlanSerializer(plan).data, 'analysis': analysis}
+        for plan, analysis in zip(plans, analyses)
+    ]
@@ -0,0 +1,106 @@
+"""Microbenchmarks for the insurance hot paths; run with `manage.py microbench`."""
+
+from decimal import Decimal
+
+from django.utils import timezone
+
+from backend.microbench import benchmark
+from .catalog import PlanRecord
+from .comparison import build_comparison
+from .models import Feedback, InsurancePlan, Recommendation, User
+from .serializers import FeedbackSerializer, InsurancePlanSerializer, RecommendationSerializer
+from .views import calculate_suitability_score
+
+CATALOG_SIZES = [10, 1000, 100000]
+COVERAGES = ['Individual hospital cover', 'Family cover with maternity', 'Senior care cover',
+             'Young adult starter cover']
+
+
+def plan_fields(i):
+    return {
+        'name': f'Benchmark Plan {i}',
+        'plan_type': InsurancePlan.PLAN_TYPE_CHOICES[i % len(InsurancePlan.PLAN_TYPE_CHOICES)][0],
+        'provider': f'Provider {i % 50}',
+        'description': 'Benchmark insurance plan',
+        'coverage_details': COVERAGES[i % len(COVERAGES)],
+        'eligibility_criteria': 'Open to all residents',
+        'monthly_premium': Decimal(100 + i % 900),
+        'deductible': Decimal(500 + i % 1500),
+        'copay': Decimal(20) if i % 3 else None,
+        'max_coverage': Decimal(100000 + i),
+        'network_hospitals': 'Hospital A, Hospital B',
+    }
+
+
+def plan_records(size):
+    now = timezone.now()
+    return [
+        PlanRecord((i, *plan_fields(i).values(), now, now))
+        for i in range(1, size + 1)
+    ]
+
+
+def create_plans(size):
+    return InsurancePlan.objects.bulk_create(
+        (InsurancePlan(**plan_fields(i)) for i in range(size)),
+        batch_size=5000
+    )
+
+
+def create_users(count):
+    return User.objects.bulk_create(
+        User(username=f'benchmark-{i}', name=f'Benchmark {i}', age=25 + i, budget=Decimal(1000),
+             family_size=1 + i % 4, medical_history='None')
+        for i in range(count)
+    )
+
+
+@benchmark('insurance.calculate_suitability_score', sizes=CATALOG_SIZES)
+def suitability_score(size):
+    plans = plan_records(size)
+    user = User(age=35, budget=Decimal(1000), family_size=3)
+    return lambda: [calculate_suitability_score(plan, user) for plan in plans]
+
+
+@benchmark('insurance.build_comparison', sizes=[2, 10, 50])
+def plan_comparison(size):
+    plans = plan_records(size)
+    return lambda: build_comparison(plans, age=35, budget=1000.0, family_size=3)
+
+
+@benchmark('insurance.InsurancePlanSerializer', sizes=[100, 1000])
+def plan_serializer(size):
+    create_plans(size)
+    return lambda: InsurancePlanSerializer(InsurancePlan.objects.all(), many=True).data
+
+
+@benchmark('insurance.FeedbackSerializer', sizes=[100, 1000])
+def feedback_serializer(size):
+    users = create_users(10)
+    plans = create_plans(50)
+    Feedback.objects.bulk_create(
+        (
+            Feedback(user=users[i % len(users)], feedback_type='plan', insurance_plan=plans[i % len(plans)],
+                     rating=1 + i % 5, comments='Claims were handled quickly.')
+            for i in range(size)
+        ),
+        batch_size=5000
+    )
+    queryset = Feedback.objects.select_related('user', 'insurance_plan')
+    return lambda: FeedbackSerializer(queryset.all(), many=True).data
+
+
+@benchmark('insurance.RecommendationSerializer', sizes=[100, 1000])
+def recommendation_serializer(size):
+    users = create_users(10)
+    plans = create_plans(50)
+    Recommendation.objects.bulk_create(
+        (
+            Recommendation(user=users[i % len(users)], insurance_plan=plans[i % len(plans)],
+                           recommendation_score=0.5 + (i % 50) / 100, notes='Within budget')
+            for i in range(size)
+        ),
+        batch_size=5000
+    )
+    queryset = Recommendation.objects.select_related('user', 'insurance_plan')
+    return lambda: RecommendationSerializer(queryset.all(), many=True).data
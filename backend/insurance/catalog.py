@@ -0,0 +1,166 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+from decimal import Decimal
+import hashlib
+import threading
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import InsurancePlan
+
+CATALOG_VERSION_CACHE_KEY = 'insurance_plan_catalog_version'
+CATALOG_VERSION_TTL = 300  # Upper bound on staleness for writes that bypass signals
+CATALOG_COUNTER_CACHE_KEY = 'insurance_plan_catalog_counter'
+
+
+def get_catalog_version() -> Tuple[Optional[datetime], int]:
+    """Get the current version of the plan catalog.
+
+    The version is the latest `updated_at` of any plan together with the
+    number of plans, so both edits and deletions change it. The result is
+    cached and invalidated whenever a plan is saved or deleted.
+
+    Returns:
+        Tuple of (last modified timestamp or None, plan count)
+    """
+    version = cache.get(CATALOG_VERSION_CACHE_KEY)
+    if version is None:
+        stats = InsurancePlan.objects.aggregate(
+            last_modified=Max('updated_at'),
+            count=Count('id')
+        )
+        version = (stats['last_modified'], stats['count'])
+        cache.set(CATALOG_VERSION_CACHE_KEY, version, CATALOG_VERSION_TTL)
+    return version
+
+
+def invalidate_catalog_version() -> None:
+    """Drop the cached catalog version so the next read recomputes it."""
+    cache.delete(CATALOG_VERSION_CACHE_KEY)
+
+
+def catalog_last_modified(request, *args, **kwargs) -> Optional[datetime]:
+    """Last-Modified value for plan catalog responses."""
+    return get_catalog_version()[0]
+
+
+def catalog_etag(request, *args, **kwargs) -> str:
+    """ETag for plan catalog responses.
+
+    Besides the catalog version, the tag covers the full path (pagination and
+    lookup) and the Accept header, since each of those changes the body.
+    """
+    last_modified, count = get_catalog_version()
+    stamp = last_modified.isoformat() if last_modified else ''
+    raw = '|'.join([
+        stamp,
+        str(count),
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', '')
+    ])
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+class PlanRecord:
+    """Read-only, compact copy of an insurance plan row.
+
+    Exposes the same attribute names as `InsurancePlan`, so scoring helpers
+    and read-only serializers accept it in place of a model instance.
+    """
+    __slots__ = (
+        'id', 'pk', 'name', 'plan_type', 'provider', 'description',
+        'coverage_details', 'eligibility_criteria', 'monthly_premium',
+        'deductible', 'copay', 'max_coverage', 'network_hospitals',
+        'created_at', 'updated_at', 'coverage_lower'
+    )
+
+    FIELDS = (
+        'id', 'name', 'plan_type', 'provider', 'description',
+        'coverage_details', 'eligibility_criteria', 'monthly_premium',
+        'deductible', 'copay', 'max_coverage', 'network_hospitals',
+        'created_at', 'updated_at'
+    )
+
+    def __init__(self, row: Tuple) -> None:
+        for field, value in zip(self.FIELDS, row):
+            object.__setattr__(self, field, value)
+        object.__setattr__(self, 'pk', self.id)
+        object.__setattr__(self, 'coverage_lower', self.coverage_details.lower())
+
+    def __setattr__(self, name, value):
+        raise AttributeError('PlanRecord is read-only')
+
+    def __repr__(self) -> str:
+        return f'<PlanRecord: {self.name}>'
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class CatalogSnapshot:
+    """Immutable view of the whole plan catalog at one version."""
+
+    def __init__(self, version: int, records: Iterable[PlanRecord]) -> None:
+        self.version = version
+        self.plans: Tuple[PlanRecord, ...] = tuple(records)
+        self.by_id: Dict[int, PlanRecord] = {plan.id: plan for plan in self.plans}
+
+    def get(self, plan_id: int) -> Optional[PlanRecord]:
+        """Get a plan by id, or None if it is not in the catalog."""
+        return self.by_id.get(plan_id)
+
+    def get_many(self, plan_ids: Iterable[int]) -> List[PlanRecord]:
+        """Get the plans for the given ids in catalog order, skipping unknown ids."""
+        wanted = {int(plan_id) for plan_id in plan_ids}
+        return [plan for plan in self.plans if plan.id in wanted]
+
+    def within_budget(self, budget: Decimal) -> List[PlanRecord]:
+        """Get plans whose monthly premium fits the budget, cheapest first."""
+        plans = [plan for plan in self.plans if plan.monthly_premium <= budget]
+        plans.sort(key=lambda plan: plan.monthly_premium)
+        return plans
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_catalog_counter() -> int:
+    """Get the shared catalog counter, seeding it if the cache lost it."""
+    counter = cache.get(CATALOG_COUNTER_CACHE_KEY)
+    if counter is None:
+        # Seed from the clock so a re-created counter never matches a
+        # value some worker already holds a snapshot for.
+        cache.add(CATALOG_COUNTER_CACHE_KEY, int(time.time() * 1000), None)
+        counter = cache.get(CATALOG_COUNTER_CACHE_KEY)
+    return counter
+
+
+def bump_catalog_counter() -> None:
+    """Advance the shared catalog counter so every worker reloads lazily."""
+    try:
+        cache.incr(CATALOG_COUNTER_CACHE_KEY)
+    except ValueError:
+        get_catalog_counter()
+
+
+def get_catalog_snapshot() -> CatalogSnapshot:
+    """Get the in-process catalog snapshot, reloading it if the catalog changed.
+
+    Costs one cache read per call; the database is only queried when the
+    shared counter has moved since the snapshot was built.
+    """
+    global _snapshot
+    counter = get_catalog_counter()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == counter:
+        return snapshot
+
+    with _snapshot_lock:
+        if _snapshot is not None and _snapshot.version == counter:
+            return _snapshot
+        rows = InsurancePlan.objects.order_by('name').values_list(*PlanRecord.FIELDS)
+        _snapshot = CatalogSnapshot(counter, (PlanRecord(row) for row in rows))
+        return _snapshot
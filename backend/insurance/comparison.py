@@ -0,0 +1,193 @@
+"""
+Side-by-side comparison of insurance plans.
+
+`compare_plans` handles up to MAX_COMPARED_PLANS catalog plans in one pass
+and produces:
+- field-wise numeric differences: per-field range, mean and best plans, and
+  each plan's delta from the best value
+- coverage and network-hospital term sets: the terms all plans share, and
+  the terms only one plan has
+- projected yearly out-of-pocket costs for a few usage scenarios
+- a suitability score for the requesting user
+
+Each numeric field is read once for all plans, and each statistic is derived
+from that column. Results are memoized in the shared cache under a key made
+of the sorted plan ids, each plan's `updated_at` and the user's profile
+version. Reopening a saved comparison is therefore a cache hit until one of
+its plans or the user's profile changes.
+"""
+
+import hashlib
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+
+from backend.authentication import get_profile_version
+from .catalog import PlanRecord
+
+MAX_COMPARED_PLANS = 50
+COMPARISON_CACHE_KEY = 'plan_comparison:{}'
+COMPARISON_FORMAT = 1  # Bump when the result layout changes, so old entries are ignored
+
+# Numeric plan fields, and whether a lower value is better
+NUMERIC_FIELDS = (
+    ('monthly_premium', True),
+    ('deductible', True),
+    ('copay', True),
+    ('max_coverage', False),
+)
+
+# Yearly claims in dollars and doctor visits for each projection
+PROJECTION_SCENARIOS = {
+    'low_use': (0, 2),
+    'moderate_use': (2500, 6),
+    'high_use': (20000, 12),
+}
+
+TERM_SEPARATORS = re.compile(r'[,;/\n]|\band\b|\bwith\b')
+
+
+@lru_cache(maxsize=4096)
+def normalize_terms(text: str) -> FrozenSet[str]:
+    """Split free text such as coverage details into lowercase, whitespace-collapsed terms."""
+    terms = set()
+    for part in TERM_SEPARATORS.split(text.lower()):
+        term = ' '.join(part.replace('.', ' ').split())
+        if term:
+            terms.add(term)
+    return frozenset(terms)
+
+
+def term_differences(plan_ids: Sequence[int], term_sets: Sequence[FrozenSet[str]]) -> Dict[str, Any]:
+    """The terms every plan has, and for each plan the terms no other plan has."""
+    counts = Counter(term for terms in term_sets for term in terms)
+    total = len(term_sets)
+    return {
+        'common': sorted(term for term, count in counts.items() if count == total),
+        'unique': {
+            plan_id: sorted(term for term in terms if counts[term] == 1)
+            for plan_id, terms in zip(plan_ids, term_sets)
+        },
+    }
+
+
+def projected_cost(premium: float, deductible: float, copay: Optional[float],
+                   max_coverage: Optional[float], claims: float, visits: int) -> float:
+    """
+    Yearly cost to the member: premiums, claims up to the deductible, copays,
+    and anything above the coverage cap.
+    """
+    cost = premium * 12 + min(claims, deductible) + visits * (copay or 0.0)
+    if max_coverage is not None and claims > max_coverage:
+        cost += claims - max_coverage
+    return round(cost, 2)
+
+
+def score_plan(plan: PlanRecord, premium: float, age: Optional[int], budget: Optional[float],
+               family_size: Optional[int]) -> float:
+    """How well a plan suits a user's profile (0-1), using the same factors as recommendations."""
+    score = 1.0
+    if budget:
+        score *= 0.4 * (1 - premium / budget) + 0.6
+    if age:
+        if age > 60 and (plan.plan_type == 'senior' or 'senior' in plan.coverage_lower):
+            score *= 1.3
+        elif age < 30 and 'young' in plan.coverage_lower:
+            score *= 1.3
+    if family_size:
+        if family_size > 1 and (plan.plan_type == 'family' or 'family' in plan.coverage_lower):
+            score *= 1.3
+        elif family_size == 1 and (plan.plan_type == 'basic' or 'individual' in plan.coverage_lower):
+            score *= 1.3
+    return round(max(0.0, min(1.0, score)), 4)
+
+
+def build_comparison(plans: Sequence[PlanRecord], age: Optional[int] = None,
+                     budget: Optional[float] = None, family_size: Optional[int] = None) -> Dict[str, Any]:
+    """Compare plans for a user profile; see the module docstring for what is computed."""
+    if not 1 <= len(plans) <= MAX_COMPARED_PLANS:
+        raise ValueError(f'Compare between 1 and {MAX_COMPARED_PLANS} plans')
+    plan_ids = [plan.id for plan in plans]
+    columns = {
+        field: [None if value is None else float(value) for value in (getattr(plan, field) for plan in plans)]
+        for field, _ in NUMERIC_FIELDS
+    }
+
+    numeric = {}
+    deltas: List[Dict[str, Optional[float]]] = [{} for _ in plans]
+    for field, lower_is_better in NUMERIC_FIELDS:
+        column = columns[field]
+        present = [value for value in column if value is not None]
+        if not present:
+            continue
+        low, high = min(present), max(present)
+        best = low if lower_is_better else high
+        numeric[field] = {
+            'min': low,
+            'max': high,
+            'mean': round(sum(present) / len(present), 2),
+            'spread': round(high - low, 2),
+            'best_plan_ids': [plan_id for plan_id, value in zip(plan_ids, column) if value == best],
+        }
+        for plan_deltas, value in zip(deltas, column):
+            plan_deltas[field] = None if value is None else round(value - best, 2)
+
+    premiums = columns['monthly_premium']
+    projections = [
+        {
+            scenario: projected_cost(premium, deductible, copay, max_coverage, claims, visits)
+            for scenario, (claims, visits) in PROJECTION_SCENARIOS.items()
+        }
+        for premium, deductible, copay, max_coverage in zip(
+            premiums, columns['deductible'], columns['copay'], columns['max_coverage']
+        )
+    ]
+    scores = [score_plan(plan, premium, age, budget, family_size) for plan, premium in zip(plans, premiums)]
+    best_index = max(range(len(plans)), key=lambda index: scores[index])
+
+    return {
+        'plan_ids': plan_ids,
+        'differences': {
+            'price_range': {'min': numeric['monthly_premium']['min'], 'max': numeric['monthly_premium']['max']},
+            'numeric': numeric,
+            'coverage_differences': term_differences(
+                plan_ids, [normalize_terms(plan.coverage_details) for plan in plans]
+            ),
+            'feature_differences': term_differences(
+                plan_ids, [normalize_terms(plan.network_hospitals) for plan in plans]
+            ),
+        },
+        'plan_metrics': {
+            plan_id: {'deltas': plan_deltas, 'projected_yearly_cost': projection, 'score': score}
+            for plan_id, plan_deltas, projection, score in zip(plan_ids, deltas, projections, scores)
+        },
+        'recommended_plan_id': plan_ids[best_index],
+        'score': scores[best_index],
+    }
+
+
+def comparison_key(plans: Sequence[PlanRecord], user) -> str:
+    """Cache key for a plan set at its current plan versions and the user's profile version."""
+    parts = [f'{plan.id}@{plan.updated_at.isoformat()}' for plan in sorted(plans, key=lambda plan: plan.id)]
+    parts.append(f'user:{user.pk}@{get_profile_version(user.pk)}')
+    parts.append(f'format:{COMPARISON_FORMAT}')
+    return COMPARISON_CACHE_KEY.format(hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest())
+
+
+def compare_plans(plans: Sequence[PlanRecord], user) -> Dict[str, Any]:
+    """Compare plans for a user, memoized in the shared cache."""
+    key = comparison_key(plans, user)
+    result = cache.get(key)
+    if result is None:
+        result = build_comparison(
+            plans,
+            age=user.age,
+            budget=float(user.budget) if user.budget else None,
+            family_size=user.family_size,
+        )
+        cache.set(key, result, getattr(settings, 'COMPARISON_CACHE_TTL', 3600))
+    return result
@@ -0,0 +1,156 @@
+"""
+Everything the SPA dashboard shows, assembled for one request.
+
+The dashboard used to take one request each for the user, the preferences,
+recommendations, saved comparisons and feedback. `assemble` returns the user,
+the preferences and every widget listed in `widgets_order` together.
+
+Each widget is cached on its own under a key made of the user's dashboard
+version and the catalog counter. Signals bump the dashboard version whenever
+one of the user's rows changes, and plan edits move the catalog counter, so a
+cached widget is never stale and nothing has to be deleted. A warm dashboard
+costs a few cache reads and no queries.
+"""
+
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .catalog import CATALOG_COUNTER_CACHE_KEY, get_catalog_counter, get_catalog_snapshot
+from .models import Feedback, PlanComparison, Recommendation
+from .partitions import recent
+from .profile_cache import get_preferences, get_profile
+from .serializers import (FeedbackSerializer, InsurancePlanSerializer, PlanComparisonSerializer,
+                          RecommendationSerializer)
+
+DASHBOARD_VERSION_KEY = 'dashboard_version:{}'
+WIDGET_CACHE_KEY = 'dashboard:{}:{}:{}:{}'  # Widget, user, dashboard version, catalog counter
+WIDGET_LIMIT = 5  # Rows per list widget
+
+
+def get_dashboard_version(user_id: Any) -> int:
+    """Get a user's dashboard version, seeding it if the cache lost it."""
+    key = DASHBOARD_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a re-created version never matches cached widgets
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_dashboard_version(user_id: Any) -> None:
+    """Make every cached widget of a user stale."""
+    try:
+        cache.incr(DASHBOARD_VERSION_KEY.format(user_id))
+    except ValueError:
+        get_dashboard_version(user_id)
+
+
+def parse_widgets_order(value: Any) -> List[str]:
+    """
+    Widget names from `widgets_order`. Accepts the comma-separated form and
+    the stringified lists older clients stored, e.g. "['feedback', 'recent_plans']".
+    """
+    if isinstance(value, (list, tuple)):
+        value = ','.join(value)
+    names = []
+    for part in str(value or '').split(','):
+        name = part.strip(' \'"[]')
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+class Widget(NamedTuple):
+    name: str
+    # Takes the user and returns plain dicts and lists; serializer `.data`
+    # wrappers would pickle the whole serializer into the cache
+    build: Callable[[Any], Any]
+
+
+def _profile(user) -> Dict[str, Any]:
+    return get_profile(user.pk)
+
+
+def _preferences(user) -> Dict[str, Any]:
+    return get_preferences(user.pk)
+
+
+def _recommendations(user) -> List[Dict[str, Any]]:
+    rows = recent(Recommendation.objects.filter(user_id=user.pk)).select_related('insurance_plan')
+    return list(RecommendationSerializer(rows[:WIDGET_LIMIT], many=True).data)
+
+
+def _comparisons(user) -> List[Dict[str, Any]]:
+    rows = PlanComparison.objects.filter(user_id=user.pk).prefetch_related('plans')
+    return list(PlanComparisonSerializer(rows[:WIDGET_LIMIT], many=True).data)
+
+
+def _feedback(user) -> List[Dict[str, Any]]:
+    rows = recent(Feedback.objects.filter(user_id=user.pk)).select_related('insurance_plan')
+    return list(FeedbackSerializer(rows[:WIDGET_LIMIT], many=True).data)
+
+
+def _recent_plans(user) -> List[Dict[str, Any]]:
+    plans = sorted(get_catalog_snapshot().plans, key=lambda plan: plan.created_at, reverse=True)
+    return list(InsurancePlanSerializer(plans[:WIDGET_LIMIT], many=True).data)
+
+
+# Always part of the response, whatever the widgets order says
+PROFILE = Widget('user', _profile)
+PREFERENCES = Widget('preferences', _preferences)
+
+WIDGETS: Dict[str, Widget] = {
+    widget.name: widget for widget in (
+        Widget('recommendations', _recommendations),
+        Widget('comparisons', _comparisons),
+        Widget('feedback', _feedback),
+        Widget('recent_plans', _recent_plans),
+    )
+}
+
+
+def get_versions(user_id: Any) -> Tuple[int, int]:
+    """The user's dashboard version and the catalog counter, in one cache read when both exist."""
+    dashboard_key = DASHBOARD_VERSION_KEY.format(user_id)
+    found = cache.get_many([dashboard_key, CATALOG_COUNTER_CACHE_KEY])
+    dashboard_version = found.get(dashboard_key)
+    if dashboard_version is None:
+        dashboard_version = get_dashboard_version(user_id)
+    catalog_version = found.get(CATALOG_COUNTER_CACHE_KEY)
+    if catalog_version is None:
+        catalog_version = get_catalog_counter()
+    return dashboard_version, catalog_version
+
+
+def load_widgets(widgets: Sequence[Widget], user, versions: Tuple[int, int]) -> Dict[str, Any]:
+    """Data for each widget, from the cache where possible; missing ones are built and stored."""
+    keys = {widget.name: WIDGET_CACHE_KEY.format(widget.name, user.pk, *versions) for widget in widgets}
+    found = cache.get_many(keys.values())
+    data, missing = {}, {}
+    for widget in widgets:
+        key = keys[widget.name]
+        if key in found:
+            data[widget.name] = found[key]
+        else:
+            data[widget.name] = missing[key] = widget.build(user)
+    if missing:
+        cache.set_many(missing, getattr(settings, 'DASHBOARD_WIDGET_TTL', 300))
+    return data
+
+
+def assemble(user) -> Dict[str, Any]:
+    """The whole dashboard for a user; unknown names in `widgets_order` are skipped."""
+    versions = get_versions(user.pk)
+    fixed = load_widgets([PROFILE, PREFERENCES], user, versions)
+    preferences = fixed[PREFERENCES.name]
+    order = [name for name in parse_widgets_order(preferences['widgets_order']) if name in WIDGETS]
+    return {
+        'user': fixed[PROFILE.name],
+        'preferences': preferences,
+        'widgets_order': order,
+        'widgets': load_widgets([WIDGETS[name] for name in order], user, versions),
+    }
@@ -0,0 +1,160 @@
+"""
+Streaming CSV and JSON Lines exports of Feedback, Recommendation and
+PlanComparison for staff.
+
+Rows are read with `.values()` through `.iterator(chunk_size=...)`, so only
+one chunk is held in memory: a server-side cursor on PostgreSQL, fetchmany
+elsewhere. Each chunk is encoded and handed to a StreamingHttpResponse
+before the next one is read. The first bytes leave after one chunk,
+whatever the size of the export. Rows are ordered by primary key, which
+the table's index serves without sorting. `created_after` and
+`created_before` bound `created_at`, which also prunes monthly partitions
+(see insurance.partitions).
+
+Comparison plans are many-to-many. They are fetched per chunk from the
+through table and exported as a list of plan ids.
+"""
+
+import csv
+import datetime
+import io
+import json
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Sequence, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Feedback, PlanComparison, Recommendation
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+class ExportSpec(NamedTuple):
+    name: str
+    model: Any
+    fields: Tuple[str, ...]
+    plans: bool = False  # Add each row's plan ids from the `plans` many-to-many
+
+
+FEEDBACK_EXPORT = ExportSpec('feedback', Feedback, (
+    'id', 'user_id', 'feedback_type', 'insurance_plan_id', 'rating', 'ui_element', 'comments',
+    'created_at', 'updated_at',
+))
+RECOMMENDATION_EXPORT = ExportSpec('recommendations', Recommendation, (
+    'id', 'user_id', 'insurance_plan_id', 'recommendation_score', 'notes', 'is_accepted',
+    'accepted_date', 'created_at', 'updated_at',
+))
+COMPARISON_EXPORT = ExportSpec('comparisons', PlanComparison, (
+    'id', 'user_id', 'comparison_name', 'notes', 'created_at', 'updated_at',
+), plans=True)
+
+
+def parse_bound(value: str, name: str) -> datetime.datetime:
+    """An ISO date or datetime query parameter; dates mean midnight, naive values the current timezone."""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.datetime.combine(day, datetime.time()) if day else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f'{name} must be an ISO date or datetime')
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def filtered(spec: ExportSpec, params: Mapping[str, str]) -> models.QuerySet:
+    """The spec's rows created in [created_after, created_before), ordered by id."""
+    queryset = spec.model._default_manager.order_by('pk')
+    if params.get('created_after'):
+        queryset = queryset.filter(created_at__gte=parse_bound(params['created_after'], 'created_after'))
+    if params.get('created_before'):
+        queryset = queryset.filter(created_at__lt=parse_bound(params['created_before'], 'created_before'))
+    return queryset
+
+
+def export_chunks(spec: ExportSpec, queryset: models.QuerySet,
+                  chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """The queryset's rows as lists of up to `chunk_size` dicts."""
+    chunk = []
+    for row in queryset.values(*spec.fields).iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield _with_plans(spec, chunk)
+            chunk = []
+    if chunk:
+        yield _with_plans(spec, chunk)
+
+
+def _with_plans(spec: ExportSpec, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if not spec.plans:
+        return chunk
+    through = spec.model.plans.through
+    plan_ids: Dict[int, List[int]] = {row['id']: [] for row in chunk}
+    links = (through.objects.filter(plancomparison_id__in=list(plan_ids))
+             .order_by('plancomparison_id', 'insuranceplan_id')
+             .values_list('plancomparison_id', 'insuranceplan_id'))
+    for comparison_id, plan_id in links:
+        plan_ids[comparison_id].append(plan_id)
+    for row in chunk:
+        row['plan_ids'] = plan_ids[row['id']]
+    return chunk
+
+
+def export_columns(spec: ExportSpec) -> Sequence[str]:
+    return spec.fields + ('plan_ids',) if spec.plans else spec.fields
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ' '.join(str(item) for item in value)
+    return value
+
+
+def stream_csv(spec: ExportSpec, chunks: Iterator[List[Dict[str, Any]]]) -> Iterator[str]:
+    """CSV text, one string per chunk, starting with the header row."""
+    columns = export_columns(spec)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(row[column]) for column in columns] for row in chunk)
+        yield buffer.getvalue()
+
+
+def stream_jsonl(spec: ExportSpec, chunks: Iterator[List[Dict[str, Any]]]) -> Iterator[str]:
+    """One JSON object per line, one string per chunk."""
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for chunk in chunks:
+        yield ''.join(encoder.encode(row) + '\n' for row in chunk)
+
+
+def export_response(spec: ExportSpec, params: Mapping[str, str]) -> StreamingHttpResponse:
+    """
+    Stream a spec's rows in the `output` format (csv or jsonl). Raises
+    ValueError for an unknown format or malformed date bounds.
+    """
+    output = params.get('output', 'csv')
+    if output not in EXPORT_FORMATS:
+        raise ValueError(f'output must be one of: {", ".join(EXPORT_FORMATS)}')
+    # Validate the bounds before streaming starts, while errors can still be a 400
+    queryset = filtered(spec, params)
+    chunks = export_chunks(spec, queryset)
+    stream = stream_csv(spec, chunks) if output == 'csv' else stream_jsonl(spec, chunks)
+    response = StreamingHttpResponse(stream, content_type=EXPORT_FORMATS[output])
+    response['Content-Disposition'] = f'attachment; filename="{spec.name}.{output}"'
+    # Keep proxies such as nginx from buffering the whole export
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,112 @@
+"""
+Outbound mail queue.
+
+Requests store an `OutboundEmail` row and return without touching the
+network. The send_queued_mail worker delivers due rows in batches over one
+SMTP connection it keeps open between batches. Failed sends are retried with
+exponential backoff, up to MAIL_QUEUE_MAX_ATTEMPTS attempts.
+
+Password reset rows carry only the address. The worker looks up the account
+and builds the reset link when it sends, so the endpoint does the same single
+insert whether or not the account exists.
+"""
+
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMessage
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from .models import OutboundEmail, User
+
+LEASE_SECONDS = 300  # A claimed batch is hidden from other workers this long
+
+
+def enqueue(to: str, subject: str, body: str) -> OutboundEmail:
+    """Queue a plain email."""
+    return OutboundEmail.objects.create(kind='message', to=to, subject=subject, body=body)
+
+
+def enqueue_password_reset(email: str) -> OutboundEmail:
+    """Queue a password reset email for whichever account uses `email`, if any."""
+    return OutboundEmail.objects.create(kind='password_reset', to=email)
+
+
+def render_password_reset(email: str) -> Optional[EmailMessage]:
+    """Build the reset email, or None when no account uses the address."""
+    user = User.objects.filter(email=email).first()
+    if user is None:
+        return None
+    token = default_token_generator.make_token(user)
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    reset_url = f'{settings.FRONTEND_URL}/reset-password?uid={uid}&token={token}'
+    return EmailMessage(
+        'Reset Your Password',
+        f'Click the following link to reset your password: {reset_url}',
+        settings.DEFAULT_FROM_EMAIL,
+        [user.email]
+    )
+
+
+def render(row: OutboundEmail) -> Optional[EmailMessage]:
+    """The message to send for a queued row, or None if there is nothing to send."""
+    if row.kind == 'password_reset':
+        return render_password_reset(row.to)
+    return EmailMessage(row.subject, row.body, settings.DEFAULT_FROM_EMAIL, [row.to])
+
+
+def claim_batch(batch_size: int) -> List[OutboundEmail]:
+    """Lease up to `batch_size` due rows to this worker, oldest first."""
+    now = timezone.now()
+    max_attempts = getattr(settings, 'MAIL_QUEUE_MAX_ATTEMPTS', 5)
+    ids = list(
+        OutboundEmail.objects
+        .filter(next_attempt_at__lte=now, attempts__lt=max_attempts)
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+    lease_until = now + timedelta(seconds=LEASE_SECONDS)
+    # Rows another worker leased in the meantime no longer match
+    OutboundEmail.objects.filter(id__in=ids, next_attempt_at__lte=now).update(next_attempt_at=lease_until)
+    return list(OutboundEmail.objects.filter(id__in=ids, next_attempt_at=lease_until))
+
+
+def record_failure(row: OutboundEmail, error: Exception) -> None:
+    """Schedule a retry with exponential backoff."""
+    row.attempts += 1
+    delay = getattr(settings, 'MAIL_QUEUE_RETRY_SECONDS', 30) * 2 ** (row.attempts - 1)
+    row.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+    row.last_error = f'{type(error).__name__}: {error}'
+    row.save(update_fields=['attempts', 'next_attempt_at', 'last_error'])
+
+
+def send_batch(connection, rows: List[OutboundEmail]) -> Tuple[int, int]:
+    """
+    Send claimed rows over an open connection, deleting delivered ones.
+
+    Returns:
+        Tuple of (sent, failed)
+    """
+    sent = 0
+    failed = 0
+    for row in rows:
+        message = render(row)
+        if message is not None:
+            message.connection = connection
+            try:
+                message.send()
+            except OSError as e:  # smtplib.SMTPException is an OSError
+                record_failure(row, e)
+                failed += 1
+                # The server may have dropped us; reconnect for the rest
+                connection.close()
+                connection.open()
+                continue
+            sent += 1
+        row.delete()
+    return sent, failed
@@ -0,0 +1,64 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from insurance.partitions import (PARTITIONED_MODELS, add_months, archive_month, drop_month, hot_cutoff,
+                                  month_start, months_with_rows)
+
+
+class Command(BaseCommand):
+    help = (
+        'Applies the retention policy to Feedback and Recommendation: every month older than '
+        'PARTITION_RETENTION_MONTHS is written to a compressed columnar archive file, checked '
+        'against the row count, then dropped from the database. Archives are read with '
+        'query_archive.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            default=getattr(settings, 'PARTITION_RETENTION_MONTHS', 12),
+            help='Months kept in the database, including the current one'
+        )
+        parser.add_argument(
+            '--output-dir',
+            default=getattr(settings, 'PARTITION_ARCHIVE_DIR', 'archive'),
+            help='Directory the archive files are written to'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='List the months that would be archived')
+        parser.add_argument('--keep-rows', action='store_true', help='Write archives without dropping the rows')
+
+    def handle(self, *args, **options):
+        if options['retention_months'] < 1:
+            raise CommandError('--retention-months must be at least 1')
+        cutoff = add_months(month_start(timezone.now()), 1 - options['retention_months'])
+        if cutoff > hot_cutoff():
+            # Hot-path queries would still expect rows this run removes
+            self.stderr.write('--retention-months is below PARTITION_RETENTION_MONTHS')
+        directory = options['output_dir']
+
+        for model in PARTITIONED_MODELS:
+            table = model._meta.db_table
+            for month in months_with_rows(model, cutoff):
+                rows = model._default_manager.filter(
+                    created_at__gte=month, created_at__lt=add_months(month, 1)
+                ).count()
+                if options['dry_run']:
+                    self.stdout.write(f'{table} {month:%Y-%m}: {rows} rows')
+                    continue
+                if not rows:
+                    drop_month(model, month)
+                    continue
+                path, written = archive_month(model, month, directory)
+                if written != rows:
+                    os.remove(path)
+                    raise CommandError(
+                        f'{table} {month:%Y-%m}: wrote {written} of {rows} rows; '
+                        'rows changed during archival, nothing was dropped'
+                    )
+                if not options['keep_rows']:
+                    drop_month(model, month)
+                self.stdout.write(f'{table} {month:%Y-%m}: archived {written} rows to {path}')
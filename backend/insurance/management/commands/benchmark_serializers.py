@@ -0,0 +1,77 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from insurance.models import InsurancePlan
+from insurance.serializers import InsurancePlanSerializer, ValuesSerializer
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark rows."""
+
+
+class Command(BaseCommand):
+    help = 'Compares InsurancePlanSerializer with the values-based read path on generated plans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 100000],
+            help='Catalog sizes to benchmark'
+        )
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        fast = ValuesSerializer(InsurancePlanSerializer)
+        self.stdout.write(f'{"rows":>8} {"serializer":>12} {"values":>12} {"speedup":>8}')
+
+        for rows in options['rows']:
+            try:
+                with transaction.atomic():
+                    self._create_plans(rows)
+                    queryset = InsurancePlan.objects.filter(name__startswith='Benchmark Plan ')
+
+                    start = time.perf_counter()
+                    expected = renderer.render(InsurancePlanSerializer(queryset, many=True).data)
+                    slow_time = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    actual = renderer.render(fast.serialize(fast.values(queryset)))
+                    fast_time = time.perf_counter() - start
+
+                    if actual != expected:
+                        raise CommandError(f'Output differs from InsurancePlanSerializer at {rows} rows')
+                    self.stdout.write(
+                        f'{rows:>8} {slow_time:>11.3f}s {fast_time:>11.3f}s {slow_time / fast_time:>7.1f}x'
+                    )
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def _create_plans(self, rows: int) -> None:
+        """Create benchmark plans inside the current transaction."""
+        plan_types = [choice for choice, _ in InsurancePlan.PLAN_TYPE_CHOICES]
+        InsurancePlan.objects.bulk_create(
+            (
+                InsurancePlan(
+                    name=f'Benchmark Plan {i}',
+                    plan_type=plan_types[i % len(plan_types)],
+                    provider=f'Provider {i % 50}',
+                    description='Benchmark insurance plan',
+                    coverage_details='Hospitalization, outpatient care and prescriptions',
+                    eligibility_criteria='Open to all residents',
+                    monthly_premium=Decimal(100 + i % 900),
+                    deductible=Decimal(500 + i % 1500),
+                    copay=Decimal(20) if i % 3 else None,
+                    max_coverage=Decimal(100000 + i),
+                    network_hospitals='Hospital A, Hospital B'
+                )
+                for i in range(rows)
+            ),
+            batch_size=5000
+        )
@@ -31,7 +31,8 @@ class Command(BaseCommand):
                 age=random.randint(25, 70),
                 budget=Decimal(str(random.randint(200, 1000))),
                 family_size=random.randint(1, 5),
-                medical_conditions=['none'] if i % 2 == 0 else ['diabetes', 'hypertension'],
+                name=f'Test User {i}',
+                medical_history='None' if i % 2 == 0 else 'Diabetes, hypertension',
                 is_profile_complete=True
             )
             users.append(user)
@@ -56,15 +57,13 @@ class Command(BaseCommand):
                 plan_type=random.choice(plan_types),
                 provider=f'Provider {i % 3}',
                 description=f'Comprehensive health insurance plan {i}',
-                coverage_details='Full coverage for most medical needs',
+                coverage_details=', '.join(random.sample(features, 4)),
                 eligibility_criteria='Open to all residents',
                 monthly_premium=Decimal(str(random.randint(200, 800))),
                 deductible=Decimal(str(random.randint(500, 2000))),
                 copay=Decimal(str(random.randint(20, 50))),
                 max_coverage=Decimal(str(random.randint(100000, 500000))),
-                network_hospitals=[f'Hospital {j}' for j in range(5)],
-                features=random.sample(features, 4),
-                popularity_score=round(random.uniform(3.0, 5.0), 1)
+                network_hospitals=', '.join(f'Hospital {j}' for j in range(5)),
             )
             plans.append(plan)
             self.stdout.write(f'Created plan: {plan.name}')
@@ -92,7 +91,7 @@ class Command(BaseCommand):
                     'premium_alerts': True,
                     'recommendation_updates': True
                 },
-                widgets_order=['recommendations', 'recent_plans', 'feedback']
+                widgets_order='recommendations,recent_plans,feedback'
             )
             self.stdout.write(f'Created dashboard preferences for user: {user.username}')
 
@@ -111,3 +110,4 @@ class Command(BaseCommand):
             self.stdout.write(f'Created feedback for user: {user.username}')
 
         self.stdout.write(self.style.SUCCESS('Successfully created dummy data'))
+        self.stdout.write('For benchmark-sized data, use generate_synthetic_data')
@@ -0,0 +1,2 @@
+# The command is shared with the api app, which cannot import insurance.
+from backend.synthetic_data import Command  # noqa: F401
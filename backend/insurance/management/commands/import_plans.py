@@ -0,0 +1,149 @@
+import csv
+import json
+import sys
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from insurance.catalog import bump_catalog_counter, invalidate_catalog_version
+from insurance.models import InsurancePlan
+from insurance.serializers import InsurancePlanSerializer
+
+
+class PlanImportSerializer(InsurancePlanSerializer):
+    """InsurancePlanSerializer rules without the unique check on name.
+
+    Existing names are updated rather than rejected, so the per-row
+    uniqueness query is skipped and conflicts are resolved by the upsert.
+    """
+    class Meta(InsurancePlanSerializer.Meta):
+        extra_kwargs = {'name': {'validators': []}}
+
+
+UPDATE_FIELDS = [
+    'plan_type', 'provider', 'description', 'coverage_details',
+    'eligibility_criteria', 'monthly_premium', 'deductible', 'copay',
+    'max_coverage', 'network_hospitals', 'updated_at'
+]
+
+
+def read_csv(stream) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per CSV row, leaving out empty cells."""
+    for row in csv.DictReader(stream):
+        yield {key: value for key, value in row.items() if key and value != ''}
+
+
+def read_jsonl(stream) -> Iterator[Any]:
+    """Yield one object per non-blank JSONL line.
+
+    Malformed lines are passed through as text so validation reports them
+    like any other invalid row.
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield line
+
+
+def validate_rows(rows: Iterable[Dict[str, Any]]) -> Iterator[Tuple[int, Any, Any]]:
+    """Validate rows one at a time with a single serializer instance.
+
+    Yields (row number, validated data or None, errors or None).
+    """
+    serializer = PlanImportSerializer()
+    for number, row in enumerate(rows, start=1):
+        try:
+            yield number, serializer.run_validation(row), None
+        except ValidationError as e:
+            yield number, None, e.detail
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """Yield lists of at most `size` items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = 'Imports insurance plans from a CSV or JSONL file, updating plans with the same name'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, or - to read from stdin')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='Input format (defaults to the file extension)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of rows validated and written per batch'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the input without writing to the database'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['format'] or path.rsplit('.', 1)[-1].lower()
+        if input_format not in ('csv', 'jsonl'):
+            raise CommandError('Cannot infer input format, please pass --format csv or --format jsonl')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        reader = read_csv if input_format == 'csv' else read_jsonl
+        if path == '-':
+            self._import(reader(sys.stdin), options)
+            return
+        try:
+            with open(path, newline='', encoding='utf-8') as stream:
+                self._import(reader(stream), options)
+        except OSError as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+
+    def _import(self, rows: Iterable[Dict[str, Any]], options: Dict[str, Any]) -> None:
+        processed = 0
+        imported = 0
+        invalid = 0
+        try:
+            for chunk in chunked(validate_rows(rows), options['chunk_size']):
+                processed += len(chunk)
+                # Keep the last row per name; one upsert cannot touch a row twice
+                plans = {}
+                for number, data, errors in chunk:
+                    if errors is not None:
+                        invalid += 1
+                        self.stderr.write(f'Row {number}: {errors}')
+                        continue
+                    plans[data['name']] = InsurancePlan(**data)
+
+                if plans and not options['dry_run']:
+                    InsurancePlan.objects.bulk_create(
+                        list(plans.values()),
+                        update_conflicts=True,
+                        unique_fields=['name'],
+                        update_fields=UPDATE_FIELDS
+                    )
+                imported += len(plans)
+                self.stdout.write(f'Processed {processed} rows ({invalid} invalid)')
+        finally:
+            if imported and not options['dry_run']:
+                # bulk_create does not send post_save
+                invalidate_catalog_version()
+                bump_catalog_counter()
+
+        action = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(f'{action} {imported} plans, skipped {invalid} invalid rows'))
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from insurance.partitions import (PARTITIONED_MODELS, add_months, convert_to_partitioned, create_partitions,
+                                  hot_cutoff, is_partitioned, month_start)
+
+
+class Command(BaseCommand):
+    help = (
+        'Partitions Feedback and Recommendation by month on PostgreSQL. Run once with --convert '
+        'to rebuild the tables as partitioned, then regularly (e.g. daily) to create the coming '
+        'months ahead of time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Rebuild tables that are not partitioned yet, copying their rows (locks the tables)'
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=getattr(settings, 'PARTITION_MONTHS_AHEAD', 3),
+            help='Months of partitions to create after the current one'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError(
+                f'Partitioning needs PostgreSQL, not {connection.vendor}; '
+                'archive_partitions still applies the retention policy'
+            )
+        last = add_months(month_start(timezone.now()), options['months_ahead'])
+        for model in PARTITIONED_MODELS:
+            table = model._meta.db_table
+            if not is_partitioned(model):
+                if not options['convert']:
+                    self.stderr.write(f'{table} is not partitioned; run with --convert')
+                    continue
+                convert_to_partitioned(model, options['months_ahead'])
+                self.stdout.write(f'Converted {table} to monthly partitions')
+            created = create_partitions(model, hot_cutoff(), last)
+            self.stdout.write(f'{table}: created {len(created)} partitions through {last:%Y-%m}')
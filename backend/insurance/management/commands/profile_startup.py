@@ -0,0 +1,2 @@
+# The command is shared with the api app, which cannot import insurance.
+from backend.startup_profile import Command  # noqa: F401
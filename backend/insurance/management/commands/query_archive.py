@@ -0,0 +1,57 @@
+import csv
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from insurance.partitions import PARTITIONED_MODELS, archive_columns, archived_months, read_archive
+
+
+class Command(BaseCommand):
+    help = (
+        'Reads archived Feedback or Recommendation months (see archive_partitions) and writes the '
+        'matching rows as CSV, for analytics on data no longer in the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=[model._meta.db_table for model in PARTITIONED_MODELS])
+        parser.add_argument('--from', dest='first', help='First month, YYYY-MM')
+        parser.add_argument('--to', dest='last', help='Last month, YYYY-MM')
+        parser.add_argument('--columns', help='Comma-separated columns to output (default: all)')
+        parser.add_argument(
+            '--where',
+            action='append',
+            default=[],
+            help='column=value filter on the archived value as text; repeat to combine'
+        )
+        parser.add_argument(
+            '--archive-dir',
+            default=getattr(settings, 'PARTITION_ARCHIVE_DIR', 'archive'),
+            help='Directory archive_partitions wrote to'
+        )
+
+    def handle(self, *args, **options):
+        model = next(model for model in PARTITIONED_MODELS if model._meta.db_table == options['table'])
+        known = archive_columns(model)
+        columns = options['columns'].split(',') if options['columns'] else known
+        filters = []
+        for condition in options['where']:
+            column, separator, value = condition.partition('=')
+            if not separator:
+                raise CommandError(f'--where expects column=value, got {condition!r}')
+            filters.append((column, value))
+        unknown = {column for column in columns + [column for column, _ in filters] if column not in known}
+        if unknown:
+            raise CommandError(f'Unknown columns: {", ".join(sorted(unknown))}')
+
+        months = [
+            (month, path) for month, path in archived_months(options['archive_dir'], model)
+            if (not options['first'] or month >= options['first'])
+            and (not options['last'] or month <= options['last'])
+        ]
+        read = sorted(set(columns) | {column for column, _ in filters})
+        writer = csv.writer(self.stdout)
+        writer.writerow(columns)
+        for _, path in months:
+            for row in read_archive(path, read):
+                if all(str(row[column]) == value for column, value in filters):
+                    writer.writerow([row[column] for column in columns])
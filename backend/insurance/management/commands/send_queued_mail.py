@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from insurance.mail_queue import claim_batch, send_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Delivers queued OutboundEmail rows in batches over a single SMTP connection, kept open '
+        'while there is mail and closed after --idle seconds without any. Runs as a worker '
+        'unless --once is given. Failed emails are retried with backoff.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Send the mail that is due and exit')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Seconds between queue polls when running as a worker')
+        parser.add_argument('--batch-size', type=int,
+                            default=getattr(settings, 'MAIL_QUEUE_BATCH_SIZE', 50),
+                            help='Emails claimed per batch')
+        parser.add_argument('--idle', type=float, default=60.0,
+                            help='Close the SMTP connection after this many idle seconds')
+
+    def handle(self, *args, **options):
+        connection = get_connection(fail_silently=False)
+        is_open = False
+        idle_since = time.monotonic()
+        try:
+            while True:
+                rows = claim_batch(options['batch_size'])
+                if rows:
+                    if not is_open:
+                        connection.open()
+                        is_open = True
+                    try:
+                        sent, failed = send_batch(connection, rows)
+                    except OSError as e:
+                        # Could not reconnect; unsent rows return when their lease ends
+                        self.stderr.write(f'SMTP connection failed: {e}')
+                        connection.close()
+                        is_open = False
+                        if options['once']:
+                            return
+                        time.sleep(options['interval'])
+                        continue
+                    self.stdout.write(f'Sent {sent} of {len(rows)} emails ({failed} failed)')
+                    idle_since = time.monotonic()
+                    continue
+                if options['once']:
+                    return
+                if is_open and time.monotonic() - idle_since > options['idle']:
+                    connection.close()
+                    is_open = False
+                time.sleep(options['interval'])
+        finally:
+            if is_open:
+                connection.close()
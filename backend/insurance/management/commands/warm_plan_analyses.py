@@ -0,0 +1,68 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend import llm_quota
+from gemini_client import LLMUnavailable, analyze_insurance_plan, breaker
+from insurance.analysis_cache import due_plans, plan_data, store_analysis
+
+
+class Command(BaseCommand):
+    help = (
+        'Pre-generates Gemini analyses for every plan so InsurancePlanViewSet.analyze is served '
+        'from cache. Regenerates analyses that are missing, older than their plan, or close to '
+        'expiry. Runs as a worker unless --once is given; progress lives in the cache, so a '
+        'restarted worker resumes with the plans still due.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Warm due plans once and exit')
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=30.0,
+            help='Seconds between passes when running as a worker'
+        )
+        parser.add_argument(
+            '--share',
+            type=float,
+            default=getattr(settings, 'LLM_WARMER_SHARE', 0.25),
+            help='Fraction of LLM_REQUESTS_PER_MINUTE the warmer may use'
+        )
+
+    def handle(self, *args, **options):
+        if not 0 < options['share'] <= 1:
+            raise CommandError('--share must be in (0, 1]')
+        per_minute = getattr(settings, 'LLM_REQUESTS_PER_MINUTE', 60) * options['share']
+        self.pause = 60.0 / per_minute
+
+        while True:
+            self.warm()
+            if options['once']:
+                return
+            time.sleep(options['interval'])
+
+    def warm(self) -> None:
+        """Generate analyses for the plans that are due, paced to the warmer's share of the quota."""
+        plans = due_plans()
+        if not plans:
+            return
+        warmed = 0
+        failed = 0
+        for index, plan in enumerate(plans):
+            if index:
+                time.sleep(max(0.0, self.pause - (time.monotonic() - started)))
+            started = time.monotonic()
+            try:
+                analysis = analyze_insurance_plan(plan_data(plan), priority=llm_quota.BACKGROUND)
+            except LLMUnavailable as e:
+                failed += 1
+                self.stderr.write(f'Plan {plan.id}: {e}')
+                if breaker.is_open():
+                    # Leave the rest due for the next pass
+                    break
+            else:
+                store_analysis(plan, analysis)
+                warmed += 1
+        self.stdout.write(f'Warmed {warmed} of {len(plans)} due plans ({failed} failed)')
@@ -4,6 +4,8 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from typing import Optional
 
+from backend.prompts import condense_medical_history
+
 class User(AbstractUser):
     """Custom user model for the health insurance system."""
     name = models.CharField(max_length=255)
@@ -28,6 +30,11 @@ class User(AbstractUser):
         blank=True,
         help_text="Detailed medical history of the user"
     )
+    medical_history_summary = models.TextField(
+        blank=True,
+        editable=False,
+        help_text="Condensed medical history used in AI prompts, empty if the full text is short"
+    )
     preferred_hospital_network = models.CharField(
         max_length=100,
         blank=True,
@@ -52,6 +59,18 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    def save(self, *args, **kwargs):
+        self.medical_history_summary = condense_medical_history(self.medical_history)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'medical_history' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'medical_history_summary'}
+        super().save(*args, **kwargs)
+
+    @property
+    def prompt_medical_history(self) -> str:
+        """Medical history as sent to the LLM."""
+        return self.medical_history_summary or self.medical_history
+
 class InsurancePlan(models.Model):
     """Model for storing insurance plan details."""
     PLAN_TYPE_CHOICES = [
@@ -129,6 +148,7 @@ class InsurancePlan(models.Model):
         indexes = [
             models.Index(fields=['name']),
             models.Index(fields=['provider']),
+            models.Index(fields=['plan_type']),
         ]
 
     def __str__(self):
@@ -187,6 +207,11 @@ class Feedback(models.Model):
         verbose_name = "Feedback"
         verbose_name_plural = "Feedback"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['feedback_type', 'created_at']),
+            models.Index(fields=['rating', 'created_at']),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s feedback on {self.feedback_type}"
@@ -237,6 +262,7 @@ class Recommendation(models.Model):
         indexes = [
             models.Index(fields=['created_at']),
             models.Index(fields=['recommendation_score']),
+            models.Index(fields=['is_accepted', 'created_at']),
         ]
 
     def __str__(self):
@@ -283,6 +309,10 @@ class PlanComparison(models.Model):
         verbose_name = "Plan Comparison"
         verbose_name_plural = "Plan Comparisons"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['comparison_name']),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s comparison - {self.comparison_name}"
@@ -326,3 +356,39 @@ class UserDashboardPreference(models.Model):
 
     def __str__(self):
         return f"{self.user.username}'s dashboard preferences"
+
+class OutboundEmail(models.Model):
+    """Email waiting to be delivered by the send_queued_mail worker."""
+    KIND_CHOICES = [
+        ('message', 'Message'),
+        ('password_reset', 'Password Reset')
+    ]
+
+    kind = models.CharField(
+        max_length=20,
+        choices=KIND_CHOICES,
+        default='message',
+        help_text="Password reset emails are rendered by the worker at send time"
+    )
+    to = models.EmailField(help_text="Recipient address")
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(
+        default=0,
+        help_text="Failed delivery attempts so far"
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        help_text="When the worker may next try to send this email"
+    )
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Outbound Email"
+        verbose_name_plural = "Outbound Emails"
+        ordering = ['next_attempt_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} to {self.to}"
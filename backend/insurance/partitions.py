@@ -0,0 +1,249 @@
+"""
+Monthly partitions and archival for Feedback and Recommendation.
+
+Both tables only grow, and their list queries read the newest rows. On
+PostgreSQL, `manage.py partition_tables --convert` turns each into a table
+partitioned by month on `created_at`. Run it again regularly, without
+--convert, to create the coming months. Queries bounded with `recent()`
+only scan the partitions of the retention window. Other databases keep a
+single table; there the bound is served by the `created_at` index.
+
+`manage.py archive_partitions` writes each month older than
+PARTITION_RETENTION_MONTHS to a gzip-compressed columnar file:
+<PARTITION_ARCHIVE_DIR>/<table>/<YYYY-MM>.columns.json.gz. The file holds
+JSON lines, each a row group that stores every column as one list. The
+month is then dropped: its partition is detached and dropped, or its rows
+are deleted in batches. Staff analytics read archives back with
+`read_archive` or `manage.py query_archive`.
+"""
+
+import datetime
+import gzip
+import json
+import os
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from .models import Feedback, Recommendation
+
+PARTITIONED_MODELS = (Feedback, Recommendation)
+PARTITION_FIELD = 'created_at'
+ROW_GROUP_SIZE = 50000
+DELETE_BATCH_SIZE = 5000
+ARCHIVE_SUFFIX = '.columns.json.gz'
+
+
+def month_start(value: datetime.datetime) -> datetime.datetime:
+    """Midnight UTC on the first day of the value's month."""
+    value = value.astimezone(datetime.timezone.utc) if timezone.is_aware(value) else value
+    return datetime.datetime(value.year, value.month, 1, tzinfo=datetime.timezone.utc)
+
+
+def add_months(month: datetime.datetime, count: int) -> datetime.datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def hot_cutoff(now: Optional[datetime.datetime] = None) -> datetime.datetime:
+    """Start of the oldest month still kept in the database."""
+    retention = getattr(settings, 'PARTITION_RETENTION_MONTHS', 12)
+    return add_months(month_start(now or timezone.now()), 1 - retention)
+
+
+def recent(queryset: models.QuerySet) -> models.QuerySet:
+    """Bound a Feedback or Recommendation queryset to the retention window, for partition pruning."""
+    return queryset.filter(**{f'{PARTITION_FIELD}__gte': hot_cutoff()})
+
+
+def months_with_rows(model, before: datetime.datetime) -> List[datetime.datetime]:
+    """Months before `before` that may still hold rows, oldest first."""
+    oldest = (model._default_manager.filter(**{f'{PARTITION_FIELD}__lt': before})
+              .order_by(PARTITION_FIELD).values_list(PARTITION_FIELD, flat=True).first())
+    if oldest is None:
+        return []
+    months = []
+    month = month_start(oldest)
+    while month < before:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+# PostgreSQL partitions
+
+def partition_name(model, month: datetime.datetime) -> str:
+    return f'{model._meta.db_table}_p{month:%Y%m}'
+
+
+def is_partitioned(model) -> bool:
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def partition_exists(name: str) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [name])
+        return cursor.fetchone()[0]
+
+
+def create_partitions(model, first: datetime.datetime, last: datetime.datetime) -> List[str]:
+    """Create the missing monthly partitions from `first` through `last`; returns the new ones."""
+    qn = connection.ops.quote_name
+    created = []
+    month = month_start(first)
+    with connection.cursor() as cursor:
+        while month <= last:
+            name = partition_name(model, month)
+            if not partition_exists(name):
+                cursor.execute(
+                    f'CREATE TABLE {qn(name)} PARTITION OF {qn(model._meta.db_table)} '
+                    f'FOR VALUES FROM (%s) TO (%s)',
+                    [month, add_months(month, 1)]
+                )
+                created.append(name)
+            month = add_months(month, 1)
+    return created
+
+
+def convert_to_partitioned(model, months_ahead: int) -> None:
+    """
+    Rebuild a table as partitioned by month, copying its rows. The primary key
+    becomes (id, created_at), since PostgreSQL requires unique constraints to
+    include the partition key; ids still come from one sequence. Rows outside
+    the created months land in a default partition. Run in a maintenance
+    window: the table is locked while rows are copied.
+    """
+    qn = connection.ops.quote_name
+    table = model._meta.db_table
+    legacy = f'{table}_unpartitioned'
+    pk = model._meta.pk.column
+    sequence = f'{table}_{pk}_partitioned_seq'
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}')
+        cursor.execute(
+            f'CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ({qn(PARTITION_FIELD)})'
+        )
+        cursor.execute(f'CREATE SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.{qn(pk)}')
+        cursor.execute(f'ALTER TABLE {qn(table)} ALTER COLUMN {qn(pk)} SET DEFAULT nextval(%s)', [sequence])
+        cursor.execute(f'CREATE TABLE {qn(table + "_default")} PARTITION OF {qn(table)} DEFAULT')
+
+        cursor.execute(f'SELECT MIN({qn(PARTITION_FIELD)}) FROM {qn(legacy)}')
+        oldest = cursor.fetchone()[0] or timezone.now()
+        create_partitions(model, oldest, add_months(month_start(timezone.now()), months_ahead))
+
+        cursor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}')
+        cursor.execute(f'SELECT setval(%s, COALESCE((SELECT MAX({qn(pk)}) FROM {qn(table)}), 0) + 1, false)',
+                       [sequence])
+        cursor.execute(f'DROP TABLE {qn(legacy)}')
+
+        cursor.execute(f'ALTER TABLE {qn(table)} ADD PRIMARY KEY ({qn(pk)}, {qn(PARTITION_FIELD)})')
+        with connection.schema_editor(atomic=False) as editor:
+            for field in model._meta.local_fields:
+                if isinstance(field, models.ForeignKey):
+                    editor.execute(editor._create_fk_sql(model, field, '_fk_%(to_table)s_%(to_column)s'))
+                    editor.add_index(model, models.Index(fields=[field.name], name=f'{table[:18]}_{field.column[:8]}_idx'))
+            for index in model._meta.indexes:
+                editor.add_index(model, index)
+
+
+def drop_month(model, month: datetime.datetime) -> None:
+    """Remove a month of rows: drop its partition where there is one, delete in batches otherwise."""
+    qn = connection.ops.quote_name
+    name = partition_name(model, month)
+    if is_partitioned(model) and partition_exists(name):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {qn(model._meta.db_table)} DETACH PARTITION {qn(name)}')
+            cursor.execute(f'DROP TABLE {qn(name)}')
+        return
+    rows = model._default_manager.filter(**{
+        f'{PARTITION_FIELD}__gte': month, f'{PARTITION_FIELD}__lt': add_months(month, 1)
+    })
+    # Raw deletes: per-row signals and cascades are pointless for cold rows
+    table, pk = qn(model._meta.db_table), qn(model._meta.pk.column)
+    while True:
+        ids = list(rows.order_by().values_list('pk', flat=True)[:DELETE_BATCH_SIZE])
+        if not ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE {pk} IN ({", ".join(["%s"] * len(ids))})', ids)
+
+
+# Archives
+
+def archive_columns(model) -> List[str]:
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def archive_path(directory: str, model, month: datetime.datetime) -> str:
+    return os.path.join(directory, model._meta.db_table, f'{month:%Y-%m}{ARCHIVE_SUFFIX}')
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def archive_month(model, month: datetime.datetime, directory: str) -> Tuple[str, int]:
+    """Write a month of rows to its archive file; returns the path and the number of rows."""
+    columns = archive_columns(model)
+    rows = (model._default_manager
+            .filter(**{f'{PARTITION_FIELD}__gte': month, f'{PARTITION_FIELD}__lt': add_months(month, 1)})
+            .order_by('pk').values_list(*columns))
+    path = archive_path(directory, model, month)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = path + '.partial'
+    count = 0
+    with gzip.open(partial, 'wt', encoding='utf-8') as stream:
+        group: List[Sequence[Any]] = []
+        for row in rows.iterator(chunk_size=ROW_GROUP_SIZE):
+            group.append(row)
+            if len(group) == ROW_GROUP_SIZE:
+                count += _write_group(stream, columns, group)
+                group = []
+        if group:
+            count += _write_group(stream, columns, group)
+    # Only complete archives carry the final name
+    os.replace(partial, path)
+    return path, count
+
+
+def _write_group(stream, columns: List[str], group: List[Sequence[Any]]) -> int:
+    data = {column: [_encode(value) for value in values] for column, values in zip(columns, zip(*group))}
+    stream.write(json.dumps({'rows': len(group), 'columns': data}, separators=(',', ':')))
+    stream.write('\n')
+    return len(group)
+
+
+def read_archive(path: str, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Rows of an archive file as dicts; `columns` limits which are returned."""
+    with gzip.open(path, 'rt', encoding='utf-8') as stream:
+        for line in stream:
+            group = json.loads(line)['columns']
+            names = list(columns) if columns else list(group)
+            for values in zip(*(group[name] for name in names)):
+                yield dict(zip(names, values))
+
+
+def archived_months(directory: str, model) -> List[Tuple[str, str]]:
+    """(YYYY-MM, path) of each month archived for a model, oldest first."""
+    folder = os.path.join(directory, model._meta.db_table)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(
+        (name[:-len(ARCHIVE_SUFFIX)], os.path.join(folder, name))
+        for name in os.listdir(folder) if name.endswith(ARCHIVE_SUFFIX)
+    )
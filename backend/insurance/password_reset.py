@@ -1,49 +1,41 @@
 from rest_framework import status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.utils.encoding import force_bytes, force_str
-from django.core.mail import send_mail
-from django.conf import settings
-from django_ratelimit.decorators import ratelimit
-from django.utils.decorators import method_decorator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.utils.http import urlsafe_base64_decode
+from django.utils.encoding import force_str
 
+from backend.ratelimit import SharedRateThrottle
+from .mail_queue import enqueue_password_reset
 from .models import User
 
+class PasswordResetThrottle(SharedRateThrottle):
+    scope = 'password_reset'
+
+class PasswordResetConfirmThrottle(SharedRateThrottle):
+    scope = 'password_reset_confirm'
+
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
-@method_decorator(ratelimit(key='ip', rate='5/m', method=['POST']))
+@throttle_classes([PasswordResetThrottle])
 def request_password_reset(request):
-    """Send password reset email to user."""
+    """Queue a password reset email for the send_queued_mail worker."""
     email = request.data.get('email')
     try:
-        user = User.objects.get(email=email)
-    except User.DoesNotExist:
-        # Always return success to prevent email enumeration
-        return Response({'detail': 'Password reset email sent if account exists.'})
-
-    # Generate password reset token
-    token = default_token_generator.make_token(user)
-    uid = urlsafe_base64_encode(force_bytes(user.pk))
-    
-    # Create reset link
-    reset_url = f'{settings.FRONTEND_URL}/reset-password?uid={uid}&token={token}'
-    
-    # Send email
-    send_mail(
-        'Reset Your Password',
-        f'Click the following link to reset your password: {reset_url}',
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        fail_silently=False,
-    )
-    
+        validate_email(email)
+    except ValidationError:
+        pass
+    else:
+        # The worker looks up the account, so this costs the same either way
+        enqueue_password_reset(email)
+    # Always return success to prevent email enumeration
     return Response({'detail': 'Password reset email sent if account exists.'})
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
-@method_decorator(ratelimit(key='ip', rate='5/m', method=['POST']))
+@throttle_classes([PasswordResetConfirmThrottle])
 def reset_password(request):
     """Reset user password using token."""
     uid = request.data.get('uid')
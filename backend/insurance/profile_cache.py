@@ -0,0 +1,109 @@
+"""
+Write-through cache of each user's serialized profile and dashboard preferences.
+
+Reads (`/users/me/`, `current_preferences`, dashboard misses) come from the
+cache and only fall back to the database when the entry is missing. Writes
+go to the database first. Once the transaction commits, signals store the
+new serialized row in the cache, so the next read is a hit again.
+Preferences are saved with one `update_or_create` upsert on the user's
+unique row.
+"""
+
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import User, UserDashboardPreference
+from .serializers import UserDashboardPreferenceSerializer, UserSerializer
+
+PROFILE_CACHE_KEY = 'user_profile:{}'
+PREFERENCES_CACHE_KEY = 'dashboard_preferences:{}'
+DEFAULT_WIDGETS_ORDER = 'recommendations,recent_plans,feedback'
+DEFAULT_PREFERENCES = {
+    'default_view': 'grid',
+    'show_premium_first': False,
+    'notification_preferences': {},
+    'widgets_order': DEFAULT_WIDGETS_ORDER,
+}
+
+
+def _ttl() -> Optional[int]:
+    # Bounds staleness after writes that skip signals, e.g. queryset.update()
+    return getattr(settings, 'PROFILE_CACHE_TTL', 3600)
+
+
+def store_profile(user: User) -> Dict[str, Any]:
+    """Serialize a user into the cache and return the data."""
+    data = dict(UserSerializer(user).data)
+    cache.set(PROFILE_CACHE_KEY.format(user.pk), data, _ttl())
+    return data
+
+
+def get_profile(user_id: Any) -> Optional[Dict[str, Any]]:
+    """A user's serialized profile; None if the user does not exist."""
+    data = cache.get(PROFILE_CACHE_KEY.format(user_id))
+    if data is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        data = store_profile(user)
+    return data
+
+
+def store_preferences(preferences: UserDashboardPreference) -> Dict[str, Any]:
+    """Serialize a preference row into the cache and return the data."""
+    data = dict(UserDashboardPreferenceSerializer(preferences).data)
+    cache.set(PREFERENCES_CACHE_KEY.format(preferences.user_id), data, _ttl())
+    return data
+
+
+def get_or_create_preferences(user_id: Any) -> UserDashboardPreference:
+    """Get a user's preference row, creating the defaults on first use."""
+    preferences, _ = UserDashboardPreference.objects.get_or_create(
+        user_id=user_id, defaults=DEFAULT_PREFERENCES
+    )
+    return preferences
+
+
+def get_preferences(user_id: Any) -> Dict[str, Any]:
+    """A user's serialized dashboard preferences, created with the defaults if missing."""
+    data = cache.get(PREFERENCES_CACHE_KEY.format(user_id))
+    if data is None:
+        data = store_preferences(get_or_create_preferences(user_id))
+    return data
+
+
+def save_preferences(user_id: Any, values: Dict[str, Any]) -> UserDashboardPreference:
+    """Update a user's preference row in place, or insert it if there is none yet."""
+    preferences, _ = UserDashboardPreference.objects.update_or_create(
+        user_id=user_id, defaults=values
+    )
+    return preferences
+
+
+def profile_changed(user: User) -> None:
+    """
+    Drop the cached profile now and store the saved row once the transaction
+    commits. Reads in between fall back to the database rather than seeing a
+    write that may still roll back.
+    """
+    cache.delete(PROFILE_CACHE_KEY.format(user.pk))
+    transaction.on_commit(lambda: store_profile(user))
+
+
+def preferences_changed(preferences: UserDashboardPreference) -> None:
+    """Like `profile_changed`, for a preference row."""
+    cache.delete(PREFERENCES_CACHE_KEY.format(preferences.user_id))
+    transaction.on_commit(lambda: store_preferences(preferences))
+
+
+def forget_profile(user_id: Any) -> None:
+    """Drop everything cached for a deleted user."""
+    cache.delete_many([PROFILE_CACHE_KEY.format(user_id), PREFERENCES_CACHE_KEY.format(user_id)])
+
+
+def forget_preferences(user_id: Any) -> None:
+    """Drop the cached preferences of a user whose row was deleted."""
+    cache.delete(PREFERENCES_CACHE_KEY.format(user_id))
@@ -1,7 +1,12 @@
-from rest_framework import serializers
+import decimal
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from .models import (User, InsurancePlan, Feedback, Recommendation,
                     PlanComparison, UserDashboardPreference)
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+from .comparison import MAX_COMPARED_PLANS
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for the User model."""
@@ -47,6 +52,7 @@ class RecommendationSerializer(serializers.ModelSerializer):
     """Serializer for the Recommendation model."""
     user = serializers.PrimaryKeyRelatedField(read_only=True)
     insurance_plan = InsurancePlanSerializer(read_only=True)
+    recommendation_date = serializers.DateTimeField(source='created_at', read_only=True)
 
     class Meta:
         model = Recommendation
@@ -58,11 +64,10 @@ class FeedbackSerializer(serializers.ModelSerializer):
     """Serializer for the Feedback model."""
     user = serializers.PrimaryKeyRelatedField(read_only=True)
     insurance_plan = InsurancePlanSerializer(read_only=True)
-    recommendation = RecommendationSerializer(read_only=True)
 
     class Meta:
         model = Feedback
-        fields = ['id', 'user', 'feedback_type', 'insurance_plan', 'recommendation',
+        fields = ['id', 'user', 'feedback_type', 'insurance_plan',
                  'rating', 'ui_element', 'comments', 'created_at']
         read_only_fields = ['created_at']
 
@@ -79,7 +84,8 @@ class PlanComparisonSerializer(serializers.ModelSerializer):
     plan_ids = serializers.ListField(
         child=serializers.IntegerField(),
         write_only=True,
-        required=True
+        required=True,
+        max_length=MAX_COMPARED_PLANS
     )
 
     class Meta:
@@ -104,3 +110,111 @@ class UserDashboardPreferenceSerializer(serializers.ModelSerializer):
                  'notification_preferences', 'widgets_order',
                  'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
+
+# Fields whose to_representation is the identity for values read from the DB
+IDENTITY_FIELDS = (serializers.CharField, serializers.IntegerField,
+                   serializers.BooleanField, serializers.FloatField,
+                   serializers.PrimaryKeyRelatedField)
+
+def _decimal_converter(field: serializers.DecimalField) -> Callable:
+    """Inline DecimalField.to_representation for Decimal values."""
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.decimal_places is None:
+        return field.to_representation
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        return format(value.quantize(exponent, rounding=rounding, context=context), 'f')
+    return convert
+
+def _datetime_converter(field: serializers.DateTimeField) -> Callable:
+    """Inline DateTimeField.to_representation for ISO 8601 output."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601 or hasattr(field, 'timezone'):
+        return field.to_representation
+    if not settings.USE_TZ:
+        return lambda value: value.isoformat()
+
+    def convert(value):
+        value = value.astimezone(timezone.get_current_timezone()).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+def _converter(field: serializers.Field) -> Optional[Callable]:
+    """Pick the cheapest converter equivalent to `field.to_representation`."""
+    if isinstance(field, IDENTITY_FIELDS):
+        return None
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    return field.to_representation
+
+class ValuesSerializer:
+    """Read-only fast path that renders `.values_list()` rows.
+
+    The field layout and converters are compiled once from a regular
+    serializer, so the output is identical to `serializer_class(obj).data`
+    without instantiating models or walking DRF's per-field machinery.
+    Supports plain model fields (with `source`), primary key relations and
+    nested read-only serializers of the same kind.
+    """
+
+    def __init__(self, serializer_class: type) -> None:
+        self.serializer_class = serializer_class
+        self.lookups: List[str] = []
+        self.layout = self._compile(serializer_class(), '')
+        self.width = len(self.lookups)
+
+    def _compile(self, serializer: serializers.Serializer, prefix: str) -> List[Tuple]:
+        """Build (name, column or nested layout, converter) entries."""
+        layout = []
+        for field in serializer._readable_fields:
+            if isinstance(field, serializers.BaseSerializer):
+                pk_column = len(self.lookups)
+                self.lookups.append(f'{prefix}{field.source}__pk')
+                nested = self._compile(field, f'{prefix}{field.source}__')
+                layout.append((field.field_name, (pk_column, nested), None))
+                continue
+
+            if isinstance(field, serializers.PrimaryKeyRelatedField):
+                lookup = f'{prefix}{field.source}_id'
+            elif isinstance(field, serializers.ModelField) or '.' in field.source:
+                raise ValueError(f'Field {field.field_name!r} is not supported by ValuesSerializer')
+            else:
+                lookup = f'{prefix}{field.source}'
+            layout.append((field.field_name, len(self.lookups), _converter(field)))
+            self.lookups.append(lookup)
+        return layout
+
+    def _render(self, row: Tuple, layout: List[Tuple]) -> Dict[str, Any]:
+        data = {}
+        for name, column, converter in layout:
+            if isinstance(column, tuple):
+                pk_column, nested = column
+                data[name] = None if row[pk_column] is None else self._render(row, nested)
+                continue
+            value = row[column]
+            if value is None or converter is None:
+                data[name] = value
+            else:
+                data[name] = converter(value)
+        return data
+
+    def values(self, queryset):
+        """Project a queryset onto the columns this serializer needs."""
+        return queryset.values_list(*self.lookups)
+
+    def to_representation(self, row: Tuple) -> Dict[str, Any]:
+        """Render a single `values()` row."""
+        return self._render(row, self.layout)
+
+    def serialize(self, rows: Iterable[Tuple]) -> List[Dict[str, Any]]:
+        """Render many `values()` rows."""
+        layout = self.layout
+        render = self._render
+        return [render(row, layout) for row in rows]
@@ -0,0 +1,88 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+
+from backend.authentication import bump_profile_version
+from .dashboard import bump_dashboard_version
+from .profile_cache import forget_preferences, forget_profile, preferences_changed, profile_changed
+from .models import (Feedback, InsurancePlan, PlanComparison, Recommendation, User,
+                     UserDashboardPreference)
+from .catalog import invalidate_catalog_version, bump_catalog_counter
+
+
+@receiver(post_save, sender=InsurancePlan)
+@receiver(post_delete, sender=InsurancePlan)
+def plan_catalog_changed(sender, instance: InsurancePlan, **kwargs) -> None:
+    """Invalidate catalog-derived caches when a plan changes."""
+    invalidate_catalog_version()
+    bump_catalog_counter()
+    # Bump again once committed, so workers that reloaded mid-transaction
+    # do not keep a snapshot of the uncommitted state.
+    transaction.on_commit(bump_catalog_counter)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_profile_changed(sender, instance: User, **kwargs) -> None:
+    """Make token profile claims and cached copies of the user stale."""
+    bump_profile_version(instance.pk)
+    transaction.on_commit(lambda: bump_profile_version(instance.pk))
+
+
+@receiver(post_save, sender=Recommendation)
+@receiver(post_delete, sender=Recommendation)
+@receiver(post_save, sender=Feedback)
+@receiver(post_delete, sender=Feedback)
+@receiver(post_save, sender=PlanComparison)
+@receiver(post_delete, sender=PlanComparison)
+@receiver(post_save, sender=UserDashboardPreference)
+@receiver(post_delete, sender=UserDashboardPreference)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def dashboard_changed(sender, instance, **kwargs) -> None:
+    """Make the cached dashboard widgets of the row's user stale."""
+    user_id = instance.pk if isinstance(instance, User) else instance.user_id
+    if user_id is None:
+        return
+    bump_dashboard_version(user_id)
+    transaction.on_commit(lambda: bump_dashboard_version(user_id))
+
+
+@receiver(m2m_changed, sender=PlanComparison.plans.through)
+def comparison_plans_changed(sender, instance, action: str, reverse: bool, pk_set, **kwargs) -> None:
+    """Make dashboards stale when plans are added to or removed from a comparison."""
+    if not reverse:
+        if action.startswith('post_'):
+            dashboard_changed(sender, instance)
+        return
+    # Changed from the plan side; a clear has no pk_set, so look up its comparisons first
+    if action == 'pre_clear':
+        comparisons = instance.comparisons.all()
+    elif action in ('post_add', 'post_remove'):
+        comparisons = PlanComparison.objects.filter(pk__in=pk_set)
+    else:
+        return
+    for user_id in set(comparisons.values_list('user_id', flat=True)):
+        bump_dashboard_version(user_id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance: User, **kwargs) -> None:
+    """Write the saved profile through to the profile cache."""
+    profile_changed(instance)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance: User, **kwargs) -> None:
+    forget_profile(instance.pk)
+
+
+@receiver(post_save, sender=UserDashboardPreference)
+def preferences_saved(sender, instance: UserDashboardPreference, **kwargs) -> None:
+    """Write saved dashboard preferences through to the profile cache."""
+    preferences_changed(instance)
+
+
+@receiver(post_delete, sender=UserDashboardPreference)
+def preferences_deleted(sender, instance: UserDashboardPreference, **kwargs) -> None:
+    forget_preferences(instance.user_id)
@@ -1,16 +1,43 @@
 """
 Test suite for the insurance application.
 """
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from rest_framework.renderers import JSONRenderer
 from insurance.models import InsurancePlan, Feedback, Recommendation, PlanComparison
+from insurance.serializers import (InsurancePlanSerializer, FeedbackSerializer,
+                                   RecommendationSerializer, ValuesSerializer)
+from django.core.management import call_command
 from decimal import Decimal
+from io import StringIO
+import csv
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from django.utils import timezone
 import time
 from .test_logger import TestLogger
+from gemini_client import CircuitBreaker, breaker
+from insurance.analysis_cache import ANALYSIS_TTL, due_plans, get_analysis, store_analysis
+from insurance.mail_queue import enqueue
+from insurance.models import OutboundEmail, UserDashboardPreference
+from insurance.dashboard import parse_widgets_order
+from insurance import comparison as comparison_engine
+from insurance.exports import COMPARISON_EXPORT, export_chunks
+from insurance.partitions import add_months, archived_months, month_start, read_archive
+from unittest import mock
+from insurance.password_reset import request_password_reset
+from rest_framework.test import APIRequestFactory
+from backend import ratelimit
+import socketserver
+import threading
 
 User = get_user_model()
 
@@ -134,6 +161,32 @@ class UserTests(InsuranceBaseTestCase):
             time.time() - start_time
         )
 
+    def test_recommended_plans(self):
+        self.logger.log_test_start("test_recommended_plans")
+        start_time = time.time()
+        """Test recommended plans come from the catalog within budget."""
+        InsurancePlan.objects.create(
+            name='Expensive Plan',
+            plan_type='premium',
+            provider='Test Insurance Co',
+            description='An expensive plan',
+            coverage_details='Premium family coverage',
+            eligibility_criteria='Standard eligibility criteria',
+            monthly_premium=Decimal('5000.00'),
+            deductible=Decimal('1000.00')
+        )
+        url = reverse('user-recommended-plans', kwargs={'pk': self.user.pk})
+        self.authenticate_user()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [plan['name'] for plan in response.data['recommendations']]
+        self.assertEqual(names, [self.plan.name])
+        self.logger.log_test_result(
+            "test_recommended_plans",
+            "PASS",
+            time.time() - start_time
+        )
+
 class InsurancePlanTests(InsuranceBaseTestCase):
     """Test cases for InsurancePlanViewSet."""
 
@@ -289,3 +342,767 @@ class FeedbackTests(InsuranceBaseTestCase):
             "PASS",
             time.time() - start_time
         )
+
+class PlanCatalogConditionalGetTests(InsuranceBaseTestCase):
+    """Test cases for ETag/Last-Modified handling on the plan catalog."""
+
+    def test_list_plans_not_modified(self):
+        self.logger.log_test_start("test_list_plans_not_modified")
+        start_time = time.time()
+        """Test that a matching ETag yields 304 on the plan list."""
+        url = reverse('insuranceplan-list')
+        self.authenticate_user()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.logger.log_test_result(
+            "test_list_plans_not_modified",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_plan_detail_etag_changes_on_update(self):
+        self.logger.log_test_start("test_plan_detail_etag_changes_on_update")
+        start_time = time.time()
+        """Test that updating a plan invalidates the detail ETag."""
+        url = reverse('insuranceplan-detail', kwargs={'pk': self.plan.pk})
+        self.authenticate_user()
+        etag = self.client.get(url)['ETag']
+
+        self.plan.monthly_premium = Decimal('550.00')
+        self.plan.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['monthly_premium'], '550.00')
+        self.logger.log_test_result(
+            "test_plan_detail_etag_changes_on_update",
+            "PASS",
+            time.time() - start_time
+        )
+
+class ImportPlansCommandTests(InsuranceBaseTestCase):
+    """Test cases for the import_plans management command."""
+
+    def write_file(self, suffix, content):
+        """Write content to a temporary file and return its path."""
+        handle = tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False)
+        with handle:
+            handle.write(content)
+        self.addCleanup(os.remove, handle.name)
+        return handle.name
+
+    def test_import_csv_upserts_by_name(self):
+        self.logger.log_test_start("test_import_csv_upserts_by_name")
+        start_time = time.time()
+        """Test CSV import creates new plans and updates existing ones."""
+        path = self.write_file('.csv', (
+            'name,plan_type,provider,description,coverage_details,eligibility_criteria,'
+            'monthly_premium,deductible,copay,max_coverage,network_hospitals\n'
+            'Test Plan,standard,Test Insurance Co,Updated,Updated coverage,Open,'
+            '650.00,900.00,,,\n'
+            'New Plan,family,New Co,New plan,Family coverage,Open,300.00,500.00,10.00,50000.00,Hospital Z\n'
+            'Broken Plan,basic,Broken Co,Broken,Broken,Open,not-a-number,500.00,,,\n'
+        ))
+        out, err = StringIO(), StringIO()
+        call_command('import_plans', path, chunk_size=2, stdout=out, stderr=err)
+
+        self.assertEqual(InsurancePlan.objects.count(), 2)
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.monthly_premium, Decimal('650.00'))
+        self.assertIsNone(self.plan.copay)
+        self.assertEqual(InsurancePlan.objects.get(name='New Plan').provider, 'New Co')
+        self.assertIn('Row 3', err.getvalue())
+        self.assertIn('Imported 2 plans, skipped 1 invalid rows', out.getvalue())
+        self.logger.log_test_result(
+            "test_import_csv_upserts_by_name",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_import_jsonl_dry_run(self):
+        self.logger.log_test_start("test_import_jsonl_dry_run")
+        start_time = time.time()
+        """Test JSONL dry run validates without writing."""
+        path = self.write_file('.jsonl', (
+            '{"name": "Json Plan", "provider": "Json Co", "description": "d", '
+            '"coverage_details": "c", "eligibility_criteria": "e", '
+            '"monthly_premium": "100.00", "deductible": "200.00"}\n'
+            '{not json}\n'
+        ))
+        out, err = StringIO(), StringIO()
+        call_command('import_plans', path, dry_run=True, stdout=out, stderr=err)
+
+        self.assertFalse(InsurancePlan.objects.filter(name='Json Plan').exists())
+        self.assertIn('Validated 1 plans, skipped 1 invalid rows', out.getvalue())
+        self.logger.log_test_result(
+            "test_import_jsonl_dry_run",
+            "PASS",
+            time.time() - start_time
+        )
+
+class ValuesSerializerTests(InsuranceBaseTestCase):
+    """Test cases for the values-based read path."""
+
+    def setUp(self):
+        super().setUp()
+        self.feedback.insurance_plan = self.plan
+        self.feedback.save()
+        Feedback.objects.create(user=self.user, rating=2, comments='No plan attached')
+        Recommendation.objects.create(
+            user=self.user,
+            insurance_plan=self.plan,
+            recommendation_score=0.75,
+            notes='Good fit'
+        )
+
+    def assert_renders_identically(self, serializer_class, queryset):
+        """Check both serializers produce the same JSON bytes."""
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        fast = ValuesSerializer(serializer_class)
+        actual = JSONRenderer().render(fast.serialize(fast.values(queryset)))
+        self.assertEqual(actual, expected)
+
+    def test_values_serializer_matches_model_serializers(self):
+        self.logger.log_test_start("test_values_serializer_matches_model_serializers")
+        start_time = time.time()
+        """Test fast path output is byte-identical to the DRF serializers."""
+        self.assert_renders_identically(InsurancePlanSerializer, InsurancePlan.objects.all())
+        self.assert_renders_identically(FeedbackSerializer, Feedback.objects.all())
+        self.assert_renders_identically(RecommendationSerializer, Recommendation.objects.all())
+        self.logger.log_test_result(
+            "test_values_serializer_matches_model_serializers",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_list_and_retrieve_use_values_path(self):
+        self.logger.log_test_start("test_list_and_retrieve_use_values_path")
+        start_time = time.time()
+        """Test plan and recommendation endpoints return serializer output."""
+        self.authenticate_user()
+        response = self.client.get(reverse('insuranceplan-detail', kwargs={'pk': self.plan.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), InsurancePlanSerializer(self.plan).data)
+
+        response = self.client.get(reverse('recommendation-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['results'][0]['insurance_plan']['name'], self.plan.name)
+
+        response = self.client.get(reverse('insuranceplan-detail', kwargs={'pk': 0}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.logger.log_test_result(
+            "test_list_and_retrieve_use_values_path",
+            "PASS",
+            time.time() - start_time
+        )
+
+@override_settings(GEMINI_API_KEY='')
+class GeminiFallbackTests(InsuranceBaseTestCase):
+    """Test cases for the Gemini circuit breaker and rule-based fallback."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        breaker.reset()
+        self.addCleanup(breaker.reset)
+
+    def test_circuit_breaker_opens_and_recovers(self):
+        self.logger.log_test_start("test_circuit_breaker_opens_and_recovers")
+        start_time = time.time()
+        """Test the breaker opens on failures and slow calls, then half-opens."""
+        circuit = CircuitBreaker(failure_threshold=2, slow_call_seconds=1.0, reset_seconds=0.05)
+        circuit.record(False, 0.1)
+        self.assertTrue(circuit.allow())
+        circuit.record(True, 5.0)  # Too slow, counts as a failure
+        self.assertFalse(circuit.allow())
+
+        time.sleep(0.06)
+        self.assertTrue(circuit.allow())  # Single trial call
+        self.assertFalse(circuit.allow())
+        circuit.record(True, 0.1)
+        self.assertEqual(circuit.state, CircuitBreaker.CLOSED)
+        self.assertTrue(circuit.allow())
+        self.logger.log_test_result(
+            "test_circuit_breaker_opens_and_recovers",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_ai_recommendation_fallback_is_not_cached(self):
+        self.logger.log_test_start("test_ai_recommendation_fallback_is_not_cached")
+        start_time = time.time()
+        """Test a failed Gemini call answers from the rule engine without caching."""
+        self.authenticate_user()
+        url = reverse('user-get-ai-recommendation', kwargs={'pk': self.user.pk})
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['fallback'])
+        self.assertFalse(response.data['cached'])
+        self.assertIn(self.plan.name, response.data['recommendation'])
+        self.assertIsNone(cache.get(f'user_recommendation_{self.user.id}'))
+        self.logger.log_test_result(
+            "test_ai_recommendation_fallback_is_not_cached",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_open_circuit_serves_fallback_analysis(self):
+        self.logger.log_test_start("test_open_circuit_serves_fallback_analysis")
+        start_time = time.time()
+        """Test plan analysis falls back while the circuit is open."""
+        for _ in range(breaker.failure_threshold):
+            breaker.record(False, 0.0)
+        self.assertFalse(breaker.allow())
+
+        self.authenticate_user()
+        response = self.client.get(reverse('insuranceplan-analyze', kwargs={'pk': self.plan.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['fallback'])
+        self.assertIn(self.plan.name, response.data['analysis'])
+        self.assertIsNone(cache.get(f'plan_analysis_{self.plan.id}'))
+        self.logger.log_test_result(
+            "test_open_circuit_serves_fallback_analysis",
+            "PASS",
+            time.time() - start_time
+        )
+
+@override_settings(GEMINI_API_KEY='')
+class PlanAnalysisWarmerTests(InsuranceBaseTestCase):
+    """Test cases for pre-generated plan analyses."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        breaker.reset()
+        self.addCleanup(breaker.reset)
+
+    def test_due_plans(self):
+        self.logger.log_test_start("test_due_plans")
+        start_time = time.time()
+        """Test analyses are due when missing, outdated or close to expiry."""
+        self.assertEqual([plan.id for plan in due_plans()], [self.plan.id])
+        store_analysis(self.plan, 'Cached analysis')
+        self.assertEqual(due_plans(), [])
+
+        self.plan.monthly_premium = Decimal('450.00')
+        self.plan.save()
+        self.assertEqual([plan.id for plan in due_plans()], [self.plan.id])
+
+        store_analysis(self.plan, 'Cached analysis')
+        meta_key = f'plan_analysis_meta_{self.plan.id}'
+        meta = cache.get(meta_key)
+        meta['expires_at'] = time.time() + ANALYSIS_TTL * 0.1
+        cache.set(meta_key, meta)
+        self.assertEqual([plan.id for plan in due_plans()], [self.plan.id])
+        self.logger.log_test_result(
+            "test_due_plans",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_analyze_serves_warmed_analysis(self):
+        self.logger.log_test_start("test_analyze_serves_warmed_analysis")
+        start_time = time.time()
+        """Test analyze is a cache hit once the plan is warmed."""
+        store_analysis(self.plan, 'Cached analysis')
+        self.authenticate_user()
+        response = self.client.get(reverse('insuranceplan-analyze', kwargs={'pk': self.plan.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'analysis': 'Cached analysis', 'cached': True})
+        self.logger.log_test_result(
+            "test_analyze_serves_warmed_analysis",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_warmer_skips_failed_analyses(self):
+        self.logger.log_test_start("test_warmer_skips_failed_analyses")
+        start_time = time.time()
+        """Test failed generations are reported, not cached, and stay due."""
+        out = StringIO()
+        err = StringIO()
+        call_command('warm_plan_analyses', '--once', stdout=out, stderr=err)
+        self.assertIn('Warmed 0 of 1 due plans (1 failed)', out.getvalue())
+        self.assertIn(f'Plan {self.plan.id}:', err.getvalue())
+        self.assertIsNone(get_analysis(self.plan.id))
+        self.assertEqual(len(due_plans()), 1)
+        self.logger.log_test_result(
+            "test_warmer_skips_failed_analyses",
+            "PASS",
+            time.time() - start_time
+        )
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for smtplib and records each message."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 sink ready')
+        data = None
+        for line in self.rfile:
+            if data is not None:
+                if line == b'.\r\n':
+                    self.server.messages.append(b''.join(data).decode())
+                    data = None
+                    self.reply('250 queued')
+                else:
+                    data.append(line)
+                continue
+            command = line[:4].upper()
+            if command == b'DATA':
+                data = []
+                self.reply('354 go ahead')
+            elif command == b'RCPT' and self.server.reject:
+                self.reply('550 mailbox unavailable')
+            elif command == b'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Local SMTP server that keeps messages instead of delivering them."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPSinkHandler)
+        self.messages = []
+        self.connections = 0
+        self.reject = False
+
+
+class MailQueueTests(InsuranceBaseTestCase):
+    """Test cases for the outbound mail queue and its worker."""
+
+    def setUp(self):
+        super().setUp()
+        ratelimit.limiter.reset()
+        self.sink = SMTPSink()
+        threading.Thread(target=self.sink.serve_forever, daemon=True).start()
+        self.addCleanup(self.sink.server_close)
+        self.addCleanup(self.sink.shutdown)
+        smtp = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=self.sink.server_address[1],
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER='',
+            EMAIL_HOST_PASSWORD=''
+        )
+        smtp.enable()
+        self.addCleanup(smtp.disable)
+
+    def test_password_reset_is_queued(self):
+        self.logger.log_test_start("test_password_reset_is_queued")
+        start_time = time.time()
+        """Test reset requests only queue a row, for known and unknown addresses alike."""
+        factory = APIRequestFactory()
+        for email in ('test@example.com', 'nobody@example.com'):
+            response = request_password_reset(
+                factory.post('/password-reset/', {'email': email}, format='json')
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(OutboundEmail.objects.filter(kind='password_reset').count(), 2)
+        self.assertEqual(self.sink.connections, 0)
+        self.logger.log_test_result(
+            "test_password_reset_is_queued",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_worker_sends_batch_over_one_connection(self):
+        self.logger.log_test_start("test_worker_sends_batch_over_one_connection")
+        start_time = time.time()
+        """Test the worker delivers the queue over one SMTP connection and empties it."""
+        for i in range(3):
+            enqueue(f'user{i}@example.com', 'Plan update', 'Your plan changed.')
+        OutboundEmail.objects.create(kind='password_reset', to='test@example.com')
+        OutboundEmail.objects.create(kind='password_reset', to='nobody@example.com')
+
+        out = StringIO()
+        call_command('send_queued_mail', '--once', stdout=out)
+        self.assertIn('Sent 4 of 5 emails (0 failed)', out.getvalue())
+        self.assertEqual(self.sink.connections, 1)
+        self.assertEqual(len(self.sink.messages), 4)
+        self.assertTrue(any('reset-password?uid=' in message for message in self.sink.messages))
+        self.assertFalse(OutboundEmail.objects.exists())
+        self.logger.log_test_result(
+            "test_worker_sends_batch_over_one_connection",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_failed_sends_are_retried_later(self):
+        self.logger.log_test_start("test_failed_sends_are_retried_later")
+        start_time = time.time()
+        """Test rejected emails stay queued with a backoff instead of being lost."""
+        self.sink.reject = True
+        enqueue('user@example.com', 'Plan update', 'Your plan changed.')
+
+        call_command('send_queued_mail', '--once', stdout=StringIO())
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('SMTPRecipientsRefused', email.last_error)
+        self.assertGreater(email.next_attempt_at, email.created_at)
+        self.assertEqual(self.sink.messages, [])
+        self.logger.log_test_result(
+            "test_failed_sends_are_retried_later",
+            "PASS",
+            time.time() - start_time
+        )
+
+class DashboardTests(InsuranceBaseTestCase):
+    """Test cases for the one-request dashboard."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.url = reverse('dashboard-list')
+        Recommendation.objects.create(user=self.user, insurance_plan=self.plan, recommendation_score=0.9)
+        comparison = PlanComparison.objects.create(user=self.user, comparison_name='Shortlist')
+        comparison.plans.add(self.plan)
+        UserDashboardPreference.objects.create(
+            user=self.user,
+            widgets_order='recommendations,comparisons,feedback,recent_plans,unknown'
+        )
+
+    def test_dashboard_in_one_request(self):
+        self.logger.log_test_start("test_dashboard_in_one_request")
+        start_time = time.time()
+        """Test the user, preferences and every listed widget come back together."""
+        self.authenticate_user()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['username'], 'testuser')
+        self.assertEqual(response.data['widgets_order'],
+                         ['recommendations', 'comparisons', 'feedback', 'recent_plans'])
+        widgets = response.data['widgets']
+        self.assertEqual(widgets['recommendations'][0]['insurance_plan']['name'], 'Test Plan')
+        self.assertEqual(widgets['comparisons'][0]['plans'][0]['id'], self.plan.pk)
+        self.assertEqual(widgets['feedback'][0]['comments'], 'Great service!')
+        self.assertEqual(widgets['recent_plans'][0]['id'], self.plan.pk)
+        self.assertEqual(parse_widgets_order("['feedback', 'recent_plans']"), ['feedback', 'recent_plans'])
+        self.logger.log_test_result(
+            "test_dashboard_in_one_request",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_widgets_cached_until_changed(self):
+        self.logger.log_test_start("test_widgets_cached_until_changed")
+        start_time = time.time()
+        """Test a warm dashboard runs no queries and changes show up on the next request."""
+        self.authenticate_user()
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data['widgets']['feedback']), 1)
+
+        Feedback.objects.create(user=self.user, rating=2, comments='Claims were slow')
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['widgets']['feedback'][0]['comments'], 'Claims were slow')
+
+        self.plan.name = 'Renamed Plan'
+        self.plan.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['widgets']['recommendations'][0]['insurance_plan']['name'],
+                         'Renamed Plan')
+        self.logger.log_test_result(
+            "test_widgets_cached_until_changed",
+            "PASS",
+            time.time() - start_time
+        )
+
+class ProfileCacheTests(InsuranceBaseTestCase):
+    """Test cases for the write-through profile and preference cache."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.authenticate_user()
+
+    def test_preferences_upserted_and_cached(self):
+        self.logger.log_test_start("test_preferences_upserted_and_cached")
+        start_time = time.time()
+        """Test saving preferences updates one row in place and reads hit the cache."""
+        url = reverse('preference-list')
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.client.post(url, {'default_view': 'list', 'widgets_order': 'feedback'}, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            second = self.client.post(url, {'default_view': 'compact', 'widgets_order': 'feedback'}, format='json')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(UserDashboardPreference.objects.filter(user=self.user).count(), 1)
+
+        self.client.get(reverse('user-me'))  # Warms the authenticated user
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('preference-current-preferences'))
+        self.assertEqual(response.data['default_view'], 'compact')
+        self.logger.log_test_result(
+            "test_preferences_upserted_and_cached",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_profile_written_through(self):
+        self.logger.log_test_start("test_profile_written_through")
+        start_time = time.time()
+        """Test /users/me/ is served from the cache and reflects saves without a query."""
+        url = reverse('user-me')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data['budget'], '1000.00')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.budget = Decimal('1500.00')
+            self.user.save()
+        # Only authentication reloads the user; the profile itself was written through
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['budget'], '1500.00')
+        self.logger.log_test_result(
+            "test_profile_written_through",
+            "PASS",
+            time.time() - start_time
+        )
+
+class PlanComparisonEngineTests(InsuranceBaseTestCase):
+    """Test cases for detailed plan comparisons."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.family_plan = InsurancePlan.objects.create(
+            name='Family Plan',
+            plan_type='family',
+            provider='Test Insurance Co',
+            description='A family plan',
+            coverage_details='Basic coverage details, maternity and dental',
+            eligibility_criteria='Families',
+            monthly_premium=Decimal('700.00'),
+            deductible=Decimal('500.00'),
+            copay=None,
+            max_coverage=Decimal('250000.00'),
+            network_hospitals='Hospital A, Hospital C'
+        )
+        self.comparison = PlanComparison.objects.create(user=self.user, comparison_name='Shortlist')
+        self.comparison.plans.add(self.plan, self.family_plan)
+        self.url = reverse('comparison-detailed-comparison', kwargs={'pk': self.comparison.pk})
+
+    def test_detailed_comparison(self):
+        self.logger.log_test_start("test_detailed_comparison")
+        start_time = time.time()
+        """Test numeric deltas, term differences, projections and scores are filled in."""
+        self.authenticate_user()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        differences = response.data['differences']
+        self.assertEqual(differences['price_range'], {'min': 500.0, 'max': 700.0})
+        self.assertEqual(differences['numeric']['deductible']['best_plan_ids'], [self.family_plan.pk])
+        self.assertEqual(differences['coverage_differences']['common'], ['basic coverage details'])
+        self.assertEqual(differences['coverage_differences']['unique'][self.family_plan.pk],
+                         ['dental', 'maternity'])
+        self.assertEqual(differences['feature_differences']['unique'][self.plan.pk], ['hospital b'])
+
+        metrics = response.data['plan_metrics']
+        self.assertEqual(metrics[self.family_plan.pk]['deltas']['monthly_premium'], 200.0)
+        self.assertIsNone(metrics[self.family_plan.pk]['deltas']['copay'])
+        self.assertEqual(metrics[self.plan.pk]['projected_yearly_cost']['low_use'], 6040.0)
+        # The family plan suits a family of two despite the higher premium
+        self.assertEqual(response.data['recommendation']['recommended_plan']['id'], self.family_plan.pk)
+        self.logger.log_test_result(
+            "test_detailed_comparison",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_comparison_memoized_until_plans_change(self):
+        self.logger.log_test_start("test_comparison_memoized_until_plans_change")
+        start_time = time.time()
+        """Test reopening a comparison reuses the result until a plan or the profile changes."""
+        self.authenticate_user()
+        with mock.patch.object(comparison_engine, 'build_comparison',
+                               wraps=comparison_engine.build_comparison) as build:
+            self.client.get(self.url)
+            self.client.get(self.url)
+            self.assertEqual(build.call_count, 1)
+
+            self.family_plan.monthly_premium = Decimal('650.00')
+            self.family_plan.save()
+            response = self.client.get(self.url)
+            self.assertEqual(build.call_count, 2)
+            self.assertEqual(response.data['differences']['price_range']['max'], 650.0)
+
+            self.user.family_size = 1
+            self.user.save()
+            self.client.get(self.url)
+            self.assertEqual(build.call_count, 3)
+        self.logger.log_test_result(
+            "test_comparison_memoized_until_plans_change",
+            "PASS",
+            time.time() - start_time
+        )
+
+class LargeTableAdminTests(InsuranceBaseTestCase):
+    """Test cases for admin changelists over large tables."""
+
+    def test_comparison_changelist_counts_plans_in_one_query(self):
+        self.logger.log_test_start("test_comparison_changelist_counts_plans_in_one_query")
+        start_time = time.time()
+        """Test plan counts come from the list query instead of one query per row."""
+        for i in range(5):
+            PlanComparison.objects.create(user=self.user, comparison_name=f'Shortlist {i}').plans.add(self.plan)
+        self.client.force_login(self.admin_user)
+        url = reverse('admin:insurance_plancomparison_changelist')
+        self.client.get(url)
+        # Session, user, count, page and the two date hierarchy bounds
+        with self.assertNumQueries(6):
+            response = self.client.get(url)
+        self.assertContains(response, '1 plan<', count=5)
+
+        response = self.client.get(reverse('admin:insurance_feedback_changelist') + '?q=testu')
+        self.assertEqual(response.context['cl'].result_count, 1)
+        self.logger.log_test_result(
+            "test_comparison_changelist_counts_plans_in_one_query",
+            "PASS",
+            time.time() - start_time
+        )
+
+
+class PartitionArchiveTests(InsuranceBaseTestCase):
+    """Test cases for the Feedback and Recommendation retention policy."""
+
+    def setUp(self):
+        super().setUp()
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        self.old_month = add_months(month_start(timezone.now()), -14)
+        self.old_feedback = Feedback.objects.create(user=self.user, rating=2, comments='Old news')
+        Feedback.objects.filter(pk=self.old_feedback.pk).update(created_at=self.old_month + timedelta(days=3))
+
+    def test_cold_months_are_archived_and_dropped(self):
+        self.logger.log_test_start("test_cold_months_are_archived_and_dropped")
+        start_time = time.time()
+        """Test months past retention move to archive files that query_archive reads back."""
+        self.authenticate_user()
+        response = self.client.get(reverse('feedback-list'))
+        self.assertEqual([row['id'] for row in response.data['results']], [self.feedback.id])
+
+        out = StringIO()
+        call_command('archive_partitions', '--output-dir', self.archive_dir, stdout=out)
+        self.assertIn('archived 1 rows', out.getvalue())
+        self.assertFalse(Feedback.objects.filter(pk=self.old_feedback.pk).exists())
+        self.assertTrue(Feedback.objects.filter(pk=self.feedback.pk).exists())
+
+        [(month, path)] = archived_months(self.archive_dir, Feedback)
+        self.assertEqual(month, f'{self.old_month:%Y-%m}')
+        [row] = read_archive(path)
+        self.assertEqual((row['id'], row['rating'], row['comments']), (self.old_feedback.id, 2, 'Old news'))
+
+        out = StringIO()
+        call_command('query_archive', 'insurance_feedback', '--archive-dir', self.archive_dir,
+                     '--columns', 'id,comments', '--where', 'rating=2', stdout=out)
+        self.assertEqual(out.getvalue().splitlines(), ['id,comments', f'{self.old_feedback.id},Old news'])
+        self.logger.log_test_result(
+            "test_cold_months_are_archived_and_dropped",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_dry_run_keeps_rows(self):
+        self.logger.log_test_start("test_dry_run_keeps_rows")
+        start_time = time.time()
+        """Test a dry run only lists the months it would archive."""
+        out = StringIO()
+        call_command('archive_partitions', '--output-dir', self.archive_dir, '--dry-run', stdout=out)
+        self.assertIn(f'insurance_feedback {self.old_month:%Y-%m}: 1 rows', out.getvalue())
+        self.assertTrue(Feedback.objects.filter(pk=self.old_feedback.pk).exists())
+        self.assertEqual(archived_months(self.archive_dir, Feedback), [])
+        self.logger.log_test_result(
+            "test_dry_run_keeps_rows",
+            "PASS",
+            time.time() - start_time
+        )
+
+
+class ExportTests(InsuranceBaseTestCase):
+    """Test cases for the streaming staff exports."""
+
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_feedback_export_streams_csv_and_jsonl(self):
+        self.logger.log_test_start("test_feedback_export_streams_csv_and_jsonl")
+        start_time = time.time()
+        """Test staff can export feedback in both formats, bounded by creation date."""
+        old = Feedback.objects.create(user=self.user, rating=1, comments='Slow, "very" slow')
+        Feedback.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=40))
+        self.authenticate_user(self.admin_user)
+        url = reverse('feedback-export')
+
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(StringIO(self.read(response))))
+        self.assertEqual([int(row['id']) for row in rows], [self.feedback.id, old.id])
+        self.assertEqual(rows[1]['comments'], 'Slow, "very" slow')
+
+        since = (timezone.now() - timedelta(days=7)).date().isoformat()
+        response = self.client.get(url, {'output': 'jsonl', 'created_after': since})
+        lines = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([line['id'] for line in lines], [self.feedback.id])
+        self.assertEqual(lines[0]['rating'], 4)
+
+        self.assertEqual(self.client.get(url, {'created_before': 'yesterday'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'output': 'xml'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.authenticate_user()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.logger.log_test_result(
+            "test_feedback_export_streams_csv_and_jsonl",
+            "PASS",
+            time.time() - start_time
+        )
+
+    def test_comparison_export_reads_plans_per_chunk(self):
+        self.logger.log_test_start("test_comparison_export_reads_plans_per_chunk")
+        start_time = time.time()
+        """Test comparison rows carry their plan ids, fetched once per chunk."""
+        other = InsurancePlan.objects.create(
+            name='Other Plan', plan_type='family', provider='Other Co', description='Other',
+            coverage_details='Family', eligibility_criteria='All', monthly_premium=Decimal('300.00'),
+            deductible=Decimal('500.00')
+        )
+        for i in range(5):
+            PlanComparison.objects.create(user=self.user, comparison_name=f'Shortlist {i}').plans.add(self.plan, other)
+        rows = PlanComparison.objects.order_by('pk')
+        with self.assertNumQueries(2):
+            chunks = list(export_chunks(COMPARISON_EXPORT, rows, chunk_size=10))
+        with self.assertNumQueries(4):
+            chunks = list(export_chunks(COMPARISON_EXPORT, rows, chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(chunks[0][0]['plan_ids'], [self.plan.id, other.id])
+
+        self.authenticate_user(self.admin_user)
+        response = self.client.get(reverse('comparison-export'))
+        rows = list(csv.DictReader(StringIO(self.read(response))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['plan_ids'], f'{self.plan.id} {other.id}')
+        self.logger.log_test_result(
+            "test_comparison_export_reads_plans_per_chunk",
+            "PASS",
+            time.time() - start_time
+        )
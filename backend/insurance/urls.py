@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from . import views
+from backend.async_api import async_routes_enabled
+from . import views, async_views
 
 # Create a router and register our viewsets with it
 router = DefaultRouter()
@@ -11,6 +12,7 @@ router.register(r'recommendations', views.RecommendationViewSet, basename='recom
 router.register(r'feedback', views.FeedbackViewSet, basename='feedback')
 router.register(r'comparisons', views.PlanComparisonViewSet, basename='comparison')
 router.register(r'preferences', views.UserDashboardPreferenceViewSet, basename='preference')
+router.register(r'dashboard', views.DashboardViewSet, basename='dashboard')
 
 # The API URLs are now determined automatically by the router
 urlpatterns = [
@@ -18,3 +20,12 @@ urlpatterns = [
     path('auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ]
+
+if async_routes_enabled():
+    # Served ahead of the router so LLM calls do not hold a worker thread
+    urlpatterns = [
+        path('users/<int:pk>/get_ai_recommendation/', async_views.get_ai_recommendation,
+             name='user-get-ai-recommendation'),
+        path('plans/<int:pk>/analyze/', async_views.analyze_plan, name='insuranceplan-analyze'),
+        path('plans/compare/', async_views.compare_plans, name='insuranceplan-compare'),
+    ] + urlpatterns
@@ -1,20 +1,120 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.authentication import SessionAuthentication
 from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
 from django.core.cache import cache
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from typing import Any, Dict, List
 from decimal import Decimal
 
-from .models import User, InsurancePlan, Feedback, PlanComparison, UserDashboardPreference
+from .models import (User, InsurancePlan, Feedback, PlanComparison, UserDashboardPreference,
+                     Recommendation)
 from .serializers import (UserSerializer, InsurancePlanSerializer, FeedbackSerializer,
-                        PlanComparisonSerializer, UserDashboardPreferenceSerializer)
-from gemini_client import get_insurance_recommendation, analyze_insurance_plan
+                        PlanComparisonSerializer, UserDashboardPreferenceSerializer,
+                        RecommendationSerializer, ValuesSerializer)
+from .catalog import (PlanRecord, catalog_etag, catalog_last_modified,
+                      get_catalog_snapshot)
+from .analysis_cache import get_analysis, plan_data, store_analysis
+from .comparison import MAX_COMPARED_PLANS, compare_plans
+from .dashboard import assemble
+from .exports import COMPARISON_EXPORT, FEEDBACK_EXPORT, RECOMMENDATION_EXPORT, ExportSpec, export_response
+from .partitions import recent
+from .profile_cache import get_preferences, get_profile, save_preferences
+from backend.authentication import ProfileClaimsAuthentication
+from gemini_client import (LLMUnavailable, get_insurance_recommendation, analyze_insurance_plan,
+                           fallback_recommendation, fallback_analysis)
 
 from rest_framework.permissions import AllowAny
 
+class ValuesReadMixin:
+    """Serve list and retrieve from `.values()` rows instead of model instances.
+
+    Output matches `serializer_class` exactly. Only for viewsets without
+    object-level permissions, since no instance is built for `retrieve`.
+    """
+    values_serializer: ValuesSerializer = None
+
+    def list(self, request, *args, **kwargs):
+        rows = self.values_serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.values_serializer.serialize(page))
+        return Response(self.values_serializer.serialize(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        row = get_object_or_404(
+            self.values_serializer.values(queryset),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        return Response(self.values_serializer.to_representation(row))
+
+
+class ExportMixin:
+    """Staff-only `export` action streaming every row as CSV or JSON Lines (see insurance.exports)."""
+    export_spec: ExportSpec = None
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        """Stream rows; ?output=csv|jsonl, optional created_after and created_before bounds."""
+        try:
+            return export_response(self.export_spec, request.query_params)
+        except ValueError as e:
+            raise ValidationError({'error': str(e)})
+
+def calculate_suitability_score(plan: PlanRecord, user: User) -> float:
+    """Calculate how suitable a plan is for a user (0-1 score)."""
+    score = 1.0
+    
+    # Budget factor (0-0.4)
+    budget_ratio = float(plan.monthly_premium) / float(user.budget)
+    score *= 0.4 * (1 - budget_ratio) + 0.6
+    
+    coverage = plan.coverage_lower
+    
+    # Age factor (0-0.3)
+    if user.age > 60 and 'senior' in coverage:
+        score *= 1.3
+    elif user.age < 30 and 'young' in coverage:
+        score *= 1.3
+    
+    # Family size factor (0-0.3)
+    if user.family_size > 1 and 'family' in coverage:
+        score *= 1.3
+    elif user.family_size == 1 and 'individual' in coverage:
+        score *= 1.3
+    
+    return min(1.0, score)
+
+def rank_plans(user: User, limit: int = 5) -> List[Dict[str, Any]]:
+    """Score the plans within the user's budget, best match first."""
+    recommendations = [
+        {
+            'id': plan.id,
+            'name': plan.name,
+            'monthly_premium': float(plan.monthly_premium),
+            'coverage_details': plan.coverage_details,
+            'suitability_score': calculate_suitability_score(plan, user)
+        }
+        for plan in get_catalog_snapshot().within_budget(user.budget)
+    ]
+    recommendations.sort(key=lambda x: x['suitability_score'], reverse=True)
+    return recommendations[:limit]
+
+def recommendation_fallback(user: User, user_data: Dict[str, Any]) -> str:
+    """Rule-based stand-in for the AI recommendation, built from `rank_plans`."""
+    plans = [
+        {'name': plan['name'], 'price': plan['monthly_premium'],
+         'suitability_score': plan['suitability_score']}
+        for plan in rank_plans(user)
+    ]
+    return fallback_recommendation(user_data, plans)
+
 class UserViewSet(viewsets.ModelViewSet):
     """ViewSet for User registration and management."""
     queryset = User.objects.all()
@@ -27,11 +127,11 @@ class UserViewSet(viewsets.ModelViewSet):
             return [AllowAny()]
         return super().get_permissions()
 
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'],
+            authentication_classes=[ProfileClaimsAuthentication, SessionAuthentication])
     def me(self, request):
-        """Get the current user's details."""
-        serializer = self.get_serializer(request.user)
-        return Response(serializer.data)
+        """Get the current user's details from the profile cache."""
+        return Response(get_profile(request.user.pk))
     
     @action(detail=True, methods=['post'])
     def get_ai_recommendation(self, request, pk=None):
@@ -56,10 +156,18 @@ class UserViewSet(viewsets.ModelViewSet):
                 'age': user.age,
                 'budget': float(user.budget),
                 'family_size': user.family_size,
-                'medical_history': user.medical_history or 'No medical history provided'
+                'medical_history': user.prompt_medical_history or 'No medical history provided'
             }
             
-            recommendation = get_insurance_recommendation(user_data)
+            try:
+                recommendation = get_insurance_recommendation(user_data, user_id=user.id)
+            except LLMUnavailable:
+                # Answer from the rule engine and leave the cache alone
+                return Response({
+                    'recommendation': recommendation_fallback(user, user_data),
+                    'cached': False,
+                    'fallback': True
+                })
             
             # Cache the recommendation for 1 hour
             cache.set(cache_key, recommendation, 3600)
@@ -86,32 +194,15 @@ class UserViewSet(viewsets.ModelViewSet):
             if not user.budget:
                 raise ValidationError('Please set your budget to receive plan recommendations.')
             
-            # Get all active plans within user's budget
-            plans = InsurancePlan.objects.filter(
-                is_active=True,
-                monthly_premium__lte=user.budget
-            ).order_by('monthly_premium')
+            # Rank plans within user's budget from the in-process catalog
+            recommendations = rank_plans(user)
             
-            if not plans:
+            if not recommendations:
                 return Response({
                     'message': 'No plans found within your budget. Consider adjusting your budget.'
                 })
             
-            recommendations = []
-            for plan in plans:
-                plan_data = {
-                    'id': plan.id,
-                    'name': plan.name,
-                    'monthly_premium': float(plan.monthly_premium),
-                    'coverage_details': plan.coverage_details,
-                    'suitability_score': self._calculate_suitability_score(plan, user)
-                }
-                recommendations.append(plan_data)
-            
-            # Sort by suitability score
-            recommendations.sort(key=lambda x: x['suitability_score'], reverse=True)
-            
-            return Response({'recommendations': recommendations[:5]})
+            return Response({'recommendations': recommendations})
             
         except ValidationError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -120,58 +211,47 @@ class UserViewSet(viewsets.ModelViewSet):
                 {'error': 'Failed to get recommendations. Please try again.'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-    
-    def _calculate_suitability_score(self, plan: InsurancePlan, user: User) -> float:
-        """Calculate how suitable a plan is for a user (0-1 score)."""
-        score = 1.0
-        
-        # Budget factor (0-0.4)
-        budget_ratio = float(plan.monthly_premium) / float(user.budget)
-        score *= 0.4 * (1 - budget_ratio) + 0.6
-        
-        # Age factor (0-0.3)
-        if user.age > 60 and 'senior' in plan.coverage_details.lower():
-            score *= 1.3
-        elif user.age < 30 and 'young' in plan.coverage_details.lower():
-            score *= 1.3
-        
-        # Family size factor (0-0.3)
-        if user.family_size > 1 and 'family' in plan.coverage_details.lower():
-            score *= 1.3
-        elif user.family_size == 1 and 'individual' in plan.coverage_details.lower():
-            score *= 1.3
-        
-        return min(1.0, score)
 
-class InsurancePlanViewSet(viewsets.ModelViewSet):
+class InsurancePlanViewSet(ValuesReadMixin, viewsets.ModelViewSet):
     """ViewSet for insurance plan management."""
     queryset = InsurancePlan.objects.all()
     serializer_class = InsurancePlanSerializer
+    values_serializer = ValuesSerializer(InsurancePlanSerializer)
+    authentication_classes = [ProfileClaimsAuthentication, SessionAuthentication]
     permission_classes = [IsAuthenticated]
     
+    @method_decorator(condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified))
+    def list(self, request, *args, **kwargs):
+        """List plans, answering 304 when the client's copy is current."""
+        return super().list(request, *args, **kwargs)
+    
+    @method_decorator(condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified))
+    def retrieve(self, request, *args, **kwargs):
+        """Get plan details, answering 304 when the client's copy is current."""
+        return super().retrieve(request, *args, **kwargs)
+    
     @action(detail=True, methods=['get'])
     def analyze(self, request, pk=None):
         """Get AI analysis of an insurance plan."""
         try:
             plan = self.get_object()
             
-            # Check cache first
-            cache_key = f'plan_analysis_{plan.id}'
-            cached_analysis = cache.get(cache_key)
+            # Normally pre-generated by the warm_plan_analyses worker
+            cached_analysis = get_analysis(plan.id)
             if cached_analysis:
                 return Response({'analysis': cached_analysis, 'cached': True})
             
-            plan_data = {
-                'name': plan.name,
-                'coverage': plan.coverage_details,
-                'price': float(plan.monthly_premium),
-                'conditions': plan.eligibility_criteria
-            }
-            
-            analysis = analyze_insurance_plan(plan_data)
+            data = plan_data(plan)
+            try:
+                analysis = analyze_insurance_plan(data, user_id=request.user.id)
+            except LLMUnavailable:
+                return Response({
+                    'analysis': fallback_analysis(data),
+                    'cached': False,
+                    'fallback': True
+                })
             
-            # Cache the analysis for 24 hours since plan details don't change often
-            cache.set(cache_key, analysis, 86400)
+            store_analysis(plan, analysis)
             
             return Response({
                 'analysis': analysis,
@@ -190,11 +270,13 @@ class InsurancePlanViewSet(viewsets.ModelViewSet):
         try:
             plan = self.get_object()
             price_range = Decimal('100.00')
+            low = plan.monthly_premium - price_range
+            high = plan.monthly_premium + price_range
             
-            similar_plans = InsurancePlan.objects.filter(
-                monthly_premium__gte=plan.monthly_premium - price_range,
-                monthly_premium__lte=plan.monthly_premium + price_range
-            ).exclude(id=plan.id)[:5]
+            similar_plans = [
+                other for other in get_catalog_snapshot().plans
+                if other.id != plan.id and low <= other.monthly_premium <= high
+            ][:5]
             
             serializer = self.get_serializer(similar_plans, many=True)
             return Response(serializer.data)
@@ -215,17 +297,18 @@ class InsurancePlanViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        plans = InsurancePlan.objects.filter(id__in=plan_ids)
+        plans = get_catalog_snapshot().get_many(plan_ids)
         comparisons = []
         
         for plan in plans:
-            plan_data = {
-                'name': plan.name,
-                'coverage': plan.coverage,
-                'price': float(plan.price),
-                'conditions': plan.conditions
-            }
-            analysis = analyze_insurance_plan(plan_data)
+            analysis = get_analysis(plan.id)
+            if not analysis:
+                data = plan_data(plan)
+                try:
+                    analysis = analyze_insurance_plan(data, user_id=request.user.id)
+                    store_analysis(plan, analysis)
+                except LLMUnavailable:
+                    analysis = fallback_analysis(data)
             comparisons.append({
                 'plan': InsurancePlanSerializer(plan).data,
                 'analysis': analysis
@@ -233,24 +316,42 @@ class InsurancePlanViewSet(viewsets.ModelViewSet):
         
         return Response(comparisons)
 
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(ExportMixin, ValuesReadMixin, viewsets.ModelViewSet):
     """ViewSet for managing user feedback."""
+    export_spec = FEEDBACK_EXPORT
     serializer_class = FeedbackSerializer
+    values_serializer = ValuesSerializer(FeedbackSerializer)
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
         """Filter queryset based on user permissions."""
+        # Older rows are archived (insurance.partitions); bounding by date prunes partitions
         if self.request.user.is_staff:
-            return Feedback.objects.all()
-        return Feedback.objects.filter(user=self.request.user).order_by('-created_at')
+            return recent(Feedback.objects.all())
+        return recent(Feedback.objects.filter(user=self.request.user)).order_by('-created_at')
     
     def perform_create(self, serializer):
         """Associate feedback with the current user."""
         serializer.save(user=self.request.user)
 
 
-class PlanComparisonViewSet(viewsets.ModelViewSet):
+class RecommendationViewSet(ExportMixin, ValuesReadMixin, viewsets.ReadOnlyModelViewSet):
+    """ViewSet for viewing stored plan recommendations."""
+    export_spec = RECOMMENDATION_EXPORT
+    serializer_class = RecommendationSerializer
+    values_serializer = ValuesSerializer(RecommendationSerializer)
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        """Filter queryset based on user permissions."""
+        if self.request.user.is_staff:
+            return recent(Recommendation.objects.all())
+        return recent(Recommendation.objects.filter(user=self.request.user))
+
+
+class PlanComparisonViewSet(ExportMixin, viewsets.ModelViewSet):
     """ViewSet for managing plan comparisons."""
+    export_spec = COMPARISON_EXPORT
     serializer_class = PlanComparisonSerializer
     permission_classes = [IsAuthenticated]
     
@@ -264,76 +365,36 @@ class PlanComparisonViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'])
     def detailed_comparison(self, request, pk=None):
-        """Get a detailed comparison of the plans."""
+        """Get a detailed comparison of the plans, memoized per plan set and user profile."""
         comparison = self.get_object()
-        plans = comparison.plans.all()
+        plan_ids = comparison.plans.values_list('id', flat=True)
+        catalog = get_catalog_snapshot()
+        plans = catalog.get_many(plan_ids)
         
         if len(plans) < 2:
             return Response(
                 {'error': 'Need at least 2 plans to compare'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        if len(plans) > MAX_COMPARED_PLANS:
+            return Response(
+                {'error': f'Cannot compare more than {MAX_COMPARED_PLANS} plans'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
+        result = compare_plans(plans, request.user)
         comparison_data = {
             'name': comparison.comparison_name,
             'plans': InsurancePlanSerializer(plans, many=True).data,
-            'differences': self._get_plan_differences(plans),
-            'recommendation': self._get_comparison_recommendation(plans, request.user)
+            'differences': result['differences'],
+            'plan_metrics': result['plan_metrics'],
+            'recommendation': {
+                'recommended_plan': InsurancePlanSerializer(catalog.get(result['recommended_plan_id'])).data,
+                'score': result['score']
+            }
         }
         
         return Response(comparison_data)
-    
-    def _get_plan_differences(self, plans):
-        """Analyze the differences between plans."""
-        differences = {
-            'price_range': {
-                'min': float(min(p.monthly_premium for p in plans)),
-                'max': float(max(p.monthly_premium for p in plans))
-            },
-            'coverage_differences': [],
-            'feature_differences': []
-        }
-        
-        # Add more detailed comparison logic here
-        return differences
-    
-    def _get_comparison_recommendation(self, plans, user):
-        """Get a recommendation based on compared plans."""
-        best_plan = None
-        best_score = 0
-        
-        for plan in plans:
-            score = self._calculate_plan_score(plan, user)
-            if score > best_score:
-                best_score = score
-                best_plan = plan
-        
-        return {
-            'recommended_plan': InsurancePlanSerializer(best_plan).data if best_plan else None,
-            'score': best_score
-        }
-    
-    def _calculate_plan_score(self, plan, user):
-        """Calculate a plan's suitability score."""
-        score = 1.0
-        
-        if user.budget:
-            budget_ratio = float(plan.monthly_premium) / float(user.budget)
-            score *= 0.4 * (1 - budget_ratio) + 0.6
-        
-        if user.age:
-            if user.age > 60 and plan.plan_type == 'senior':
-                score *= 1.3
-            elif user.age < 30 and 'young' in plan.features:
-                score *= 1.3
-        
-        if user.family_size:
-            if user.family_size > 1 and plan.plan_type == 'family':
-                score *= 1.3
-            elif user.family_size == 1 and plan.plan_type == 'basic':
-                score *= 1.3
-        
-        return min(1.0, score)
 
 
 class UserDashboardPreferenceViewSet(viewsets.ModelViewSet):
@@ -346,24 +407,21 @@ class UserDashboardPreferenceViewSet(viewsets.ModelViewSet):
         return UserDashboardPreference.objects.filter(user=self.request.user)
     
     def perform_create(self, serializer):
-        """Associate preferences with the current user."""
-        # Delete existing preferences if any
-        UserDashboardPreference.objects.filter(user=self.request.user).delete()
-        serializer.save(user=self.request.user)
+        """Save the current user's preferences, updating their existing row in place."""
+        serializer.instance = save_preferences(self.request.user.pk, serializer.validated_data)
     
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'],
+            authentication_classes=[ProfileClaimsAuthentication, SessionAuthentication])
     def current_preferences(self, request):
-        """Get current user's dashboard preferences."""
-        preferences = UserDashboardPreference.objects.filter(user=request.user).first()
-        if not preferences:
-            # Create default preferences
-            preferences = UserDashboardPreference.objects.create(
-                user=request.user,
-                default_view='grid',
-                show_premium_first=False,
-                notification_preferences={},
-                widgets_order=['recommendations', 'recent_plans', 'feedback']
-            )
-        
-        serializer = self.get_serializer(preferences)
-        return Response(serializer.data)
+        """Get current user's dashboard preferences from the profile cache."""
+        return Response(get_preferences(request.user.pk))
+
+
+class DashboardViewSet(viewsets.ViewSet):
+    """The user, preferences and every widget in `widgets_order`, in one request."""
+    authentication_classes = [ProfileClaimsAuthentication, SessionAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        """Get the whole dashboard; each widget is served from the cache while unchanged."""
+        return Response(assemble(request.user))